@@ -72,8 +72,8 @@ CREATE TABLE asignaturas (
     descripcion TEXT,
     curso_id INT NOT NULL,
     docente_id INT,
-    CONSTRAINT fk_asignatura_curso FOREIGN KEY (curso_id) REFERENCES cursos(id),
-    CONSTRAINT fk_asignatura_docente FOREIGN KEY (docente_id) REFERENCES docentes(id)
+    CONSTRAINT fk_asignatura_curso FOREIGN KEY (curso_id) REFERENCES cursos(id) ON DELETE CASCADE,
+    CONSTRAINT fk_asignatura_docente FOREIGN KEY (docente_id) REFERENCES docentes(id) ON DELETE CASCADE
 );
 
 -- ============================================================================
@@ -85,8 +85,9 @@ CREATE TABLE matriculas (
     estudiante_id INT NOT NULL,
     curso_id INT NOT NULL,
     estado estado_matricula DEFAULT 'REGISTRADO',
-    CONSTRAINT fk_matricula_estudiante FOREIGN KEY (estudiante_id) REFERENCES estudiantes(id),
-    CONSTRAINT fk_matricula_curso FOREIGN KEY (curso_id) REFERENCES cursos(id)
+    CONSTRAINT fk_matricula_estudiante FOREIGN KEY (estudiante_id) REFERENCES estudiantes(id) ON DELETE CASCADE,
+    CONSTRAINT fk_matricula_curso FOREIGN KEY (curso_id) REFERENCES cursos(id) ON DELETE CASCADE,
+    CONSTRAINT uq_matricula_estudiante_curso UNIQUE (estudiante_id, curso_id)
 );
 
 -- ============================================================================
@@ -98,23 +99,204 @@ CREATE TABLE calificaciones (
     quimestre INT NOT NULL,
     matricula_id INT NOT NULL,
     asignatura_id INT NOT NULL,
-    CONSTRAINT fk_calificacion_matricula FOREIGN KEY (matricula_id) REFERENCES matriculas(id),
-    CONSTRAINT fk_calificacion_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id)
+    CONSTRAINT fk_calificacion_matricula FOREIGN KEY (matricula_id) REFERENCES matriculas(id) ON DELETE CASCADE,
+    CONSTRAINT fk_calificacion_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id) ON DELETE CASCADE
 );
 
 -- ============================================================================
 -- 10. TABLA ASISTENCIA
 -- ============================================================================
+-- Particionada por mes de la fecha; la clave primaria debe incluir la clave
+-- de partición (id lo asigna la secuencia y sigue siendo único)
 CREATE TABLE asistencias (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     fecha DATE NOT NULL DEFAULT CURRENT_DATE,
     estado estado_asistencia NOT NULL,
     matricula_id INT NOT NULL,
     asignatura_id INT NOT NULL,
-    CONSTRAINT fk_asistencia_matricula FOREIGN KEY (matricula_id) REFERENCES matriculas(id),
-    CONSTRAINT fk_asistencia_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id)
+    CONSTRAINT pk_asistencias PRIMARY KEY (id, fecha),
+    CONSTRAINT fk_asistencia_matricula FOREIGN KEY (matricula_id) REFERENCES matriculas(id) ON DELETE CASCADE,
+    CONSTRAINT fk_asistencia_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id) ON DELETE CASCADE
+) PARTITION BY RANGE (fecha);
+
+-- ============================================================================
+-- 11. TABLA RESUMEN DE CALIFICACIONES (mantenida por la aplicación)
+-- ============================================================================
+CREATE TABLE resumen_calificaciones (
+    matricula_id INT NOT NULL,
+    asignatura_id INT NOT NULL,
+    quimestre INT NOT NULL,
+    suma FLOAT NOT NULL DEFAULT 0,
+    cantidad INT NOT NULL DEFAULT 0,
+    minimo FLOAT NOT NULL,
+    maximo FLOAT NOT NULL,
+    CONSTRAINT pk_resumen_calificaciones PRIMARY KEY (matricula_id, asignatura_id, quimestre),
+    CONSTRAINT fk_resumen_matricula FOREIGN KEY (matricula_id) REFERENCES matriculas(id) ON DELETE CASCADE,
+    CONSTRAINT fk_resumen_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id) ON DELETE CASCADE
+);
+
+-- ============================================================================
+-- 12. ÍNDICES PARA LAS BÚSQUEDAS FRECUENTES
+-- ============================================================================
+CREATE INDEX ix_estudiantes_representante_id ON estudiantes (representante_id);
+CREATE INDEX ix_asignaturas_curso_id ON asignaturas (curso_id);
+CREATE INDEX ix_asignaturas_docente_id ON asignaturas (docente_id);
+CREATE INDEX ix_matriculas_curso_estado ON matriculas (curso_id, estado);
+CREATE INDEX ix_matriculas_estado ON matriculas (estado);
+CREATE INDEX ix_calificaciones_matricula_asignatura_quimestre ON calificaciones (matricula_id, asignatura_id, quimestre);
+CREATE INDEX ix_calificaciones_asignatura ON calificaciones (asignatura_id);
+CREATE INDEX ix_asistencias_asignatura_fecha ON asistencias (asignatura_id, fecha);
+CREATE INDEX ix_asistencias_matricula_fecha ON asistencias (matricula_id, fecha);
+
+-- ============================================================================
+-- 13. VERSIÓN DE LAS TABLAS (ETAG / LAST-MODIFIED DE LAS RUTAS GET)
+-- ============================================================================
+CREATE TABLE versiones_tablas (
+    tabla VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    modificado TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- modificado es la hora de la escritura (clock_timestamp; now() sería el
+-- inicio de la transacción) y nunca retrocede: una transacción que empezó
+-- antes que otra ya confirmada no debe dejar un Last-Modified anterior
+CREATE OR REPLACE FUNCTION registrar_version_tabla() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO versiones_tablas (tabla, version, modificado) VALUES (TG_TABLE_NAME, 1, clock_timestamp())
+    ON CONFLICT (tabla) DO UPDATE
+        SET version = versiones_tablas.version + 1,
+            modificado = greatest(versiones_tablas.modificado, clock_timestamp());
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tr_version_estudiantes AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON estudiantes
+    FOR EACH STATEMENT EXECUTE FUNCTION registrar_version_tabla();
+CREATE TRIGGER tr_version_cursos AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON cursos
+    FOR EACH STATEMENT EXECUTE FUNCTION registrar_version_tabla();
+CREATE TRIGGER tr_version_asignaturas AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON asignaturas
+    FOR EACH STATEMENT EXECUTE FUNCTION registrar_version_tabla();
+
+-- ============================================================================
+-- 14. BÚSQUEDA APROXIMADA DE PERSONAS (ÍNDICES DE TRIGRAMAS)
+-- ============================================================================
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Texto en el que se busca: las columnas unidas por espacios (las nulas se
+-- omiten). IMMUTABLE para poder indexarla; array_to_string figura como
+-- STABLE solo por aceptar arreglos de cualquier tipo.
+CREATE OR REPLACE FUNCTION texto_busqueda(VARIADIC partes TEXT[]) RETURNS TEXT AS $$
+    SELECT array_to_string(partes, ' ')
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+CREATE INDEX ix_estudiantes_busqueda ON estudiantes
+    USING gin (texto_busqueda(nombre, apellido, cedula, correo) gin_trgm_ops);
+CREATE INDEX ix_docentes_busqueda ON docentes
+    USING gin (texto_busqueda(nombre, apellido, correo) gin_trgm_ops);
+CREATE INDEX ix_representantes_busqueda ON representantes
+    USING gin (texto_busqueda(nombre, telefono) gin_trgm_ops);
+
+-- Búsqueda exacta por teléfono (get_by_telefono)
+CREATE INDEX ix_representantes_telefono ON representantes (telefono);
+
+-- ============================================================================
+-- 15. PARTICIONES MENSUALES DE ASISTENCIAS
+-- ============================================================================
+CREATE TABLE asistencias_default PARTITION OF asistencias DEFAULT;
+
+-- Crea las particiones mensuales (asistencias_AAAA_MM) que falten entre los
+-- meses de `desde` y `hasta`, moviendo a cada una las filas de su mes que
+-- estuvieran en asistencias_default, y las adjunta con ATTACH PARTITION.
+-- asistencias_default queda bloqueada hasta el commit: para escrituras
+-- desde que empieza el movimiento (así ninguna fila del mes entra entre el
+-- DELETE y el ATTACH) y también para lecturas desde el ATTACH, que la
+-- recorre con ACCESS EXCLUSIVE. Las demás particiones no se bloquean.
+-- Devuelve las creadas.
+CREATE OR REPLACE FUNCTION crear_particiones_asistencias(desde DATE, hasta DATE) RETURNS INT AS $$
+DECLARE
+    mes DATE := date_trunc('month', desde)::date;
+    siguiente DATE;
+    particion TEXT;
+    creadas INT := 0;
+BEGIN
+    -- Un solo creador a la vez (ej: dos tareas de mantenimiento simultáneas)
+    PERFORM pg_advisory_xact_lock(hashtext('crear_particiones_asistencias'));
+    WHILE mes <= hasta LOOP
+        siguiente := (mes + INTERVAL '1 month')::date;
+        particion := 'asistencias_' || to_char(mes, 'YYYY_MM');
+        IF to_regclass(particion) IS NULL THEN
+            BEGIN
+                EXECUTE format('CREATE TABLE %I (LIKE asistencias INCLUDING DEFAULTS)', particion);
+                LOCK TABLE asistencias_default IN SHARE ROW EXCLUSIVE MODE;
+                EXECUTE format('WITH movidas AS (DELETE FROM asistencias_default WHERE fecha >= %L AND fecha < %L RETURNING *) '
+                               'INSERT INTO %I SELECT * FROM movidas', mes, siguiente, particion);
+                EXECUTE format('ALTER TABLE asistencias ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                               particion, mes, siguiente);
+                creadas := creadas + 1;
+            EXCEPTION WHEN invalid_object_definition THEN
+                NULL;  -- El mes ya está dentro del rango de otra partición
+            END;
+        END IF;
+        mes := siguiente;
+    END LOOP;
+    RETURN creadas;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Desde el año lectivo 2024-2025 (el de los datos de ejemplo y de
+-- generate_dataset.py) hasta un año adelante
+-- (después, manage_partitions.py crea las que vayan haciendo falta)
+SELECT crear_particiones_asistencias(DATE '2024-09-01', (CURRENT_DATE + INTERVAL '12 months')::date);
+
+-- ============================================================================
+-- 16. ARCHIVO DE AÑOS LECTIVOS CERRADOS
+-- ============================================================================
+-- archive_school_year.py mueve aquí las matrículas de un año lectivo
+-- terminado con sus calificaciones y asistencias (mismas columnas y mismos
+-- ids). Las lecturas por matrícula consultan estas tablas cuando la
+-- matrícula ya no está en las tablas en uso.
+CREATE SCHEMA archivo;
+
+CREATE TABLE archivo.matriculas (
+    id INT PRIMARY KEY,
+    fecha DATE NOT NULL,
+    estudiante_id INT NOT NULL,
+    curso_id INT NOT NULL,
+    estado estado_matricula NOT NULL,
+    anio_lectivo INT NOT NULL,
+    archivado TIMESTAMPTZ NOT NULL DEFAULT now(),
+    CONSTRAINT fk_matricula_archivada_estudiante FOREIGN KEY (estudiante_id) REFERENCES estudiantes(id) ON DELETE CASCADE,
+    CONSTRAINT fk_matricula_archivada_curso FOREIGN KEY (curso_id) REFERENCES cursos(id) ON DELETE CASCADE
+);
+
+CREATE TABLE archivo.calificaciones (
+    id INT PRIMARY KEY,
+    nota FLOAT NOT NULL,
+    quimestre INT NOT NULL,
+    matricula_id INT NOT NULL,
+    asignatura_id INT NOT NULL,
+    CONSTRAINT fk_calificacion_archivada_matricula FOREIGN KEY (matricula_id) REFERENCES archivo.matriculas(id) ON DELETE CASCADE,
+    CONSTRAINT fk_calificacion_archivada_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id) ON DELETE CASCADE
+);
+
+CREATE TABLE archivo.asistencias (
+    id INT PRIMARY KEY,
+    fecha DATE NOT NULL,
+    estado estado_asistencia NOT NULL,
+    matricula_id INT NOT NULL,
+    asignatura_id INT NOT NULL,
+    CONSTRAINT fk_asistencia_archivada_matricula FOREIGN KEY (matricula_id) REFERENCES archivo.matriculas(id) ON DELETE CASCADE,
+    CONSTRAINT fk_asistencia_archivada_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id) ON DELETE CASCADE
 );
 
+CREATE INDEX ix_matriculas_archivadas_estudiante ON archivo.matriculas (estudiante_id);
+CREATE INDEX ix_matriculas_archivadas_curso ON archivo.matriculas (curso_id);
+CREATE INDEX ix_matriculas_archivadas_anio ON archivo.matriculas (anio_lectivo);
+CREATE INDEX ix_calificaciones_archivadas_matricula ON archivo.calificaciones (matricula_id, asignatura_id, quimestre);
+CREATE INDEX ix_calificaciones_archivadas_asignatura ON archivo.calificaciones (asignatura_id);
+CREATE INDEX ix_asistencias_archivadas_matricula_fecha ON archivo.asistencias (matricula_id, fecha);
+CREATE INDEX ix_asistencias_archivadas_asignatura_fecha ON archivo.asistencias (asignatura_id, fecha);
+
 -- ============================================================================
 -- DATOS DE PRUEBA (20 REGISTROS POR TABLA)
 -- ============================================================================
@@ -280,6 +462,12 @@ INSERT INTO calificaciones (nota, quimestre, matricula_id, asignatura_id) VALUES
 (8.5, 3, 19, 19),
 (9.0, 3, 20, 20);
 
+-- Calcular el resumen de calificaciones a partir de los datos insertados
+INSERT INTO resumen_calificaciones (matricula_id, asignatura_id, quimestre, suma, cantidad, minimo, maximo)
+SELECT matricula_id, asignatura_id, quimestre, SUM(nota), COUNT(*), MIN(nota), MAX(nota)
+FROM calificaciones
+GROUP BY matricula_id, asignatura_id, quimestre;
+
 -- Insertar Asistencias (20 registros)
 INSERT INTO asistencias (fecha, estado, matricula_id, asignatura_id) VALUES
 ('2024-12-15', 'PRESENTE', 1, 1),
@@ -313,4 +501,5 @@ SELECT 'Estudiantes: ' || COUNT(*) FROM estudiantes;
 SELECT 'Asignaturas: ' || COUNT(*) FROM asignaturas;
 SELECT 'Matrículas: ' || COUNT(*) FROM matriculas;
 SELECT 'Calificaciones: ' || COUNT(*) FROM calificaciones;
+SELECT 'Resumen de calificaciones: ' || COUNT(*) FROM resumen_calificaciones;
 SELECT 'Asistencias: ' || COUNT(*) FROM asistencias;
@@ -0,0 +1,70 @@
+"""
+Archivo de años lectivos terminados
+
+Mueve las matrículas de un año lectivo cerrado, con sus calificaciones y
+asistencias, de las tablas en uso al esquema archivo (ver
+repositories/archivo.py). Cada lote de matrículas es una transacción
+corta, así la aplicación puede seguir funcionando mientras se archiva; si
+se interrumpe, volver a ejecutarlo continúa con lo que falte.
+
+Las consultas por matrícula (GET /matriculas/{id}, /matriculas/historial,
+/calificaciones/promedio, /asistencias/periodo) siguen encontrando los
+datos archivados.
+
+Uso:
+    python archive_school_year.py --listar
+    python archive_school_year.py --anio 2024            # año lectivo 2024-2025
+    python archive_school_year.py --anio 2024 --lote 500 --pausa 0.5
+"""
+import argparse
+import time
+from config.database import SessionLocal
+from config.settings import ARCHIVO_TAMANO_LOTE
+from repositories.archivo import rango_anio_lectivo
+from services.services import ArchivoService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mueve un año lectivo terminado al esquema archivo")
+    parser.add_argument("--anio", type=int, help="Año en que empieza el año lectivo (ej: 2024 para 2024-2025)")
+    parser.add_argument("--lote", type=int, default=ARCHIVO_TAMANO_LOTE, help="Matrículas por transacción")
+    parser.add_argument("--pausa", type=float, default=0.0,
+                        help="Segundos de espera entre lotes (deja respirar a la BD y a las réplicas)")
+    parser.add_argument("--listar", action="store_true", help="Solo listar los años lectivos")
+    args = parser.parse_args()
+    if args.anio is None and not args.listar:
+        parser.error("indique --anio o --listar")
+
+    db = SessionLocal()
+    try:
+        service = ArchivoService(db)
+        if args.anio is not None:
+            inicio, fin = rango_anio_lectivo(args.anio)
+            print(f"Archivando el año lectivo {args.anio}-{args.anio + 1} (matrículas del {inicio} al {fin})")
+
+            def al_avanzar(movidas):
+                print(f"  lote: {movidas['matriculas']:>6,} matrículas  {movidas['calificaciones']:>9,} calificaciones"
+                      f"  {movidas['asistencias']:>11,} asistencias")
+                if args.pausa:
+                    time.sleep(args.pausa)
+
+            try:
+                inicio_reloj = time.perf_counter()
+                totales = service.archivar_anio(args.anio, args.lote, al_avanzar=al_avanzar)
+            except ValueError as e:
+                parser.error(str(e))
+            if totales:
+                print(f"✓ Archivadas {totales['matriculas']:,} matrículas, {totales['calificaciones']:,} calificaciones"
+                      f" y {totales['asistencias']:,} asistencias en {time.perf_counter() - inicio_reloj:.1f} s")
+                print("  Conviene ejecutar VACUUM ANALYZE matriculas, calificaciones, asistencias")
+            else:
+                print("✓ No quedan matrículas de ese año lectivo en las tablas en uso")
+
+        for anio in service.listar_anios():
+            print(f"  {anio.anio}-{anio.anio + 1}  en uso: {anio.en_uso:>8,}  archivadas: {anio.archivadas:>8,}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
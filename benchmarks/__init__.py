@@ -0,0 +1,3 @@
+"""
+Benchmarks de rendimiento (se ejecutan a mano, no forman parte de las pruebas)
+"""
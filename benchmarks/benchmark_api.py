@@ -0,0 +1,390 @@
+"""
+Benchmark HTTP de extremo a extremo de la API
+
+Levanta main:app con uvicorn en un proceso aparte (o usa un servidor ya
+iniciado con --url), ejecuta cada escenario (lecturas, listados, reportes,
+escrituras y cargas en lote) con la concurrencia indicada y muestra la
+latencia p50/p95/p99 y el rendimiento de cada ruta.
+
+Los resultados se pueden guardar como línea base en JSON y comparar con
+otra ejecución (por ejemplo, de otro commit). Los escenarios de escritura
+crean calificaciones (que se eliminan al final) y asistencias: usar una base
+de datos de prueba, idealmente generada con --generar (generate_dataset.py).
+
+Uso:
+    python -m benchmarks.benchmark_api --generar --estudiantes 1000
+    python -m benchmarks.benchmark_api --concurrencia 16 --guardar benchmarks/resultados/base.json
+    python -m benchmarks.benchmark_api --comparar benchmarks/resultados/base.json
+    python -m benchmarks.benchmark_api --url http://localhost:8000 --solo-lectura
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+API = "/api/v1"
+
+
+def percentil(ordenados: List[float], p: float) -> float:
+    """
+    Percentil p (0-100) de una lista ordenada, con interpolación lineal.
+
+    >>> percentil([1.0, 2.0, 3.0, 4.0], 50)
+    2.5
+    >>> percentil([1.0, 2.0, 3.0, 4.0], 99)
+    3.97
+    >>> percentil([], 95)
+    0.0
+    """
+    if not ordenados:
+        return 0.0
+    posicion = (len(ordenados) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    fraccion = posicion - inferior
+    return round(ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * fraccion, 6)
+
+
+class Cliente:
+    """Conexión HTTP persistente (keep-alive) de un hilo de trabajo"""
+
+    def __init__(self, url: str):
+        partes = urlsplit(url)
+        self.host, self.puerto = partes.hostname, partes.port or 80
+        self.conexion = None
+
+    def pedir(self, metodo: str, ruta: str, cuerpo=None) -> Tuple[int, bytes, float]:
+        """
+        Envía una petición y lee la respuesta completa.
+
+        Returns:
+            (código de estado, cuerpo, segundos transcurridos)
+        """
+        datos = json.dumps(cuerpo).encode() if cuerpo is not None else None
+        cabeceras = {"Content-Type": "application/json"} if datos is not None else {}
+        for intento in range(2):
+            if self.conexion is None:
+                self.conexion = http.client.HTTPConnection(self.host, self.puerto, timeout=60)
+            inicio = time.perf_counter()
+            try:
+                self.conexion.request(metodo, ruta, body=datos, headers=cabeceras)
+                respuesta = self.conexion.getresponse()
+                contenido = respuesta.read()
+                return respuesta.status, contenido, time.perf_counter() - inicio
+            except (http.client.HTTPException, OSError):
+                # Conexión cerrada por el servidor: se reintenta una vez con otra
+                self.conexion.close()
+                self.conexion = None
+                if intento:
+                    raise
+        raise RuntimeError("inalcanzable")
+
+
+class Contexto:
+    """IDs existentes (leídos de la API) y registros creados durante el benchmark"""
+
+    def __init__(self, cliente: Cliente, muestra: int):
+        def listar(entidad: str) -> List[dict]:
+            estado, cuerpo, _ = cliente.pedir("GET", f"{API}/{entidad}?limit={muestra}")
+            if estado != 200:
+                raise SystemExit(f"✗ GET {API}/{entidad} devolvió {estado}")
+            return json.loads(cuerpo)
+
+        self.estudiantes = [e["id"] for e in listar("estudiantes")]
+        self.matriculas = listar("matriculas")
+        self.cursos = sorted({m["curso_id"] for m in self.matriculas})
+        self.asignaturas_de: Dict[int, List[int]] = {}
+        for a in listar("asignaturas"):
+            self.asignaturas_de.setdefault(a["curso_id"], []).append(a["id"])
+        self.matriculas = [m for m in self.matriculas if m["curso_id"] in self.asignaturas_de]
+        if not (self.estudiantes and self.matriculas):
+            raise SystemExit("✗ La base de datos no tiene datos suficientes: usar --generar")
+        self.creadas: List[int] = []
+
+    def matricula_y_asignatura(self, rng: random.Random) -> Tuple[int, int]:
+        matricula = rng.choice(self.matriculas)
+        return matricula["id"], rng.choice(self.asignaturas_de[matricula["curso_id"]])
+
+
+class Escenario(NamedTuple):
+    """
+    Ruta a medir.
+
+    peticion: Función (rng, contexto) -> (método, ruta, cuerpo)
+    escritura: Si modifica datos (se omite con --solo-lectura)
+    procesar: Función (contexto, cuerpo de la respuesta) para respuestas exitosas
+    """
+    nombre: str
+    peticion: Callable
+    escritura: bool = False
+    procesar: Optional[Callable] = None
+
+
+def _nueva_calificacion(rng, ctx):
+    matricula, asignatura = ctx.matricula_y_asignatura(rng)
+    return "POST", f"{API}/calificaciones", {
+        "nota": round(rng.uniform(0, 10), 1), "quimestre": rng.randint(1, 2),
+        "matricula_id": matricula, "asignatura_id": asignatura,
+    }
+
+
+def _lote_asistencias(rng, ctx):
+    lote = []
+    for _ in range(50):
+        matricula, asignatura = ctx.matricula_y_asignatura(rng)
+        lote.append({"estado": rng.choice(["PRESENTE", "AUSENTE", "ATRASO"]),
+                     "matricula_id": matricula, "asignatura_id": asignatura})
+    return "POST", f"{API}/asistencias/bulk", lote
+
+
+def _creada(rng, ctx, metodo: str):
+    """Petición sobre una calificación creada por el escenario POST (DELETE la retira de la lista)"""
+    if not ctx.creadas:
+        return None
+    id_ = ctx.creadas.pop() if metodo == "DELETE" else rng.choice(ctx.creadas)
+    cuerpo = {"nota": round(rng.uniform(0, 10), 1)} if metodo == "PUT" else None
+    return metodo, f"{API}/calificaciones/{id_}", cuerpo
+
+
+ESCENARIOS = [
+    Escenario("GET /estudiantes/{id}",
+              lambda rng, ctx: ("GET", f"{API}/estudiantes/{rng.choice(ctx.estudiantes)}", None)),
+    Escenario("GET /estudiantes?limit=50",
+              lambda rng, ctx: ("GET", f"{API}/estudiantes?limit=50&after_id={rng.choice(ctx.estudiantes)}", None)),
+    Escenario("GET /matriculas?include=estudiante",
+              lambda rng, ctx: ("GET", f"{API}/matriculas?limit=50&include=estudiante"
+                                       f"&after_id={rng.choice(ctx.matriculas)['id']}", None)),
+    Escenario("GET /matriculas/{id}?include=calificaciones.asignatura",
+              lambda rng, ctx: ("GET", f"{API}/matriculas/{rng.choice(ctx.matriculas)['id']}"
+                                       f"?include=calificaciones.asignatura", None)),
+    Escenario("GET /calificaciones/promedio",
+              lambda rng, ctx: ("GET", f"{API}/calificaciones/promedio?matricula_id={rng.choice(ctx.matriculas)['id']}", None)),
+    Escenario("GET /calificaciones/ranking",
+              lambda rng, ctx: ("GET", f"{API}/calificaciones/ranking?curso_id={rng.choice(ctx.cursos)}", None)),
+    Escenario("GET /calificaciones/libreta",
+              lambda rng, ctx: ("GET", f"{API}/calificaciones/libreta?curso_id={rng.choice(ctx.cursos)}&quimestre=1", None)),
+    Escenario("POST /calificaciones", _nueva_calificacion, escritura=True,
+              procesar=lambda ctx, cuerpo: ctx.creadas.append(json.loads(cuerpo)["id"])),
+    Escenario("PUT /calificaciones/{id}", lambda rng, ctx: _creada(rng, ctx, "PUT"), escritura=True),
+    Escenario("POST /asistencias/bulk (50)", _lote_asistencias, escritura=True),
+    Escenario("DELETE /calificaciones/{id}", lambda rng, ctx: _creada(rng, ctx, "DELETE"), escritura=True),
+]
+
+
+def medir(url: str, escenario: Escenario, ctx: Contexto, peticiones: int, concurrencia: int,
+          calentamiento: int, semilla: int) -> dict:
+    """
+    Ejecuta un escenario con `concurrencia` hilos, cada uno con su conexión.
+
+    Returns:
+        Métricas de la ruta: peticiones, errores, latencias (ms) y peticiones por segundo
+    """
+    latencias: List[float] = []
+    errores: Dict[str, int] = {}
+    candado = threading.Lock()
+    por_hilo = [peticiones // concurrencia + (1 if i < peticiones % concurrencia else 0)
+                for i in range(concurrencia)]
+
+    def trabajar(indice: int) -> None:
+        rng = random.Random(semilla * 1000 + indice)
+        cliente = Cliente(url)
+        for n in range(calentamiento + por_hilo[indice]):
+            peticion = escenario.peticion(rng, ctx)
+            if peticion is None:
+                return
+            estado, cuerpo, segundos = cliente.pedir(*peticion)
+            if estado < 400 and escenario.procesar:
+                escenario.procesar(ctx, cuerpo)
+            if n < calentamiento:
+                continue
+            with candado:
+                latencias.append(segundos * 1000)
+                if estado >= 400:
+                    errores[str(estado)] = errores.get(str(estado), 0) + 1
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as hilos:
+        list(hilos.map(trabajar, range(concurrencia)))
+    duracion = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "peticiones": len(latencias),
+        "errores": errores,
+        "p50_ms": percentil(latencias, 50),
+        "p95_ms": percentil(latencias, 95),
+        "p99_ms": percentil(latencias, 99),
+        "media_ms": round(statistics.fmean(latencias), 6) if latencias else 0.0,
+        "max_ms": round(latencias[-1], 6) if latencias else 0.0,
+        "rps": round(len(latencias) / duracion, 2) if duracion else 0.0,
+    }
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor(workers: int) -> Tuple[subprocess.Popen, str]:
+    """Inicia main:app con uvicorn y espera a que /health responda"""
+    puerto = puerto_libre()
+    proceso = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(puerto),
+        "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+    ])
+    url = f"http://127.0.0.1:{puerto}"
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise SystemExit("✗ El servidor terminó al iniciar")
+        try:
+            if Cliente(url).pedir("GET", "/health")[0] == 200:
+                return proceso, url
+        except OSError:
+            pass
+        time.sleep(0.2)
+    proceso.terminate()
+    raise SystemExit("✗ El servidor no respondió en 60 s")
+
+
+def revision() -> Optional[str]:
+    """Commit actual del repositorio (None si no está disponible)"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir(rutas: Dict[str, dict]) -> None:
+    print(f"\n{'Ruta':<56} {'n':>6} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    for nombre, m in rutas.items():
+        print(f"{nombre:<56} {m['peticiones']:>6} {sum(m['errores'].values()):>5} "
+              f"{m['p50_ms']:>9.2f} {m['p95_ms']:>9.2f} {m['p99_ms']:>9.2f} {m['rps']:>9.1f}")
+
+
+def variacion(antes: float, despues: float) -> float:
+    """
+    Variación porcentual entre dos mediciones.
+
+    >>> variacion(10.0, 13.0)
+    30.0
+    >>> variacion(200.0, 150.0)
+    -25.0
+    """
+    return round((despues - antes) / antes * 100, 2)
+
+
+def comparar(actual: Dict[str, dict], base: Dict[str, dict], umbral: float) -> List[str]:
+    """
+    Compara p95 y rendimiento con una línea base.
+
+    Returns:
+        Rutas cuyo p95 subió o cuyo rendimiento bajó más de `umbral` %
+    """
+    print(f"\n{'Ruta':<56} {'p95 base':>9} {'p95 ahora':>11} {'Δ':>8} {'req/s base':>11} {'req/s ahora':>12} {'Δ':>8}")
+    regresiones = []
+    for nombre, m in actual.items():
+        b = base.get(nombre)
+        if not b or not b["p95_ms"] or not b["rps"]:
+            continue
+        delta_p95 = variacion(b["p95_ms"], m["p95_ms"])
+        delta_rps = variacion(b["rps"], m["rps"])
+        regresion = delta_p95 > umbral or delta_rps < -umbral
+        if regresion:
+            regresiones.append(nombre)
+        print(f"{nombre:<56} {b['p95_ms']:>9.2f} {m['p95_ms']:>11.2f} {delta_p95:>+7.1f}% "
+              f"{b['rps']:>11.1f} {m['rps']:>12.1f} {delta_rps:>+7.1f}%" + ("  ✗" if regresion else ""))
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTTP de la API (latencia p50/p95/p99 y rendimiento por ruta)")
+    parser.add_argument("--url", help="Servidor ya iniciado (por defecto se inicia main:app con uvicorn)")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos de uvicorn al iniciar el servidor")
+    parser.add_argument("--generar", action="store_true",
+                        help="Vaciar la BD y generar datos sintéticos antes de medir (generate_dataset.py)")
+    parser.add_argument("--estudiantes", type=int, default=1000, help="Estudiantes a generar con --generar")
+    parser.add_argument("--concurrencia", type=int, default=8, help="Peticiones simultáneas")
+    parser.add_argument("--peticiones", type=int, default=400, help="Peticiones medidas por ruta")
+    parser.add_argument("--calentamiento", type=int, default=5, help="Peticiones no medidas por hilo al empezar cada ruta")
+    parser.add_argument("--muestra", type=int, default=1000, help="Registros leídos de la API para elegir IDs")
+    parser.add_argument("--rutas", help="Solo las rutas cuyo nombre contenga este texto")
+    parser.add_argument("--solo-lectura", action="store_true", help="Omitir los escenarios que modifican datos")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--guardar", help="Guardar los resultados como línea base JSON")
+    parser.add_argument("--comparar", help="Comparar con una línea base JSON guardada antes")
+    parser.add_argument("--umbral", type=float, default=20.0,
+                        help="%% de empeoramiento de p95 o req/s que se considera regresión (código de salida 1)")
+    args = parser.parse_args()
+
+    if args.generar:
+        if args.url:
+            parser.error("--generar solo se permite con el servidor local")
+        subprocess.run([sys.executable, "generate_dataset.py", "--limpiar", "--semilla", str(args.semilla),
+                        "--estudiantes", str(args.estudiantes)], check=True)
+
+    proceso = None
+    url = args.url
+    if url is None:
+        proceso, url = iniciar_servidor(args.workers)
+    try:
+        ctx = Contexto(Cliente(url), args.muestra)
+        escenarios = [
+            e for e in ESCENARIOS
+            if not (args.solo_lectura and e.escritura) and (not args.rutas or args.rutas in e.nombre)
+        ]
+        rutas = {}
+        for escenario in escenarios:
+            print(f"… {escenario.nombre}", flush=True)
+            rutas[escenario.nombre] = medir(url, escenario, ctx, args.peticiones, args.concurrencia,
+                                            args.calentamiento, args.semilla)
+        # Calificaciones creadas que el escenario DELETE no llegó a eliminar
+        cliente = Cliente(url)
+        while ctx.creadas:
+            cliente.pedir("DELETE", f"{API}/calificaciones/{ctx.creadas.pop()}")
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+
+    imprimir(rutas)
+    resultado = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": revision(),
+        "parametros": {
+            "url": args.url or "local", "workers": args.workers, "concurrencia": args.concurrencia,
+            "peticiones": args.peticiones, "db_async": os.getenv("DB_ASYNC", "0"),
+        },
+        "rutas": rutas,
+    }
+    if args.guardar:
+        os.makedirs(os.path.dirname(args.guardar) or ".", exist_ok=True)
+        with open(args.guardar, "w", encoding="utf-8") as archivo:
+            json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+        print(f"\n✓ Línea base guardada en {args.guardar}")
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            base = json.load(archivo)
+        print(f"\nComparación con {args.comparar} (commit {base.get('commit')}, {base.get('fecha')})")
+        regresiones = comparar(rutas, base["rutas"], args.umbral)
+        if regresiones:
+            print(f"\n✗ {len(regresiones)} ruta(s) empeoraron más de {args.umbral:g} %")
+            raise SystemExit(1)
+        print(f"\n✓ Sin regresiones mayores a {args.umbral:g} %")
+
+
+if __name__ == "__main__":
+    main()
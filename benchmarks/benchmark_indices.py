@@ -0,0 +1,223 @@
+"""
+Benchmark de los índices de las búsquedas frecuentes (migrations/001)
+
+Compara el plan y el tiempo de las consultas de los repositorios sin y con
+los índices. Todo ocurre dentro de una transacción que se revierte al final:
+los datos sintéticos y el borrado temporal de índices no dejan rastro.
+
+Uso:
+    python -m benchmarks.benchmark_indices
+    python -m benchmarks.benchmark_indices --estudiantes 20000 --json indices.json
+"""
+import argparse
+import json
+import statistics
+from typing import Dict, List, Tuple
+from sqlalchemy import text
+from config.database import engine
+
+# Índices de la migración 001: (tabla, nombre, es_restriccion)
+INDICES = [
+    ("matriculas", "uq_matricula_estudiante_curso", True),
+    ("matriculas", "ix_matriculas_curso_estado", False),
+    ("matriculas", "ix_matriculas_estado", False),
+    ("calificaciones", "ix_calificaciones_matricula_asignatura_quimestre", False),
+    ("calificaciones", "ix_calificaciones_asignatura", False),
+    ("asistencias", "ix_asistencias_asignatura_fecha", False),
+    ("asistencias", "ix_asistencias_matricula_fecha", False),
+    ("estudiantes", "ix_estudiantes_representante_id", False),
+    ("asignaturas", "ix_asignaturas_curso_id", False),
+    ("asignaturas", "ix_asignaturas_docente_id", False),
+]
+
+# Consultas de los repositorios que dependen de esos índices
+CONSULTAS = {
+    "MatriculaRepository.get_estudiante_en_curso":
+        "SELECT * FROM matriculas WHERE estudiante_id = :estudiante_id AND curso_id = :curso_id",
+    "MatriculaRepository.get_by_curso":
+        "SELECT * FROM matriculas WHERE curso_id = :curso_id",
+    "MatriculaRepository.get_by_estado":
+        "SELECT * FROM matriculas WHERE estado = 'RETIRADO'",
+    "CalificacionRepository.get_by_matricula":
+        "SELECT * FROM calificaciones WHERE matricula_id = :matricula_id",
+    "ResumenCalificacionRepository.recalcular (grupo)":
+        "SELECT SUM(nota), COUNT(nota), MIN(nota), MAX(nota) FROM calificaciones "
+        "WHERE matricula_id = :matricula_id AND asignatura_id = :asignatura_id AND quimestre = 1",
+    "AsistenciaRepository.get_by_asignatura":
+        "SELECT * FROM asistencias WHERE asignatura_id = :asignatura_id",
+    "AsistenciaRepository.get_by_matricula":
+        "SELECT * FROM asistencias WHERE matricula_id = :matricula_id",
+}
+
+# Datos sintéticos (ids explícitos a partir del máximo actual de cada tabla)
+DATOS_SINTETICOS = [
+    """INSERT INTO representantes (id, nombre, telefono)
+       SELECT :r0 + g, 'Representante ' || g, '09' || lpad(g::text, 8, '0')
+       FROM generate_series(1, :estudiantes) g""",
+    """INSERT INTO cursos (id, nombre, nivel)
+       SELECT :c0 + g, 'Curso ' || g, 'Nivel ' || (g % 10)
+       FROM generate_series(1, :cursos) g""",
+    """INSERT INTO asignaturas (id, nombre, curso_id)
+       SELECT :a0 + g, 'Asignatura ' || g, :c0 + 1 + (g - 1) / :asignaturas_por_curso
+       FROM generate_series(1, :cursos * :asignaturas_por_curso) g""",
+    """INSERT INTO estudiantes (id, nombre, apellido, cedula, fecha_nacimiento, representante_id)
+       SELECT :e0 + g, 'Nombre ' || g, 'Apellido ' || g, 'B' || lpad(g::text, 9, '0'),
+              DATE '2010-01-01' + (g % 1500), :r0 + g
+       FROM generate_series(1, :estudiantes) g""",
+    """INSERT INTO matriculas (id, fecha, estudiante_id, curso_id, estado)
+       SELECT :m0 + g, DATE '2024-01-15', :e0 + g, :c0 + 1 + (g % :cursos),
+              (ARRAY['REGISTRADO', 'MATRICULADO', 'ACTIVO', 'ACTIVO', 'ACTIVO',
+                     'ACTIVO', 'RETIRADO', 'GRADUADO'])[1 + g % 8]::estado_matricula
+       FROM generate_series(1, :estudiantes) g""",
+    """INSERT INTO calificaciones (nota, quimestre, matricula_id, asignatura_id)
+       SELECT round((random() * 10)::numeric, 1), q, m.id, a.id
+       FROM matriculas m
+       JOIN asignaturas a ON a.curso_id = m.curso_id
+       CROSS JOIN generate_series(1, 3) q
+       WHERE m.id > :m0""",
+    """INSERT INTO asistencias (fecha, estado, matricula_id, asignatura_id)
+       SELECT DATE '2024-09-02' + d,
+              (ARRAY['PRESENTE', 'PRESENTE', 'PRESENTE', 'AUSENTE', 'ATRASO',
+                     'JUSTIFICADO'])[1 + floor(random() * 6)::int]::estado_asistencia,
+              m.id, a.id
+       FROM matriculas m
+       JOIN asignaturas a ON a.curso_id = m.curso_id
+       CROSS JOIN generate_series(0, :dias - 1) d
+       WHERE m.id > :m0""",
+]
+
+
+def generar_datos(conn, estudiantes: int, cursos: int, asignaturas_por_curso: int, dias: int) -> None:
+    """Inserta datos sintéticos reproducibles y actualiza las estadísticas"""
+    conn.execute(text("SELECT setseed(0.42)"))
+    parametros = {
+        "estudiantes": estudiantes,
+        "cursos": cursos,
+        "asignaturas_por_curso": asignaturas_por_curso,
+        "dias": dias,
+    }
+    for clave, tabla in (("r0", "representantes"), ("c0", "cursos"), ("a0", "asignaturas"),
+                         ("e0", "estudiantes"), ("m0", "matriculas")):
+        parametros[clave] = conn.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {tabla}")).scalar()
+    for sentencia in DATOS_SINTETICOS:
+        conn.execute(text(sentencia), parametros)
+    analizar(conn)
+
+
+def analizar(conn) -> None:
+    """Actualiza las estadísticas del planificador"""
+    for tabla in ("estudiantes", "asignaturas", "matriculas", "calificaciones", "asistencias"):
+        conn.execute(text(f"ANALYZE {tabla}"))
+
+
+def parametros_muestra(conn) -> Dict[str, int]:
+    """Elige una matrícula existente (la más reciente) para parametrizar las consultas"""
+    fila = conn.execute(text(
+        """SELECT m.id, m.estudiante_id, m.curso_id, a.id
+           FROM matriculas m JOIN asignaturas a ON a.curso_id = m.curso_id
+           ORDER BY m.id DESC LIMIT 1"""
+    )).first()
+    if fila is None:
+        raise SystemExit("No hay matrículas con asignaturas: usar --estudiantes > 0")
+    return dict(zip(("matricula_id", "estudiante_id", "curso_id", "asignatura_id"), fila))
+
+
+def resumir_plan(nodo: dict) -> str:
+    """Describe un plan como la secuencia de nodos con su índice (si usa uno)"""
+    descripcion = nodo["Node Type"]
+    if "Index Name" in nodo:
+        descripcion += f" ({nodo['Index Name']})"
+    hijos = [resumir_plan(hijo) for hijo in nodo.get("Plans", [])]
+    return descripcion + (" <- " + ", ".join(hijos) if hijos else "")
+
+
+def medir(conn, sql: str, parametros: dict, repeticiones: int) -> Tuple[str, float]:
+    """
+    Ejecuta EXPLAIN ANALYZE varias veces.
+
+    Returns:
+        (plan resumido, mediana del tiempo de ejecución en ms)
+    """
+    tiempos = []
+    plan = ""
+    for _ in range(repeticiones):
+        resultado = conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"), parametros).scalar()
+        if isinstance(resultado, str):
+            resultado = json.loads(resultado)
+        plan = resumir_plan(resultado[0]["Plan"])
+        tiempos.append(resultado[0]["Execution Time"])
+    return plan, statistics.median(tiempos)
+
+
+def eliminar_indices(conn) -> None:
+    """Elimina los índices de la migración (dentro de la transacción en curso)"""
+    for tabla, nombre, es_restriccion in INDICES:
+        if es_restriccion:
+            conn.execute(text(f"ALTER TABLE {tabla} DROP CONSTRAINT IF EXISTS {nombre}"))
+        else:
+            conn.execute(text(f"DROP INDEX IF EXISTS {nombre}"))
+
+
+def ejecutar(estudiantes: int, cursos: int, asignaturas_por_curso: int, dias: int,
+             repeticiones: int) -> List[dict]:
+    """Mide cada consulta sin y con índices; revierte todos los cambios al terminar"""
+    resultados = []
+    with engine.connect() as conn:
+        transaccion = conn.begin()
+        try:
+            if estudiantes > 0:
+                generar_datos(conn, estudiantes, cursos, asignaturas_por_curso, dias)
+            parametros = parametros_muestra(conn)
+
+            sin_indices = conn.begin_nested()
+            eliminar_indices(conn)
+            analizar(conn)
+            antes = {nombre: medir(conn, sql, parametros, repeticiones) for nombre, sql in CONSULTAS.items()}
+            sin_indices.rollback()
+
+            analizar(conn)
+            despues = {nombre: medir(conn, sql, parametros, repeticiones) for nombre, sql in CONSULTAS.items()}
+
+            for nombre in CONSULTAS:
+                resultados.append({
+                    "consulta": nombre,
+                    "plan_antes": antes[nombre][0],
+                    "ms_antes": round(antes[nombre][1], 3),
+                    "plan_despues": despues[nombre][0],
+                    "ms_despues": round(despues[nombre][1], 3),
+                })
+        finally:
+            transaccion.rollback()
+    return resultados
+
+
+def imprimir(resultados: List[dict]) -> None:
+    """Muestra la comparación en consola"""
+    for r in resultados:
+        mejora = r["ms_antes"] / r["ms_despues"] if r["ms_despues"] else float("inf")
+        print(f"\n{r['consulta']}")
+        print(f"  antes:   {r['ms_antes']:>9.3f} ms  {r['plan_antes']}")
+        print(f"  después: {r['ms_despues']:>9.3f} ms  {r['plan_despues']}")
+        print(f"  mejora:  x{mejora:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los planes de consulta sin y con los índices de la migración 001")
+    parser.add_argument("--estudiantes", type=int, default=5000, help="Estudiantes sintéticos a generar (0 = usar solo los datos existentes)")
+    parser.add_argument("--cursos", type=int, default=100)
+    parser.add_argument("--asignaturas-por-curso", type=int, default=8)
+    parser.add_argument("--dias", type=int, default=5, help="Días de asistencia por estudiante y asignatura")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Ejecuciones por consulta (se informa la mediana)")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    resultados = ejecutar(args.estudiantes, args.cursos, args.asignaturas_por_curso, args.dias, args.repeticiones)
+    imprimir(resultados)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+        print(f"\n✓ Resultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark de la ruta rápida de serialización de los listados (JSON_RAPIDO)
+
+Para una página de cada listado compara, sin caché y con una sesión nueva
+por repetición (como en una petición):
+
+- normal: objetos ORM del servicio (listar_*), validados contra el schema
+  de lectura y escritos en JSON con un TypeAdapter, lo mismo que hace
+  FastAPI con el response_model.
+- rápida: filas de listar_filas escritas con respuesta_filas
+  (routes/respuestas.py), sin validar.
+
+Se informa el costo por fila de la página completa (consulta incluida) y
+solo de la serialización, y se comprueba que ambas rutas producen el
+mismo JSON. Solo lee: usar una base con datos (generate_dataset.py).
+
+Uso:
+    python -m benchmarks.benchmark_serializacion
+    python -m benchmarks.benchmark_serializacion --limite 1000 --repeticiones 30 --json serializacion.json
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, List, Tuple
+from fastapi import Response
+from pydantic import TypeAdapter
+from config.database import SessionLocal
+from repositories.cache import usar_backend_cache
+from routes.respuestas import columnas_lectura, orjson, respuesta_filas
+from schemas.representante import RepresentanteRead
+from schemas.estudiante import EstudianteRead
+from schemas.docente import DocenteRead
+from schemas.curso import CursoRead
+from schemas.asignatura import AsignaturaRead
+from schemas.matricula import MatriculaRead
+from schemas.calificacion import CalificacionRead
+from schemas.asistencia import AsistenciaRead
+from services.services import (
+    RepresentanteService, EstudianteService, DocenteService, CursoService,
+    AsignaturaService, MatriculaService, CalificacionService, AsistenciaService
+)
+
+# (listado, servicio, método de la ruta normal, schema de lectura)
+LISTADOS = [
+    ("representantes", RepresentanteService, "listar_representantes", RepresentanteRead),
+    ("estudiantes", EstudianteService, "listar_estudiantes", EstudianteRead),
+    ("docentes", DocenteService, "listar_docentes", DocenteRead),
+    ("cursos", CursoService, "listar_cursos", CursoRead),
+    ("asignaturas", AsignaturaService, "listar_asignaturas", AsignaturaRead),
+    ("matriculas", MatriculaService, "listar_matriculas", MatriculaRead),
+    ("calificaciones", CalificacionService, "listar_calificaciones", CalificacionRead),
+    ("asistencias", AsistenciaService, "listar_asistencias", AsistenciaRead),
+]
+
+
+def medir(pagina: Callable[[object], list], serializar: Callable[[list], bytes],
+          repeticiones: int) -> Tuple[float, float, int, bytes]:
+    """
+    Lee y serializa una página varias veces, cada vez con una sesión nueva.
+
+    Returns:
+        (mediana total en s, mediana de la serialización en s, filas, último JSON)
+    """
+    totales, serializaciones = [], []
+    cuerpo, filas = b"", 0
+    for _ in range(repeticiones):
+        db = SessionLocal()
+        try:
+            inicio = time.perf_counter()
+            datos = pagina(db)
+            medio = time.perf_counter()
+            cuerpo = serializar(datos)
+            fin = time.perf_counter()
+        finally:
+            db.close()
+        totales.append(fin - inicio)
+        serializaciones.append(fin - medio)
+        filas = len(datos)
+    return statistics.median(totales), statistics.median(serializaciones), filas, cuerpo
+
+
+def ejecutar(limite: int, repeticiones: int) -> List[dict]:
+    """Compara ambas rutas en cada listado"""
+    usar_backend_cache(None)  # Medir también la consulta en las tablas de catálogo
+    resultados = []
+    for nombre, servicio_cls, metodo, schema in LISTADOS:
+        adaptador = TypeAdapter(List[schema])
+        columnas = columnas_lectura(schema)
+        normal = medir(
+            lambda db: getattr(servicio_cls(db), metodo)(0, limite),
+            lambda objs: adaptador.dump_json(adaptador.validate_python(objs)),
+            repeticiones,
+        )
+        rapida = medir(
+            lambda db: servicio_cls(db).listar_filas(columnas, 0, limite),
+            lambda filas: respuesta_filas(filas, schema, Response()).body,
+            repeticiones,
+        )
+        filas = normal[2]
+        if not filas:
+            continue
+        resultados.append({
+            "listado": nombre,
+            "filas": filas,
+            "iguales": json.loads(normal[3]) == json.loads(rapida[3]),
+            "us_fila_normal": round(normal[0] / filas * 1e6, 2),
+            "us_fila_rapida": round(rapida[0] / filas * 1e6, 2),
+            "us_fila_serializacion_normal": round(normal[1] / filas * 1e6, 2),
+            "us_fila_serializacion_rapida": round(rapida[1] / filas * 1e6, 2),
+        })
+    return resultados
+
+
+def imprimir(resultados: List[dict]) -> None:
+    """Muestra la comparación en consola"""
+    print(f"Codificador de la ruta rápida: {'orjson' if orjson is not None else 'pydantic_core'}")
+    print(f"\n{'listado':<16}{'filas':>7}  {'µs/fila normal':>15}{'rápida':>9}{'mejora':>8}"
+          f"  {'µs/fila serialización':>22}{'rápida':>9}{'mejora':>8}")
+    for r in resultados:
+        mejora = r["us_fila_normal"] / r["us_fila_rapida"] if r["us_fila_rapida"] else float("inf")
+        mejora_ser = (r["us_fila_serializacion_normal"] / r["us_fila_serializacion_rapida"]
+                      if r["us_fila_serializacion_rapida"] else float("inf"))
+        marca = "✓" if r["iguales"] else "⚠️  JSON distinto"
+        print(f"{r['listado']:<16}{r['filas']:>7}  {r['us_fila_normal']:>15.2f}{r['us_fila_rapida']:>9.2f}{mejora:>7.1f}x"
+              f"  {r['us_fila_serializacion_normal']:>22.2f}{r['us_fila_serializacion_rapida']:>9.2f}{mejora_ser:>7.1f}x  {marca}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara la serialización normal y la rápida de los listados")
+    parser.add_argument("--limite", type=int, default=1000, help="Filas por página")
+    parser.add_argument("--repeticiones", type=int, default=20, help="Lecturas por listado y ruta (se informa la mediana)")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    resultados = ejecutar(args.limite, args.repeticiones)
+    imprimir(resultados)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
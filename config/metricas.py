@@ -0,0 +1,432 @@
+"""
+Métricas del pool de conexiones y de las peticiones HTTP
+
+Los contadores del pool se alimentan de sus eventos (connect, checkout,
+checkin, invalidate). El tiempo de espera por una conexión libre no
+tiene evento propio, así que se mide en el propio pool (PoolMedido).
+
+Las peticiones se miden con MiddlewareMetricas: latencia, código de estado
+y número y tiempo de las sentencias SQL que ejecutó cada una (eventos
+before/after_cursor_execute del motor). Una petición que repite el mismo
+SELECT muchas veces (patrón N+1) se marca o, en modo estricto, falla. Todo se expone en formato de texto
+de Prometheus con texto_prometheus(). Los valores son de cada proceso: con
+varios workers de uvicorn, Prometheus debe consultar cada uno.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool
+
+
+class MetricasPool:
+    """Estadísticas acumuladas de un pool de conexiones"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.conexiones_creadas = 0
+        self.conexiones_invalidadas = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+        self.uso_total = 0.0
+        self.uso_max = 0.0
+
+    def registrar_espera(self, segundos: float) -> None:
+        """Registra cuánto tardó en obtenerse una conexión"""
+        with self._lock:
+            self.checkouts += 1
+            self.espera_total += segundos
+            self.espera_max = max(self.espera_max, segundos)
+
+    def registrar_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def registrar_uso(self, segundos: float) -> None:
+        """Registra cuánto tiempo estuvo prestada una conexión"""
+        with self._lock:
+            self.uso_total += segundos
+            self.uso_max = max(self.uso_max, segundos)
+
+    def registrar_conexion(self) -> None:
+        with self._lock:
+            self.conexiones_creadas += 1
+
+    def registrar_invalidacion(self) -> None:
+        with self._lock:
+            self.conexiones_invalidadas += 1
+
+    def instantanea(self, pool: Pool) -> dict:
+        """Combina el estado actual del pool con los acumulados"""
+        with self._lock:
+            checkouts = self.checkouts
+            return {
+                "tamano": pool.size(),
+                "en_uso": pool.checkedout(),
+                "disponibles": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "espera_promedio_ms": round(self.espera_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "espera_max_ms": round(self.espera_max * 1000, 3),
+                "uso_promedio_ms": round(self.uso_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "uso_max_ms": round(self.uso_max * 1000, 3),
+                "conexiones_creadas": self.conexiones_creadas,
+                "conexiones_invalidadas": self.conexiones_invalidadas,
+            }
+
+
+class _EsperaMedida:
+    """Mixin para un pool de SQLAlchemy que mide la espera al pedir una conexión"""
+    metricas: MetricasPool
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metricas.registrar_timeout()
+            raise
+        finally:
+            self.metricas.registrar_espera(time.perf_counter() - inicio)
+
+
+def pool_medido(pool_cls: Type[Pool], metricas: MetricasPool) -> Type[Pool]:
+    """
+    Crea una subclase de `pool_cls` que registra sus tiempos de espera en `metricas`.
+    Se usa como poolclass de create_engine; al ser un atributo de clase, las
+    métricas se conservan cuando el motor recrea el pool (engine.dispose()).
+    """
+    return type(f"{pool_cls.__name__}Medido", (_EsperaMedida, pool_cls), {"metricas": metricas})
+
+
+def instrumentar_pool(engine, metricas: MetricasPool) -> None:
+    """Registra los eventos del pool de `engine` (motor síncrono) en `metricas`"""
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        metricas.registrar_conexion()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["prestada_desde"] = time.perf_counter()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        inicio = connection_record.info.pop("prestada_desde", None)
+        if inicio is not None:
+            metricas.registrar_uso(time.perf_counter() - inicio)
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(dbapi_connection, connection_record, exception):
+        metricas.registrar_invalidacion()
+
+
+# Métricas por motor: "sync" siempre, "async" con DB_ASYNC=1
+METRICAS_POOL: Dict[str, MetricasPool] = {}
+
+
+class Histograma:
+    """Histograma acumulativo con límites fijos (como los de Prometheus)"""
+
+    def __init__(self, limites: Sequence[float]):
+        self.limites = list(limites)
+        self.cuentas = [0] * (len(self.limites) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        self.cuentas[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+    def acumulados(self) -> List[Tuple[str, int]]:
+        """
+        Cuentas acumuladas por límite superior, incluido +Inf.
+
+        >>> h = Histograma([0.1, 1])
+        >>> for v in (0.05, 0.1, 0.5, 3):
+        ...     h.observar(v)
+        >>> h.acumulados()
+        [('0.1', 2), ('1', 3), ('+Inf', 4)]
+        """
+        resultado, acumulado = [], 0
+        for limite, cuenta in zip(self.limites + [None], self.cuentas):
+            acumulado += cuenta
+            resultado.append(("+Inf" if limite is None else f"{limite:g}", acumulado))
+        return resultado
+
+
+class SentenciaRepetida(RuntimeError):
+    """Una petición repitió el mismo SELECT más veces de lo permitido (N+1)"""
+
+
+class ConsultasPeticion:
+    """Sentencias SQL ejecutadas durante una petición"""
+
+    def __init__(self):
+        self.cantidad = 0
+        self.segundos = 0.0
+        self.formas: Dict[str, int] = {}
+        self.max_repeticiones = 0
+
+    def contar(self, sentencia: str) -> int:
+        """
+        Cuenta una ejecución de la sentencia. Las sentencias ya llegan
+        parametrizadas, así que su texto es su forma.
+
+        Returns:
+            Veces que se ha ejecutado esa forma en la petición
+        """
+        veces = self.formas.get(sentencia, 0) + 1
+        self.formas[sentencia] = veces
+        self.max_repeticiones = max(self.max_repeticiones, veces)
+        return veces
+
+    def registrar(self, segundos: float) -> None:
+        self.cantidad += 1
+        self.segundos += segundos
+
+
+# Acumulador de la petición en curso. Es un objeto mutable: los hilos del
+# threadpool reciben una copia del contexto, pero con la misma instancia
+CONSULTAS_PETICION: ContextVar[Optional[ConsultasPeticion]] = ContextVar("consultas_peticion", default=None)
+
+
+def instrumentar_sql(engine, max_repeticiones: int = 0, estricto: bool = False) -> None:
+    """
+    Registra el número y la duración de las sentencias de `engine` (motor
+    síncrono) en la petición en curso.
+
+    Args:
+        engine: Motor a instrumentar
+        max_repeticiones: Veces que puede repetirse un mismo SELECT en una
+            petición (0 = no vigilar)
+        estricto: Lanzar SentenciaRepetida al superar max_repeticiones en
+            vez de solo marcar la petición
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        consultas = CONSULTAS_PETICION.get()
+        if consultas is not None and max_repeticiones and statement.lstrip()[:6].upper() == "SELECT":
+            veces = consultas.contar(statement)
+            if estricto and veces > max_repeticiones:
+                raise SentenciaRepetida(
+                    f"Posible N+1: la misma consulta se ejecutó {veces} veces en la petición "
+                    f"(máximo {max_repeticiones}): {' '.join(statement.split())[:300]}"
+                )
+        if context is not None:
+            context.inicio_sql = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        consultas = CONSULTAS_PETICION.get()
+        inicio = getattr(context, "inicio_sql", None)
+        if consultas is not None and inicio is not None:
+            consultas.registrar(time.perf_counter() - inicio)
+
+
+class MetricasHTTP:
+    """Métricas de las peticiones por método y plantilla de ruta (ej: /api/v1/estudiantes/{est_id})"""
+
+    LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    LIMITES_SENTENCIAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+    LIMITES_SQL = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.en_curso = 0
+        self.peticiones: Dict[Tuple[str, str, int], int] = {}
+        self.latencia: Dict[Tuple[str, str], Histograma] = {}
+        self.sentencias: Dict[Tuple[str, str], Histograma] = {}
+        self.tiempo_sql: Dict[Tuple[str, str], Histograma] = {}
+        self.repetidas: Dict[Tuple[str, str], int] = {}
+
+    def iniciar(self) -> None:
+        with self._lock:
+            self.en_curso += 1
+
+    def registrar(self, metodo: str, ruta: str, estado: int, segundos: float,
+                  consultas: ConsultasPeticion, repetida: bool = False) -> None:
+        """Registra una petición terminada (repetida: se marcó como N+1)"""
+        clave = (metodo, ruta)
+        with self._lock:
+            self.en_curso -= 1
+            self.peticiones[(metodo, ruta, estado)] = self.peticiones.get((metodo, ruta, estado), 0) + 1
+            if clave not in self.latencia:
+                self.latencia[clave] = Histograma(self.LIMITES_LATENCIA)
+                self.sentencias[clave] = Histograma(self.LIMITES_SENTENCIAS)
+                self.tiempo_sql[clave] = Histograma(self.LIMITES_SQL)
+            self.latencia[clave].observar(segundos)
+            self.sentencias[clave].observar(consultas.cantidad)
+            self.tiempo_sql[clave].observar(consultas.segundos)
+            if repetida:
+                self.repetidas[clave] = self.repetidas.get(clave, 0) + 1
+
+
+def plantilla_ruta(scope: dict) -> str:
+    """
+    Plantilla de la ruta que atendió la petición, con el prefijo de los routers.
+
+    La plantilla es la de la ruta (scope["route"].path). Según la versión de
+    FastAPI esta no trae el prefijo del include_router (/api/v1): se toma de
+    la URL, que empieza con él, quitándole tantos segmentos como tiene la
+    plantilla (los prefijos son fijos, sin parámetros). Las peticiones que
+    no coinciden con ninguna ruta se agrupan como "sin_ruta".
+
+    >>> class Ruta:
+    ...     path = "/boletin/{est_id}/{quimestre}"
+    >>> plantilla_ruta({"route": Ruta(), "path": "/api/v1/boletin/7/1"})
+    '/api/v1/boletin/{est_id}/{quimestre}'
+    >>> Ruta.path = "/api/v1/boletin/{est_id}/{quimestre}"   # plantilla ya con el prefijo
+    >>> plantilla_ruta({"route": Ruta(), "path": "/api/v1/boletin/7/1"})
+    '/api/v1/boletin/{est_id}/{quimestre}'
+    >>> Ruta.path = "/cursos/{curso_id}/cursos"           # un valor igual a un segmento fijo
+    >>> plantilla_ruta({"route": Ruta(), "path": "/api/v1/cursos/cursos/cursos"})
+    '/api/v1/cursos/{curso_id}/cursos'
+    >>> plantilla_ruta({"path": "/no/existe"})
+    'sin_ruta'
+    """
+    ruta = scope.get("route")
+    plantilla = getattr(ruta, "path", None)
+    if plantilla is None:
+        return "sin_ruta"
+    segmentos = scope["path"].split("/")
+    prefijo = segmentos[:max(len(segmentos) - plantilla.count("/"), 0)]
+    return "/".join(prefijo) + plantilla
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que mide cada petición HTTP en `metricas`.
+
+    La ruta se etiqueta con su plantilla (plantilla_ruta), no con la URL,
+    para que el número de series no crezca con los IDs. Si la petición
+    repitió un mismo SELECT más de `max_repeticiones` veces antes de empezar
+    la respuesta, esta lleva la cabecera X-SQL-Repetida con el número de
+    repeticiones.
+    """
+
+    def __init__(self, app, metricas: MetricasHTTP, max_repeticiones: int = 0):
+        self.app = app
+        self.metricas = metricas
+        self.max_repeticiones = max_repeticiones
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estado = 500
+        consultas = ConsultasPeticion()
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                if self._repetida(consultas):
+                    cabecera = (b"x-sql-repetida", str(consultas.max_repeticiones).encode())
+                    mensaje = {**mensaje, "headers": [*mensaje.get("headers", []), cabecera]}
+            await send(mensaje)
+
+        token = CONSULTAS_PETICION.set(consultas)
+        self.metricas.iniciar()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            CONSULTAS_PETICION.reset(token)
+            self.metricas.registrar(scope["method"], plantilla_ruta(scope), estado,
+                                    time.perf_counter() - inicio, consultas, self._repetida(consultas))
+
+    def _repetida(self, consultas: ConsultasPeticion) -> bool:
+        return bool(self.max_repeticiones) and consultas.max_repeticiones > self.max_repeticiones
+
+
+METRICAS_HTTP = MetricasHTTP()
+
+# Valores de estadisticas_pool() que se exportan: clave -> (métrica, tipo, descripción)
+METRICAS_POOL_PROMETHEUS = {
+    "tamano": ("db_pool_size", "gauge", "Conexiones permanentes del pool"),
+    "en_uso": ("db_pool_checked_out", "gauge", "Conexiones prestadas"),
+    "disponibles": ("db_pool_checked_in", "gauge", "Conexiones libres en el pool"),
+    "overflow": ("db_pool_overflow", "gauge", "Conexiones abiertas por encima del tamaño del pool"),
+    "checkouts": ("db_pool_checkouts_total", "counter", "Conexiones pedidas al pool"),
+    "timeouts": ("db_pool_timeouts_total", "counter", "Esperas por una conexión que superaron pool_timeout"),
+    "conexiones_creadas": ("db_pool_connections_created_total", "counter", "Conexiones abiertas con la BD"),
+    "conexiones_invalidadas": ("db_pool_connections_invalidated_total", "counter", "Conexiones descartadas por error"),
+}
+
+
+def _etiquetas(**valores) -> str:
+    """
+    Etiquetas de una serie en formato Prometheus.
+
+    >>> _etiquetas(route='/a/{id}', status=200)
+    '{route="/a/{id}",status="200"}'
+    >>> print(_etiquetas(route='di "hola"'))
+    {route="di \\"hola\\""}
+    """
+    pares = []
+    for nombre, valor in valores.items():
+        texto = str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pares.append(f'{nombre}="{texto}"')
+    return "{" + ",".join(pares) + "}"
+
+
+def _histograma(lineas: List[str], nombre: str, descripcion: str,
+                series: Dict[Tuple[str, str], Histograma]) -> None:
+    lineas.append(f"# HELP {nombre} {descripcion}")
+    lineas.append(f"# TYPE {nombre} histogram")
+    for (metodo, ruta), histograma in sorted(series.items()):
+        for limite, cuenta in histograma.acumulados():
+            lineas.append(f"{nombre}_bucket{_etiquetas(method=metodo, route=ruta, le=limite)} {cuenta}")
+        lineas.append(f"{nombre}_sum{_etiquetas(method=metodo, route=ruta)} {histograma.suma:.6f}")
+        lineas.append(f"{nombre}_count{_etiquetas(method=metodo, route=ruta)} {histograma.total}")
+
+
+def texto_prometheus(metricas: MetricasHTTP, pools: Dict[str, dict]) -> str:
+    """
+    Genera la exposición en formato de texto de Prometheus (versión 0.0.4).
+
+    Args:
+        metricas: Métricas de las peticiones HTTP
+        pools: Estadísticas de cada motor (config.database.estadisticas_pool())
+
+    Returns:
+        Texto para la respuesta de /metrics
+    """
+    lineas: List[str] = []
+    with metricas._lock:
+        lineas.append("# HELP http_requests_in_flight Peticiones en curso")
+        lineas.append("# TYPE http_requests_in_flight gauge")
+        lineas.append(f"http_requests_in_flight {metricas.en_curso}")
+
+        lineas.append("# HELP http_requests_total Peticiones terminadas por ruta y código de estado")
+        lineas.append("# TYPE http_requests_total counter")
+        for (metodo, ruta, estado), cuenta in sorted(metricas.peticiones.items()):
+            lineas.append(f"http_requests_total{_etiquetas(method=metodo, route=ruta, status=estado)} {cuenta}")
+
+        lineas.append("# HELP http_requests_repeated_sql_total Peticiones que repitieron un mismo SELECT (posible N+1)")
+        lineas.append("# TYPE http_requests_repeated_sql_total counter")
+        for (metodo, ruta), cuenta in sorted(metricas.repetidas.items()):
+            lineas.append(f"http_requests_repeated_sql_total{_etiquetas(method=metodo, route=ruta)} {cuenta}")
+
+        _histograma(lineas, "http_request_duration_seconds",
+                    "Duración de las peticiones", metricas.latencia)
+        _histograma(lineas, "http_request_sql_statements",
+                    "Sentencias SQL ejecutadas por petición", metricas.sentencias)
+        _histograma(lineas, "http_request_sql_duration_seconds",
+                    "Tiempo total en sentencias SQL por petición", metricas.tiempo_sql)
+
+    for clave, (nombre, tipo, descripcion) in METRICAS_POOL_PROMETHEUS.items():
+        lineas.append(f"# HELP {nombre} {descripcion}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+        for motor, estadisticas in sorted(pools.items()):
+            lineas.append(f"{nombre}{_etiquetas(engine=motor)} {estadisticas[clave]}")
+    return "\n".join(lineas) + "\n"
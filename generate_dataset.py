@@ -0,0 +1,358 @@
+"""
+Generador de datos sintéticos a escala para pruebas de carga y benchmarks
+
+Crea una institución completa y coherente: representantes, estudiantes,
+docentes, cursos con sus asignaturas, una matrícula por estudiante, notas
+de cada asignatura en cada quimestre y la asistencia diaria de todo un año
+lectivo. Con la misma semilla y los mismos parámetros el resultado es
+idéntico.
+
+Los datos se escriben con COPY FROM STDIN en una sola transacción, por
+lotes, sin cargar ninguna tabla completa en memoria. Mientras dura la
+carga, calificaciones y asistencias quedan bloqueadas para otras sesiones
+(se les quitan y recrean los índices).
+
+Uso:
+    python generate_dataset.py --limpiar
+    python generate_dataset.py --limpiar --estudiantes 6000 --cursos 150   # ~10M asistencias
+"""
+import argparse
+import csv
+import io
+import random
+import time
+from datetime import date, timedelta
+from typing import Iterable, Iterator, List, Sequence, Tuple
+from config.database import SessionLocal, engine
+from repositories.cache import CANAL_INVALIDACION, TABLAS_CATALOGO
+from services.services import CalificacionService
+
+# Filas por cada COPY
+TAMANO_LOTE = 50_000
+
+NOMBRES = [
+    "Juan", "María", "Carlos", "Rosa", "Pedro", "Ana", "Luis", "Isabel", "Fernando", "Sofía",
+    "Raúl", "Carolina", "Javier", "Daniela", "Miguel", "Valeria", "Roberto", "Alejandra",
+    "Andrés", "Gabriela", "José", "Lucía", "Diego", "Camila", "Mateo", "Paula", "Samuel", "Elena",
+]
+APELLIDOS = [
+    "Pérez", "García", "López", "Martínez", "Rodríguez", "Sánchez", "Fernández", "González",
+    "Ramírez", "Torres", "Díaz", "Moreno", "Jiménez", "Romero", "Castillo", "Herrera", "Campos",
+    "Navarro", "Vega", "Mejía", "Reyes", "Andrade", "Guerrero", "Paredes", "Salazar", "Vera",
+]
+NIVELES = [
+    "Primero Básico", "Segundo Básico", "Tercero Básico", "Cuarto Básico", "Quinto Básico",
+    "Sexto Básico", "Séptimo Básico", "Octavo Básico", "Noveno Básico", "Décimo Básico",
+    "Primero Bachillerato", "Segundo Bachillerato", "Tercero Bachillerato",
+]
+MATERIAS = [
+    "Matemáticas", "Lengua y Literatura", "Ciencias Naturales", "Estudios Sociales", "Inglés",
+    "Educación Física", "Educación Cultural y Artística", "Física", "Química", "Biología",
+    "Historia", "Filosofía",
+]
+TITULOS = ["Licenciado en Ciencias de la Educación", "Magíster en Educación", "Ingeniero", "Doctor"]
+
+# Probabilidades acumuladas de los estados (se elige con random() y el primer umbral superado)
+ESTADOS_MATRICULA = [(0.92, "ACTIVO"), (0.96, "MATRICULADO"), (0.98, "RETIRADO"), (1.0, "SUSPENDIDO")]
+ESTADOS_ASISTENCIA = [(0.90, "PRESENTE"), (0.95, "AUSENTE"), (0.98, "ATRASO"), (1.0, "JUSTIFICADO")]
+
+TABLAS = [
+    "representantes", "estudiantes", "docentes", "cursos", "asignaturas",
+    "matriculas", "calificaciones", "asistencias",
+]
+
+
+def elegir(rng: random.Random, acumuladas: Sequence[Tuple[float, str]]) -> str:
+    """
+    Elige un valor según sus probabilidades acumuladas.
+
+    >>> elegir(random.Random(1), [(0.5, "A"), (1.0, "B")])
+    'A'
+    """
+    r = rng.random()
+    for umbral, valor in acumuladas:
+        if r < umbral:
+            return valor
+    return acumuladas[-1][1]
+
+
+def dias_lectivos(inicio: date, fin: date) -> List[date]:
+    """
+    Días de lunes a viernes entre inicio y fin (inclusive).
+
+    >>> dias_lectivos(date(2024, 9, 6), date(2024, 9, 9))
+    [datetime.date(2024, 9, 6), datetime.date(2024, 9, 9)]
+    """
+    return [
+        inicio + timedelta(days=i) for i in range((fin - inicio).days + 1)
+        if (inicio + timedelta(days=i)).weekday() < 5
+    ]
+
+
+class Generador:
+    """
+    Genera las filas de cada tabla con IDs explícitos a partir de los
+    desplazamientos dados (el máximo ID existente de cada tabla).
+    """
+
+    def __init__(self, semilla: int, estudiantes: int, cursos: int, asignaturas_por_curso: int,
+                 docentes: int, quimestres: int, notas_por_quimestre: int, dias: List[date],
+                 desplazamientos: dict):
+        self.rng = random.Random(semilla)
+        self.total_estudiantes = estudiantes
+        self.total_cursos = cursos
+        self.asignaturas_por_curso = asignaturas_por_curso
+        self.total_docentes = docentes
+        self.quimestres = quimestres
+        self.notas_por_quimestre = notas_por_quimestre
+        self.dias = dias
+        self.d = desplazamientos
+        self.inicio = dias[0]
+        # Curso de cada estudiante (uno por matrícula) y su rendimiento medio
+        self.curso_de = [1 + i % cursos for i in range(estudiantes)]
+        self.rendimiento = [min(10.0, max(3.0, self.rng.gauss(7.5, 1.2))) for _ in range(estudiantes)]
+
+    def _nombre(self) -> Tuple[str, str]:
+        return self.rng.choice(NOMBRES), f"{self.rng.choice(APELLIDOS)} {self.rng.choice(APELLIDOS)}"
+
+    def representantes(self) -> Iterator[tuple]:
+        for i in range(1, self.total_estudiantes + 1):
+            nombre, apellido = self._nombre()
+            yield self.d["representantes"] + i, f"{nombre} {apellido}", f"09{self.rng.randrange(10**8):08d}"
+
+    def estudiantes(self) -> Iterator[tuple]:
+        for i in range(1, self.total_estudiantes + 1):
+            id_ = self.d["estudiantes"] + i
+            nombre, apellido = self._nombre()
+            # Edad acorde al nivel del curso (5 años en Primero Básico)
+            edad = 5 + (self.curso_de[i - 1] - 1) % len(NIVELES)
+            nacimiento = self.inicio - timedelta(days=365 * edad + self.rng.randrange(365))
+            # Las cédulas reales empiezan por el código de provincia (01-24, 30):
+            # el prefijo 9 no choca con datos existentes
+            yield (id_, nombre, apellido, f"9{id_:09d}", nacimiento,
+                   f"estudiante{id_}@sintetico.edu", self.d["representantes"] + i)
+
+    def docentes(self) -> Iterator[tuple]:
+        for i in range(1, self.total_docentes + 1):
+            id_ = self.d["docentes"] + i
+            nombre, apellido = self._nombre()
+            yield id_, nombre, apellido, self.rng.choice(TITULOS), f"docente{id_}@sintetico.edu"
+
+    def cursos(self) -> Iterator[tuple]:
+        for i in range(1, self.total_cursos + 1):
+            nivel = (i - 1) % len(NIVELES)
+            paralelo = chr(ord("A") + (i - 1) // len(NIVELES) % 26)
+            yield self.d["cursos"] + i, f"{nivel + 1}{paralelo}", NIVELES[nivel]
+
+    def asignaturas(self) -> Iterator[tuple]:
+        for curso in range(1, self.total_cursos + 1):
+            for j in range(self.asignaturas_por_curso):
+                i = (curso - 1) * self.asignaturas_por_curso + j + 1
+                materia = MATERIAS[j % len(MATERIAS)]
+                docente = self.d["docentes"] + 1 + (i - 1) % self.total_docentes if self.total_docentes else None
+                descripcion = f"{materia} ({NIVELES[(curso - 1) % len(NIVELES)]})"
+                yield self.d["asignaturas"] + i, materia, descripcion, self.d["cursos"] + curso, docente
+
+    def matriculas(self) -> Iterator[tuple]:
+        for i in range(1, self.total_estudiantes + 1):
+            fecha = self.inicio - timedelta(days=self.rng.randrange(1, 60))
+            yield (self.d["matriculas"] + i, fecha, self.d["estudiantes"] + i,
+                   self.d["cursos"] + self.curso_de[i - 1], elegir(self.rng, ESTADOS_MATRICULA))
+
+    def _asignaturas_de(self, i: int) -> range:
+        """IDs de las asignaturas del curso del estudiante i (1..N)"""
+        primera = self.d["asignaturas"] + (self.curso_de[i - 1] - 1) * self.asignaturas_por_curso + 1
+        return range(primera, primera + self.asignaturas_por_curso)
+
+    def calificaciones(self) -> Iterator[tuple]:
+        for i in range(1, self.total_estudiantes + 1):
+            matricula = self.d["matriculas"] + i
+            media = self.rendimiento[i - 1]
+            for asignatura in self._asignaturas_de(i):
+                for quimestre in range(1, self.quimestres + 1):
+                    for _ in range(self.notas_por_quimestre):
+                        nota = round(min(10.0, max(0.0, self.rng.gauss(media, 1.0))), 1)
+                        yield nota, quimestre, matricula, asignatura
+
+    def asistencias(self) -> Iterator[tuple]:
+        for i in range(1, self.total_estudiantes + 1):
+            matricula = self.d["matriculas"] + i
+            for asignatura in self._asignaturas_de(i):
+                for dia in self.dias:
+                    yield dia, elegir(self.rng, ESTADOS_ASISTENCIA), matricula, asignatura
+
+
+# Tablas grandes que se cargan sin índices secundarios ni claves foráneas:
+# reconstruirlos al final (un recorrido por tabla) es mucho más rápido que
+# mantenerlos fila por fila durante el COPY
+TABLAS_SIN_INDICES = ["calificaciones", "asistencias"]
+
+
+def quitar_indices(cursor, tabla: str) -> List[str]:
+    """
+    Elimina las claves foráneas y los índices que no respaldan restricciones.
+
+    Returns:
+        Sentencias que los vuelven a crear
+    """
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'", (tabla,)
+    )
+    claves = cursor.fetchall()
+    # Solo los índices de esta tabla: archivo.calificaciones y archivo.asistencias
+    # tienen el mismo nombre de tabla en otro esquema
+    cursor.execute(
+        "SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+        "WHERE i.indrelid = %s::regclass "
+        "AND i.indexrelid NOT IN (SELECT conindid FROM pg_constraint WHERE conrelid = %s::regclass)",
+        (tabla, tabla),
+    )
+    indices = cursor.fetchall()
+    for nombre, _ in claves:
+        cursor.execute(f"ALTER TABLE {tabla} DROP CONSTRAINT {nombre}")
+    for nombre, _ in indices:
+        cursor.execute(f"DROP INDEX {nombre}")
+    # En una tabla particionada la definición dice "ON ONLY tabla", que crearía
+    # el índice sin sus particiones
+    return [definicion.replace(" ON ONLY ", " ON ", 1) for _, definicion in indices] + [
+        f"ALTER TABLE {tabla} ADD CONSTRAINT {nombre} {definicion}" for nombre, definicion in claves
+    ]
+
+
+def copiar(cursor, tabla: str, columnas: Sequence[str], filas: Iterable[tuple]) -> int:
+    """
+    Escribe las filas con COPY FROM STDIN en lotes de TAMANO_LOTE.
+
+    Returns:
+        Número de filas copiadas
+    """
+    sentencia = f"COPY {tabla} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT csv)"
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    total = pendientes = 0
+    for fila in filas:
+        escritor.writerow(fila)
+        pendientes += 1
+        if pendientes == TAMANO_LOTE:
+            buffer.seek(0)
+            cursor.copy_expert(sentencia, buffer)
+            buffer.seek(0)
+            buffer.truncate()
+            total += pendientes
+            pendientes = 0
+    if pendientes:
+        buffer.seek(0)
+        cursor.copy_expert(sentencia, buffer)
+        total += pendientes
+    return total
+
+
+def generar_dataset(args) -> None:
+    """Genera y carga el conjunto de datos completo en una transacción"""
+    dias = dias_lectivos(args.inicio, args.fin)
+    if not dias:
+        raise SystemExit("✗ El año lectivo no tiene días de lunes a viernes")
+
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        if args.limpiar:
+            cursor.execute(f"TRUNCATE {', '.join(TABLAS)}, resumen_calificaciones RESTART IDENTITY CASCADE")
+            print("✓ Tablas vaciadas")
+
+        desplazamientos = {}
+        for tabla in TABLAS:
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabla}")
+            desplazamientos[tabla] = cursor.fetchone()[0]
+
+        g = Generador(args.semilla, args.estudiantes, args.cursos, args.asignaturas_por_curso,
+                      args.docentes, args.quimestres, args.notas_por_quimestre, dias, desplazamientos)
+        cargas = [
+            ("representantes", ["id", "nombre", "telefono"], g.representantes()),
+            ("estudiantes", ["id", "nombre", "apellido", "cedula", "fecha_nacimiento", "correo",
+                             "representante_id"], g.estudiantes()),
+            ("docentes", ["id", "nombre", "apellido", "titulo", "correo"], g.docentes()),
+            ("cursos", ["id", "nombre", "nivel"], g.cursos()),
+            ("asignaturas", ["id", "nombre", "descripcion", "curso_id", "docente_id"], g.asignaturas()),
+            ("matriculas", ["id", "fecha", "estudiante_id", "curso_id", "estado"], g.matriculas()),
+            ("calificaciones", ["nota", "quimestre", "matricula_id", "asignatura_id"], g.calificaciones()),
+            ("asistencias", ["fecha", "estado", "matricula_id", "asignatura_id"], g.asistencias()),
+        ]
+        # Los cambios de esquema son parte de la transacción: si algo falla
+        # el rollback restaura los índices y las claves foráneas
+        cursor.execute("SET LOCAL maintenance_work_mem = '256MB'")
+        recrear = {tabla: quitar_indices(cursor, tabla) for tabla in TABLAS_SIN_INDICES}
+        # Una partición por mes del año lectivo (se crean sin índices; los
+        # recrea el paso final sobre la tabla particionada)
+        cursor.execute("SELECT crear_particiones_asistencias(%s, %s)", (args.inicio, args.fin))
+
+        for tabla, columnas, filas in cargas:
+            inicio = time.perf_counter()
+            total = copiar(cursor, tabla, columnas, filas)
+            segundos = time.perf_counter() - inicio
+            print(f"✓ {total:>11,} {tabla:<15} {segundos:7.1f} s  ({total / max(segundos, 1e-9):,.0f} filas/s)")
+
+        inicio = time.perf_counter()
+        for tabla, sentencias in recrear.items():
+            for sentencia in sentencias:
+                cursor.execute(sentencia)
+        print(f"✓ Índices y claves foráneas recreados {time.perf_counter() - inicio:7.1f} s")
+
+        # Las secuencias SERIAL deben continuar después de los IDs explícitos
+        for tabla in TABLAS:
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{tabla}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {tabla}), 0) + 1, false)"
+            )
+        # Los servidores en marcha descartan su caché de catálogos al confirmar
+        for tabla in TABLAS_CATALOGO:
+            cursor.execute("SELECT pg_notify(%s, %s)", (CANAL_INVALIDACION, tabla))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    db = SessionLocal()
+    try:
+        grupos = CalificacionService(db).reconstruir_resumen()
+        print(f"✓ Resumen de calificaciones reconstruido: {grupos:,} grupos")
+    finally:
+        db.close()
+
+    with engine.connect() as conexion:
+        conexion.exec_driver_sql(f"ANALYZE {', '.join(TABLAS)}, resumen_calificaciones")
+    print("✓ Estadísticas actualizadas (ANALYZE)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera una institución sintética y la carga con COPY")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla (mismo valor = mismos datos)")
+    parser.add_argument("--estudiantes", type=int, default=1000, help="Estudiantes (cada uno con su representante y una matrícula)")
+    parser.add_argument("--cursos", type=int, default=26)
+    parser.add_argument("--asignaturas-por-curso", type=int, default=8)
+    parser.add_argument("--docentes", type=int, default=60)
+    parser.add_argument("--quimestres", type=int, default=2, choices=[1, 2, 3])
+    parser.add_argument("--notas-por-quimestre", type=int, default=3)
+    parser.add_argument("--inicio", type=date.fromisoformat, default=date(2024, 9, 2), help="Inicio del año lectivo (AAAA-MM-DD)")
+    parser.add_argument("--fin", type=date.fromisoformat, default=date(2025, 6, 27), help="Fin del año lectivo (AAAA-MM-DD)")
+    parser.add_argument("--limpiar", action="store_true", help="Vaciar todas las tablas antes de cargar")
+    args = parser.parse_args()
+    if args.estudiantes < 1 or args.cursos < 1 or args.asignaturas_por_curso < 1:
+        parser.error("estudiantes, cursos y asignaturas por curso deben ser al menos 1")
+
+    dias = len(dias_lectivos(args.inicio, args.fin))
+    print("=" * 60)
+    print("GENERANDO DATOS SINTÉTICOS")
+    print(f"{args.estudiantes:,} estudiantes, {args.cursos} cursos, {args.asignaturas_por_curso} asignaturas por curso, "
+          f"{dias} días lectivos -> {args.estudiantes * args.asignaturas_por_curso * dias:,} asistencias")
+    print("=" * 60)
+    inicio = time.perf_counter()
+    generar_dataset(args)
+    print(f"\n✅ Datos generados en {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -213,6 +213,16 @@ def insert_seed_data():
         execute_values(cursor, "INSERT INTO calificaciones (nota, quimestre, matricula_id, asignatura_id) VALUES %s", calificaciones_data)
         print("✓ 20 Calificaciones insertadas")
         
+        # 7.1 Calcular el resumen de calificaciones
+        cursor.execute("DELETE FROM resumen_calificaciones")
+        cursor.execute("""
+            INSERT INTO resumen_calificaciones (matricula_id, asignatura_id, quimestre, suma, cantidad, minimo, maximo)
+            SELECT matricula_id, asignatura_id, quimestre, SUM(nota), COUNT(*), MIN(nota), MAX(nota)
+            FROM calificaciones
+            GROUP BY matricula_id, asignatura_id, quimestre
+        """)
+        print("✓ Resumen de calificaciones calculado")
+        
         # 8. Insertar Asistencias (20 registros)
         asistencias_data = [
             ('2024-12-15', 'Presente', 1, 1),
@@ -1,14 +1,29 @@
 from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from config.database import test_connection
+from config.database import engine, test_connection, estadisticas_pool
+from config.settings import CACHE_ESCUCHAR, DB_MAX_REPETICIONES
+from config.metricas import METRICAS_HTTP, MiddlewareMetricas, texto_prometheus
+from repositories.cache import EscuchaInvalidaciones, backend_cache
 from routes import api_router
+from contextlib import asynccontextmanager
+from services.pruebas import EJECUCION_PRUEBAS, pagina_en_curso, revision_codigo
 from typing import List
-import sys
-import io
 from utils import calcular_promedio
 
 
+@asynccontextmanager
+async def ciclo_de_vida(app: FastAPI):
+    """Arranca la escucha de invalidaciones de la caché mientras el worker está activo"""
+    escucha = None
+    if CACHE_ESCUCHAR and backend_cache() is not None:
+        escucha = EscuchaInvalidaciones(engine)
+        escucha.start()
+    yield
+    if escucha is not None:
+        escucha.detener()
+
+
 # Crear la aplicación FastAPI
 app = FastAPI(
     title="Sistema de Gestión Educativa",
@@ -16,7 +31,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=ciclo_de_vida,
 )
 
 # Agregar CORS middleware
@@ -26,8 +42,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Estimated", "X-SQL-Repetida", "ETag"],
 )
 
+# Latencia, códigos de estado y sentencias SQL por ruta (expuestos en /metrics),
+# marcando las peticiones que repiten un mismo SELECT (N+1)
+app.add_middleware(MiddlewareMetricas, metricas=METRICAS_HTTP, max_repeticiones=DB_MAX_REPETICIONES)
+
 # Incluir el router principal
 app.include_router(api_router)
 
@@ -68,6 +89,29 @@ def health_check():
         }
     }
 
+
+@app.get("/metrics/pool", tags=["Métricas"])
+def metricas_pool():
+    """
+    Estado del pool de conexiones de cada motor: conexiones en uso,
+    disponibles y en overflow, más los tiempos de espera y de uso
+    acumulados desde el arranque del proceso
+    """
+    return estadisticas_pool()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Métricas"])
+def metricas_prometheus():
+    """
+    Métricas en formato de texto de Prometheus: latencia por ruta, peticiones
+    en curso, códigos de estado, número y tiempo de las sentencias SQL por
+    petición y estado del pool de conexiones
+    """
+    return PlainTextResponse(
+        texto_prometheus(METRICAS_HTTP, estadisticas_pool()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
 # --- ENDPOINTS DE PRUEBAS Y COBERTURA (Requisito 7.2 y 7.3.2) ---
 
 @app.post("/calcular-promedio", tags=["Pruebas Unitarias"])
@@ -82,55 +126,53 @@ def api_calcular_promedio(notas: List[float]):
 @app.get("/ejecutar-pruebas", response_class=HTMLResponse, tags=["Pruebas Unitarias"])
 def api_run_tests():
     """
-    Ejecuta las pruebas unitarias y de cobertura.
-    
+    Reporte de las pruebas unitarias y de cobertura del código actual.
+
     Herramientas utilizadas:
     - **Doctest, Unittest, Pytest**: Ejecución de pruebas.
     - **Mockito**: Simulación de dependencias (Mocks).
     - **Coverage**: Análisis de cobertura (Requisito > 60%).
+
+    Las pruebas corren en un subproceso en segundo plano. Si ya hay reporte
+    para esta revisión del código se devuelve al instante; si no, se lanza
+    la ejecución y se muestra una página que se recarga hasta que termine.
+    Si la última ejecución de esta revisión falló, se muestra el error y se
+    vuelve a lanzar (recargar la página muestra el progreso).
     """
-    import pytest
-    # Capturar la salida estándar (stdout)
-    buffer = io.StringIO()
-    sys.stdout = buffer
-    
-    # Ejecutar pytest: -v (verbose), --cov (cobertura), -s (permitir captura de stdout)
-    # Se asume que .coveragerc ya está configurado en el directorio raíz
-    pytest.main(["-v", "--cov", "--cov-report=term-missing", "--doctest-modules", "--ignore=routes", "-s"])
-    
-    # Restaurar stdout y devolver contenido
-    sys.stdout = sys.__stdout__
-    output = buffer.getvalue()
-    
-    # Analizar el resultado para determinar el color del encabezado
-    header_color = "#4ec9b0" # Color por defecto
-    status_title = "Reporte de Ejecución de Pruebas"
-    
-    if "FAIL Required test coverage" in output:
-        header_color = "#ff5555" # Rojo si falla la cobertura
-        status_title = "⚠️ FALLO: Cobertura menor al 60%"
-    elif "Required test coverage" in output and "reached" in output:
-        header_color = "#50fa7b" # Verde si pasa
-        status_title = "✅ ÉXITO: Cobertura superior al 60%"
-
-    return f"""
-    <html>
-        <head>
-            <title>Reporte de Pruebas</title>
-            <style>
-                body {{ background-color: #1e1e1e; color: #d4d4d4; font-family: 'Consolas', 'Monaco', monospace; padding: 20px; }}
-                pre {{ white-space: pre-wrap; background-color: #2d2d2d; padding: 15px; border-radius: 5px; border: 1px solid #444; }}
-                h1 {{ color: {header_color}; border-bottom: 1px solid #444; padding-bottom: 10px; }}
-                .subtitle {{ color: #888; margin-bottom: 20px; font-size: 0.9em; }}
-            </style>
-        </head>
-        <body>
-            <h1>{status_title}</h1>
-            <div class="subtitle">Herramientas: Doctest, Unittest, Pytest, Coverage, Mockito</div>
-            <pre>{output}</pre>
-        </body>
-    </html>
+    revision = revision_codigo()
+    reporte = EJECUCION_PRUEBAS.reporte(revision)
+    if reporte is not None:
+        return reporte
+    estado = EJECUCION_PRUEBAS.estado(revision)
+    if estado["estado"] == "error":
+        # Se muestra el error de la ejecución anterior y se reintenta
+        EJECUCION_PRUEBAS.iniciar(revision=revision)
+    elif estado["estado"] == "pendiente":
+        estado = EJECUCION_PRUEBAS.iniciar(revision=revision)
+    return pagina_en_curso(estado)
+
+
+@app.post("/ejecutar-pruebas", status_code=202, tags=["Pruebas Unitarias"])
+def iniciar_pruebas(forzar: bool = False):
+    """
+    Lanza las pruebas en segundo plano y responde sin esperar a que terminen.
+
+    - **forzar**: Volver a ejecutarlas aunque ya haya reporte para esta revisión
+
+    Si ya hay una ejecución en curso no se lanza otra; se devuelve su estado.
+    El progreso se consulta en /ejecutar-pruebas/estado y el reporte en
+    GET /ejecutar-pruebas.
+    """
+    return EJECUCION_PRUEBAS.iniciar(forzar=forzar)
+
+
+@app.get("/ejecutar-pruebas/estado", tags=["Pruebas Unitarias"])
+def estado_pruebas():
+    """
+    Estado de la ejecución de las pruebas para la revisión actual del código:
+    pendiente, en_curso, terminado o error.
     """
+    return EJECUCION_PRUEBAS.estado()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+"""
+Mantenimiento de las particiones mensuales de asistencias
+
+Crea las particiones de los meses que vienen (y las de un rango dado) y
+muestra las existentes. Conviene ejecutarlo una vez al mes, por ejemplo
+con cron: las fechas sin partición van a asistencias_default, donde las
+consultas por rango de fechas ya no pueden descartar la tabla.
+
+Uso:
+    python manage_partitions.py                    # hasta 12 meses adelante
+    python manage_partitions.py --meses 24
+    python manage_partitions.py --desde 2023-09-01 --hasta 2024-06-30
+    python manage_partitions.py --listar
+"""
+import argparse
+from datetime import date
+from config.database import SessionLocal
+from repositories.particiones import PARTICION_POR_DEFECTO, ParticionesRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crea y lista las particiones mensuales de asistencias")
+    parser.add_argument("--meses", type=int, default=12, help="Meses adelante desde el actual")
+    parser.add_argument("--desde", type=date.fromisoformat, help="Crear desde este mes (AAAA-MM-DD)")
+    parser.add_argument("--hasta", type=date.fromisoformat, help="Crear hasta este mes (AAAA-MM-DD)")
+    parser.add_argument("--listar", action="store_true", help="Solo listar las particiones")
+    args = parser.parse_args()
+    if (args.desde is None) != (args.hasta is None):
+        parser.error("--desde y --hasta van juntos")
+    if args.meses < 0:
+        parser.error("--meses no puede ser negativo")
+
+    db = SessionLocal()
+    try:
+        repo = ParticionesRepository(db)
+        if not args.listar:
+            if args.desde is not None:
+                creadas = repo.crear(args.desde, args.hasta)
+            else:
+                creadas = repo.asegurar(args.meses)
+            print(f"✓ Particiones creadas: {creadas}")
+
+        for particion in repo.listar():
+            print(f"  {particion.nombre:<24} {particion.filas:>12,}  {particion.rango}")
+        sin_particion = repo.filas_sin_particion()
+        if sin_particion:
+            print(f"⚠️  {sin_particion:,} filas en {PARTICION_POR_DEFECTO}: crear las particiones de sus meses")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+-- ============================================================================
+-- MIGRACIÓN 001: ÍNDICES PARA LAS BÚSQUEDAS FRECUENTES
+-- Para bases de datos creadas antes de que los scripts de instalación
+-- incluyeran estos índices (las instalaciones nuevas ya los tienen).
+--
+-- Ejecutar con psql (sin transacción explícita):
+--   psql -d unidad_educativa -f migrations/001_indices_busquedas.sql
+--
+-- CREATE INDEX CONCURRENTLY no bloquea las escrituras mientras se construye
+-- el índice, pero no puede ejecutarse dentro de un bloque BEGIN/COMMIT.
+-- Si una construcción se interrumpe, el índice queda marcado como inválido:
+-- eliminarlo (DROP INDEX CONCURRENTLY ...) y volver a ejecutar el script.
+-- ============================================================================
+
+-- 1. Matrículas duplicadas (mismo estudiante y curso).
+--    Deben corregirse antes del paso 2: esta consulta debe devolver 0 filas.
+SELECT estudiante_id, curso_id, COUNT(*) AS repeticiones
+FROM matriculas
+GROUP BY estudiante_id, curso_id
+HAVING COUNT(*) > 1;
+
+-- 2. Matrícula única por estudiante y curso
+--    (también sirve las búsquedas por estudiante)
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_matricula_estudiante_curso
+    ON matriculas (estudiante_id, curso_id);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'uq_matricula_estudiante_curso'
+    ) THEN
+        ALTER TABLE matriculas
+            ADD CONSTRAINT uq_matricula_estudiante_curso
+            UNIQUE USING INDEX uq_matricula_estudiante_curso;
+    END IF;
+END $$;
+
+-- 3. Matrículas por curso (y estado) y por estado
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_matriculas_curso_estado ON matriculas (curso_id, estado);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_matriculas_estado ON matriculas (estado);
+
+-- 4. Calificaciones por matrícula / grupo del resumen y por asignatura
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calificaciones_matricula_asignatura_quimestre
+    ON calificaciones (matricula_id, asignatura_id, quimestre);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calificaciones_asignatura ON calificaciones (asignatura_id);
+
+-- 5. Asistencias por asignatura o matrícula y rango de fechas
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_asistencias_asignatura_fecha ON asistencias (asignatura_id, fecha);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_asistencias_matricula_fecha ON asistencias (matricula_id, fecha);
+
+-- 6. Claves foráneas usadas en joins y en borrados del registro padre
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_estudiantes_representante_id ON estudiantes (representante_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_asignaturas_curso_id ON asignaturas (curso_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_asignaturas_docente_id ON asignaturas (docente_id);
+
+-- 7. Estadísticas actualizadas para que el planificador use los índices
+ANALYZE matriculas;
+ANALYZE calificaciones;
+ANALYZE asistencias;
+ANALYZE estudiantes;
+ANALYZE asignaturas;
@@ -0,0 +1,51 @@
+-- ============================================================================
+-- MIGRACIÓN 002: VERSIÓN DE LAS TABLAS PARA EL GET CONDICIONAL
+-- Para bases de datos creadas antes de que los scripts de instalación
+-- incluyeran versiones_tablas (las instalaciones nuevas ya la tienen).
+--
+-- Ejecutar con psql:
+--   psql -d unidad_educativa -f migrations/002_versiones_tablas.sql
+--
+-- Las rutas GET de estudiantes, cursos y asignaturas responden con ETag y
+-- Last-Modified tomados de esta tabla, y con 304 si el cliente ya tiene la
+-- versión actual. Un trigger por sentencia (no por fila) la incrementa en
+-- cada escritura, así que una carga masiva la actualiza una sola vez.
+-- ============================================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS versiones_tablas (
+    tabla VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    modificado TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- modificado es la hora de la escritura (clock_timestamp; now() sería el
+-- inicio de la transacción) y nunca retrocede: una transacción que empezó
+-- antes que otra ya confirmada no debe dejar un Last-Modified anterior
+CREATE OR REPLACE FUNCTION registrar_version_tabla() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO versiones_tablas (tabla, version, modificado) VALUES (TG_TABLE_NAME, 1, clock_timestamp())
+    ON CONFLICT (tabla) DO UPDATE
+        SET version = versiones_tablas.version + 1,
+            modificado = greatest(versiones_tablas.modificado, clock_timestamp());
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tr_version_estudiantes ON estudiantes;
+DROP TRIGGER IF EXISTS tr_version_cursos ON cursos;
+DROP TRIGGER IF EXISTS tr_version_asignaturas ON asignaturas;
+
+CREATE TRIGGER tr_version_estudiantes AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON estudiantes
+    FOR EACH STATEMENT EXECUTE FUNCTION registrar_version_tabla();
+CREATE TRIGGER tr_version_cursos AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON cursos
+    FOR EACH STATEMENT EXECUTE FUNCTION registrar_version_tabla();
+CREATE TRIGGER tr_version_asignaturas AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON asignaturas
+    FOR EACH STATEMENT EXECUTE FUNCTION registrar_version_tabla();
+
+-- Fila inicial para las tablas que aún no han tenido escrituras
+INSERT INTO versiones_tablas (tabla) VALUES ('estudiantes'), ('cursos'), ('asignaturas')
+ON CONFLICT (tabla) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,71 @@
+-- ============================================================================
+-- MIGRACIÓN 003: BORRADO EN CASCADA EN LA BASE DE DATOS
+-- Para bases de datos creadas antes de que los scripts de instalación
+-- declararan las claves foráneas con ON DELETE CASCADE (las instalaciones
+-- nuevas ya las tienen).
+--
+-- Ejecutar con psql:
+--   psql -d unidad_educativa -f migrations/003_borrado_en_cascada.sql
+--
+-- Antes, al eliminar un estudiante o una matrícula el ORM cargaba todas sus
+-- matrículas, calificaciones y asistencias y las borraba una por una. Con
+-- ON DELETE CASCADE (y passive_deletes=True en los modelos) basta un DELETE
+-- del registro padre; la BD borra los hijos usando los índices de sus
+-- claves foráneas.
+--
+-- Se conserva el comportamiento anterior: eliminar un docente elimina sus
+-- asignaturas, igual que hacía el ORM (cascade="all, delete-orphan").
+-- ============================================================================
+
+-- 1. Reemplazar cada clave foránea (sea cual sea su nombre actual) por una
+--    con ON DELETE CASCADE. NOT VALID evita revisar ahora todas las filas
+--    con un bloqueo que detendría las escrituras; ya cumplían la clave anterior.
+BEGIN;
+
+DO $$
+DECLARE
+    fk RECORD;
+    anterior TEXT;
+BEGIN
+    FOR fk IN
+        SELECT * FROM (VALUES
+            ('asignaturas',    'curso_id',      'cursos',      'fk_asignatura_curso'),
+            ('asignaturas',    'docente_id',    'docentes',    'fk_asignatura_docente'),
+            ('matriculas',     'estudiante_id', 'estudiantes', 'fk_matricula_estudiante'),
+            ('matriculas',     'curso_id',      'cursos',      'fk_matricula_curso'),
+            ('calificaciones', 'matricula_id',  'matriculas',  'fk_calificacion_matricula'),
+            ('calificaciones', 'asignatura_id', 'asignaturas', 'fk_calificacion_asignatura'),
+            ('asistencias',    'matricula_id',  'matriculas',  'fk_asistencia_matricula'),
+            ('asistencias',    'asignatura_id', 'asignaturas', 'fk_asistencia_asignatura')
+        ) AS claves (tabla, columna, referencia, nombre)
+    LOOP
+        FOR anterior IN
+            SELECT c.conname
+            FROM pg_constraint c
+            JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey)
+            WHERE c.contype = 'f'
+              AND c.conrelid = fk.tabla::regclass
+              AND a.attname = fk.columna
+        LOOP
+            EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', fk.tabla, anterior);
+        END LOOP;
+
+        EXECUTE format(
+            'ALTER TABLE %I ADD CONSTRAINT %I FOREIGN KEY (%I) REFERENCES %I(id) ON DELETE CASCADE NOT VALID',
+            fk.tabla, fk.nombre, fk.columna, fk.referencia
+        );
+    END LOOP;
+END $$;
+
+COMMIT;
+
+-- 2. Validar las claves. VALIDATE CONSTRAINT no bloquea las escrituras
+--    mientras recorre la tabla.
+ALTER TABLE asignaturas VALIDATE CONSTRAINT fk_asignatura_curso;
+ALTER TABLE asignaturas VALIDATE CONSTRAINT fk_asignatura_docente;
+ALTER TABLE matriculas VALIDATE CONSTRAINT fk_matricula_estudiante;
+ALTER TABLE matriculas VALIDATE CONSTRAINT fk_matricula_curso;
+ALTER TABLE calificaciones VALIDATE CONSTRAINT fk_calificacion_matricula;
+ALTER TABLE calificaciones VALIDATE CONSTRAINT fk_calificacion_asignatura;
+ALTER TABLE asistencias VALIDATE CONSTRAINT fk_asistencia_matricula;
+ALTER TABLE asistencias VALIDATE CONSTRAINT fk_asistencia_asignatura;
@@ -0,0 +1,42 @@
+-- ============================================================================
+-- MIGRACIÓN 004: BÚSQUEDA APROXIMADA DE PERSONAS
+-- Para bases de datos creadas antes de que los scripts de instalación
+-- incluyeran los índices de trigramas (las instalaciones nuevas ya los tienen).
+--
+-- Ejecutar con psql (sin transacción explícita):
+--   psql -d unidad_educativa -f migrations/004_busqueda_personas.sql
+--
+-- GET /api/v1/search busca por nombre, apellido, cédula, correo y teléfono
+-- con los operadores de pg_trgm (similitud de trigramas e ILIKE). Los
+-- índices GIN se construyen sobre texto_busqueda(...), la misma expresión
+-- que usa BusquedaRepository; si se cambian las columnas hay que cambiar
+-- ambos lados.
+--
+-- CREATE EXTENSION requiere un usuario con permiso para crearla (en
+-- PostgreSQL 13+ pg_trgm es "trusted" y basta el dueño de la base).
+-- Si una construcción se interrumpe, el índice queda marcado como inválido:
+-- eliminarlo (DROP INDEX CONCURRENTLY ...) y volver a ejecutar el script.
+-- ============================================================================
+
+-- 1. Extensión y función del texto en el que se busca
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION texto_busqueda(VARIADIC partes TEXT[]) RETURNS TEXT AS $$
+    SELECT array_to_string(partes, ' ')
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- 2. Índices de trigramas (no bloquean las escrituras mientras se construyen)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_estudiantes_busqueda ON estudiantes
+    USING gin (texto_busqueda(nombre, apellido, cedula, correo) gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_docentes_busqueda ON docentes
+    USING gin (texto_busqueda(nombre, apellido, correo) gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_representantes_busqueda ON representantes
+    USING gin (texto_busqueda(nombre, telefono) gin_trgm_ops);
+
+-- 3. Búsqueda exacta por teléfono (get_by_telefono)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_representantes_telefono ON representantes (telefono);
+
+-- 4. Estadísticas actualizadas para que el planificador use los índices
+ANALYZE estudiantes;
+ANALYZE docentes;
+ANALYZE representantes;
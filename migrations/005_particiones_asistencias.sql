@@ -0,0 +1,153 @@
+-- ============================================================================
+-- MIGRACIÓN 005: PARTICIONES MENSUALES DE ASISTENCIAS
+-- Para bases de datos creadas antes de que los scripts de instalación
+-- declararan asistencias como tabla particionada por fecha (las
+-- instalaciones nuevas ya la tienen).
+--
+-- Ejecutar con psql (sin transacción explícita):
+--   psql -d unidad_educativa -f migrations/005_particiones_asistencias.sql
+--
+-- asistencias pasa a ser una tabla particionada por rango de fecha, con una
+-- partición por mes (asistencias_AAAA_MM) y una por defecto para las fechas
+-- que aún no tienen partición. Las consultas con rango de fechas solo leen
+-- los meses pedidos y los años cerrados pueden archivarse por partición.
+--
+-- Las filas actuales no se copian: la tabla existente se renombra a
+-- asistencias_historico y se adjunta como la partición de todas las fechas
+-- anteriores al mes siguiente al último registro. Los pasos largos
+-- (índice y validación) no bloquean las escrituras; el cambio de nombre y
+-- el ATTACH del paso 3 son instantáneos.
+--
+-- La clave primaria pasa a ser (id, fecha): PostgreSQL exige que incluya la
+-- clave de partición. id lo sigue asignando la misma secuencia.
+--
+-- Si se vuelve a ejecutar sobre una tabla ya particionada, el paso 1 falla
+-- ("cannot create index on partitioned table ... concurrently") y los
+-- demás pasos no cambian nada.
+-- ============================================================================
+
+-- 1. Índice único (id, fecha) en la tabla actual, que será la clave primaria
+--    de su partición
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS asistencias_historico_id_fecha
+    ON asistencias (id, fecha);
+
+-- 2. Restricción con el rango de la partición histórica. Validada de
+--    antemano, el ATTACH del paso 3 no necesita recorrer la tabla.
+DO $$
+DECLARE
+    limite DATE;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'asistencias'::regclass) = 'r'
+       AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'ck_asistencias_historico_rango') THEN
+        SELECT greatest(date_trunc('month', current_date), date_trunc('month', max(fecha)))
+               + INTERVAL '1 month'
+        INTO limite FROM asistencias;
+        EXECUTE format('ALTER TABLE asistencias ADD CONSTRAINT ck_asistencias_historico_rango '
+                       'CHECK (fecha < %L) NOT VALID', limite);
+    END IF;
+END $$;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'ck_asistencias_historico_rango'
+                                             AND NOT convalidated) THEN
+        ALTER TABLE asistencias VALIDATE CONSTRAINT ck_asistencias_historico_rango;
+    END IF;
+END $$;
+
+-- 3. Tabla particionada, la tabla actual como partición histórica y la
+--    partición por defecto
+BEGIN;
+
+DO $$
+DECLARE
+    limite DATE;
+    clave TEXT;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'asistencias'::regclass) = 'p' THEN
+        RETURN;
+    END IF;
+
+    SELECT substring(pg_get_constraintdef(oid) FROM '\d{4}-\d{2}-\d{2}')::date INTO limite
+    FROM pg_constraint WHERE conname = 'ck_asistencias_historico_rango';
+
+    ALTER TABLE asistencias RENAME TO asistencias_historico;
+    ALTER INDEX ix_asistencias_asignatura_fecha RENAME TO asistencias_historico_asignatura_fecha;
+    ALTER INDEX ix_asistencias_matricula_fecha RENAME TO asistencias_historico_matricula_fecha;
+
+    -- Una tabla solo admite una clave primaria: la de id se reemplaza por la
+    -- de (id, fecha), usando el índice del paso 1 sin volver a construirlo
+    SELECT conname INTO clave FROM pg_constraint
+    WHERE conrelid = 'asistencias_historico'::regclass AND contype = 'p';
+    IF clave IS NOT NULL THEN
+        EXECUTE format('ALTER TABLE asistencias_historico DROP CONSTRAINT %I', clave);
+    END IF;
+    ALTER TABLE asistencias_historico ADD CONSTRAINT asistencias_historico_id_fecha
+        PRIMARY KEY USING INDEX asistencias_historico_id_fecha;
+
+    CREATE TABLE asistencias (
+        id INT NOT NULL DEFAULT nextval('asistencias_id_seq'),
+        fecha DATE NOT NULL DEFAULT CURRENT_DATE,
+        estado estado_asistencia NOT NULL,
+        matricula_id INT NOT NULL,
+        asignatura_id INT NOT NULL,
+        CONSTRAINT pk_asistencias PRIMARY KEY (id, fecha),
+        CONSTRAINT fk_asistencia_matricula FOREIGN KEY (matricula_id) REFERENCES matriculas(id) ON DELETE CASCADE,
+        CONSTRAINT fk_asistencia_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id) ON DELETE CASCADE
+    ) PARTITION BY RANGE (fecha);
+    ALTER SEQUENCE asistencias_id_seq OWNED BY asistencias.id;
+    CREATE INDEX ix_asistencias_asignatura_fecha ON asistencias (asignatura_id, fecha);
+    CREATE INDEX ix_asistencias_matricula_fecha ON asistencias (matricula_id, fecha);
+
+    -- Los índices y claves foráneas equivalentes de la tabla anterior se
+    -- adjuntan a los de la nueva en lugar de crearse otra vez
+    EXECUTE format('ALTER TABLE asistencias ATTACH PARTITION asistencias_historico '
+                   'FOR VALUES FROM (MINVALUE) TO (%L)', limite);
+    ALTER TABLE asistencias_historico DROP CONSTRAINT ck_asistencias_historico_rango;
+
+    CREATE TABLE asistencias_default PARTITION OF asistencias DEFAULT;
+END $$;
+
+COMMIT;
+
+-- 4. Función de mantenimiento y particiones de los próximos 12 meses
+--    (después, manage_partitions.py crea las que vayan haciendo falta).
+--    Mientras mueve las filas de un mes y adjunta su partición,
+--    asistencias_default queda bloqueada hasta el commit: para escrituras
+--    (ninguna fila del mes entra entre el DELETE y el ATTACH) y, desde el
+--    ATTACH, también para lecturas.
+CREATE OR REPLACE FUNCTION crear_particiones_asistencias(desde DATE, hasta DATE) RETURNS INT AS $$
+DECLARE
+    mes DATE := date_trunc('month', desde)::date;
+    siguiente DATE;
+    particion TEXT;
+    creadas INT := 0;
+BEGIN
+    -- Un solo creador a la vez (ej: dos tareas de mantenimiento simultáneas)
+    PERFORM pg_advisory_xact_lock(hashtext('crear_particiones_asistencias'));
+    WHILE mes <= hasta LOOP
+        siguiente := (mes + INTERVAL '1 month')::date;
+        particion := 'asistencias_' || to_char(mes, 'YYYY_MM');
+        IF to_regclass(particion) IS NULL THEN
+            BEGIN
+                EXECUTE format('CREATE TABLE %I (LIKE asistencias INCLUDING DEFAULTS)', particion);
+                LOCK TABLE asistencias_default IN SHARE ROW EXCLUSIVE MODE;
+                EXECUTE format('WITH movidas AS (DELETE FROM asistencias_default WHERE fecha >= %L AND fecha < %L RETURNING *) '
+                               'INSERT INTO %I SELECT * FROM movidas', mes, siguiente, particion);
+                EXECUTE format('ALTER TABLE asistencias ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                               particion, mes, siguiente);
+                creadas := creadas + 1;
+            EXCEPTION WHEN invalid_object_definition THEN
+                NULL;  -- El mes ya está dentro del rango de otra partición
+            END;
+        END IF;
+        mes := siguiente;
+    END LOOP;
+    RETURN creadas;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT crear_particiones_asistencias(current_date, (current_date + INTERVAL '12 months')::date);
+
+-- 5. Estadísticas de la tabla particionada para el planificador
+ANALYZE asistencias;
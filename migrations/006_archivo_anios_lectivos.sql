@@ -0,0 +1,56 @@
+-- ============================================================================
+-- MIGRACIÓN 006: ARCHIVO DE AÑOS LECTIVOS CERRADOS
+-- Para bases de datos creadas antes de que los scripts de instalación
+-- incluyeran el esquema archivo (las instalaciones nuevas ya lo tienen).
+--
+-- Ejecutar con psql:
+--   psql -d unidad_educativa -f migrations/006_archivo_anios_lectivos.sql
+--
+-- Crea las tablas vacías archivo.matriculas, archivo.calificaciones y
+-- archivo.asistencias, con las mismas columnas que las tablas en uso (más
+-- el año lectivo y la fecha de archivo en las matrículas). Después,
+-- archive_school_year.py mueve a ellas los años lectivos terminados.
+-- Puede volver a ejecutarse: no cambia lo que ya existe.
+-- ============================================================================
+
+CREATE SCHEMA IF NOT EXISTS archivo;
+
+CREATE TABLE IF NOT EXISTS archivo.matriculas (
+    id INT PRIMARY KEY,
+    fecha DATE NOT NULL,
+    estudiante_id INT NOT NULL,
+    curso_id INT NOT NULL,
+    estado estado_matricula NOT NULL,
+    anio_lectivo INT NOT NULL,
+    archivado TIMESTAMPTZ NOT NULL DEFAULT now(),
+    CONSTRAINT fk_matricula_archivada_estudiante FOREIGN KEY (estudiante_id) REFERENCES estudiantes(id) ON DELETE CASCADE,
+    CONSTRAINT fk_matricula_archivada_curso FOREIGN KEY (curso_id) REFERENCES cursos(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS archivo.calificaciones (
+    id INT PRIMARY KEY,
+    nota FLOAT NOT NULL,
+    quimestre INT NOT NULL,
+    matricula_id INT NOT NULL,
+    asignatura_id INT NOT NULL,
+    CONSTRAINT fk_calificacion_archivada_matricula FOREIGN KEY (matricula_id) REFERENCES archivo.matriculas(id) ON DELETE CASCADE,
+    CONSTRAINT fk_calificacion_archivada_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS archivo.asistencias (
+    id INT PRIMARY KEY,
+    fecha DATE NOT NULL,
+    estado estado_asistencia NOT NULL,
+    matricula_id INT NOT NULL,
+    asignatura_id INT NOT NULL,
+    CONSTRAINT fk_asistencia_archivada_matricula FOREIGN KEY (matricula_id) REFERENCES archivo.matriculas(id) ON DELETE CASCADE,
+    CONSTRAINT fk_asistencia_archivada_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS ix_matriculas_archivadas_estudiante ON archivo.matriculas (estudiante_id);
+CREATE INDEX IF NOT EXISTS ix_matriculas_archivadas_curso ON archivo.matriculas (curso_id);
+CREATE INDEX IF NOT EXISTS ix_matriculas_archivadas_anio ON archivo.matriculas (anio_lectivo);
+CREATE INDEX IF NOT EXISTS ix_calificaciones_archivadas_matricula ON archivo.calificaciones (matricula_id, asignatura_id, quimestre);
+CREATE INDEX IF NOT EXISTS ix_calificaciones_archivadas_asignatura ON archivo.calificaciones (asignatura_id);
+CREATE INDEX IF NOT EXISTS ix_asistencias_archivadas_matricula_fecha ON archivo.asistencias (matricula_id, fecha);
+CREATE INDEX IF NOT EXISTS ix_asistencias_archivadas_asignatura_fecha ON archivo.asistencias (asignatura_id, fecha);
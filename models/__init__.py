@@ -12,6 +12,9 @@ from models.asignatura import Asignatura
 from models.matricula import Matricula
 from models.asistencia import Asistencia
 from models.calificacion import Calificacion
+from models.resumen_calificacion import ResumenCalificacion
+from models.version_tabla import VersionTabla
+from models.archivo import MatriculaArchivada, CalificacionArchivada, AsistenciaArchivada
 
 __all__ = [
     "EstadoMatricula",
@@ -24,4 +27,9 @@ __all__ = [
     "Matricula",
     "Asistencia",
     "Calificacion",
+    "ResumenCalificacion",
+    "VersionTabla",
+    "MatriculaArchivada",
+    "CalificacionArchivada",
+    "AsistenciaArchivada",
 ]
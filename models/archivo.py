@@ -0,0 +1,102 @@
+"""
+Modelos del archivo de años lectivos cerrados (esquema archivo)
+
+archive_school_year.py mueve aquí las matrículas de un año lectivo
+terminado junto con sus calificaciones y asistencias, para que las tablas
+en uso solo tengan los años recientes. Las tablas tienen las mismas
+columnas y los mismos ids que las originales, y las relaciones se llaman
+igual: los schemas de lectura (MatriculaRead, CalificacionRead,
+AsistenciaRead) y ?include= sirven para ambas.
+"""
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, Enum, Index, func
+from sqlalchemy.orm import relationship
+from config.database import Base, CARGA_RELACIONES
+from models.enums import EstadoMatricula, EstadoAsistencia
+
+ESQUEMA_ARCHIVO = "archivo"
+
+
+class MatriculaArchivada(Base):
+    """
+    Modelo para la tabla archivo.matriculas.
+    Matrícula de un año lectivo archivado.
+    """
+    __tablename__ = "matriculas"
+    __table_args__ = (
+        Index("ix_matriculas_archivadas_estudiante", "estudiante_id"),
+        Index("ix_matriculas_archivadas_curso", "curso_id"),
+        Index("ix_matriculas_archivadas_anio", "anio_lectivo"),
+        {"schema": ESQUEMA_ARCHIVO},
+    )
+
+    # Se devuelve en MatriculaRead.archivada (en Matricula no existe: False)
+    archivada = True
+
+    id = Column(Integer, primary_key=True)
+    fecha = Column(Date, nullable=False)
+    estudiante_id = Column(Integer, ForeignKey("estudiantes.id", ondelete="CASCADE"), nullable=False)
+    curso_id = Column(Integer, ForeignKey("cursos.id", ondelete="CASCADE"), nullable=False)
+    estado = Column(Enum(EstadoMatricula, name="estado_matricula"), nullable=False)
+    anio_lectivo = Column(Integer, nullable=False)
+    archivado = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Relaciones
+    estudiante = relationship("Estudiante", viewonly=True, lazy=CARGA_RELACIONES)
+    curso = relationship("Curso", viewonly=True, lazy=CARGA_RELACIONES)
+    calificaciones = relationship("CalificacionArchivada", back_populates="matricula", viewonly=True, lazy=CARGA_RELACIONES)
+    asistencias = relationship("AsistenciaArchivada", back_populates="matricula", viewonly=True, lazy=CARGA_RELACIONES)
+
+    def __repr__(self):
+        return f"<MatriculaArchivada(id={self.id}, estudiante_id={self.estudiante_id}, anio_lectivo={self.anio_lectivo})>"
+
+
+class CalificacionArchivada(Base):
+    """
+    Modelo para la tabla archivo.calificaciones.
+    Calificación de una matrícula archivada.
+    """
+    __tablename__ = "calificaciones"
+    __table_args__ = (
+        Index("ix_calificaciones_archivadas_matricula", "matricula_id", "asignatura_id", "quimestre"),
+        Index("ix_calificaciones_archivadas_asignatura", "asignatura_id"),
+        {"schema": ESQUEMA_ARCHIVO},
+    )
+
+    id = Column(Integer, primary_key=True)
+    nota = Column(Float, nullable=False)
+    quimestre = Column(Integer, nullable=False)
+    matricula_id = Column(Integer, ForeignKey("archivo.matriculas.id", ondelete="CASCADE"), nullable=False)
+    asignatura_id = Column(Integer, ForeignKey("asignaturas.id", ondelete="CASCADE"), nullable=False)
+
+    # Relaciones
+    matricula = relationship("MatriculaArchivada", back_populates="calificaciones", viewonly=True, lazy=CARGA_RELACIONES)
+    asignatura = relationship("Asignatura", viewonly=True, lazy=CARGA_RELACIONES)
+
+    def __repr__(self):
+        return f"<CalificacionArchivada(id={self.id}, nota={self.nota}, quimestre={self.quimestre}, matricula_id={self.matricula_id})>"
+
+
+class AsistenciaArchivada(Base):
+    """
+    Modelo para la tabla archivo.asistencias.
+    Asistencia de una matrícula archivada (tabla sin particionar).
+    """
+    __tablename__ = "asistencias"
+    __table_args__ = (
+        Index("ix_asistencias_archivadas_matricula_fecha", "matricula_id", "fecha"),
+        Index("ix_asistencias_archivadas_asignatura_fecha", "asignatura_id", "fecha"),
+        {"schema": ESQUEMA_ARCHIVO},
+    )
+
+    id = Column(Integer, primary_key=True)
+    fecha = Column(Date, nullable=False)
+    estado = Column(Enum(EstadoAsistencia, name="estado_asistencia"), nullable=False)
+    matricula_id = Column(Integer, ForeignKey("archivo.matriculas.id", ondelete="CASCADE"), nullable=False)
+    asignatura_id = Column(Integer, ForeignKey("asignaturas.id", ondelete="CASCADE"), nullable=False)
+
+    # Relaciones
+    matricula = relationship("MatriculaArchivada", back_populates="asistencias", viewonly=True, lazy=CARGA_RELACIONES)
+    asignatura = relationship("Asignatura", viewonly=True, lazy=CARGA_RELACIONES)
+
+    def __repr__(self):
+        return f"<AsistenciaArchivada(id={self.id}, fecha='{self.fecha}', estado='{self.estado}', matricula_id={self.matricula_id})>"
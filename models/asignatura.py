@@ -3,7 +3,7 @@ Modelo de Asignatura
 """
 from sqlalchemy import Column, Integer, String, Text, ForeignKey
 from sqlalchemy.orm import relationship
-from config.database import Base
+from config.database import Base, CARGA_RELACIONES
 
 
 class Asignatura(Base):
@@ -16,14 +16,14 @@ class Asignatura(Base):
     id = Column(Integer, primary_key=True, index=True)
     nombre = Column(String(100), nullable=False)
     descripcion = Column(Text)
-    curso_id = Column(Integer, ForeignKey("cursos.id"), nullable=False)
-    docente_id = Column(Integer, ForeignKey("docentes.id"))
+    curso_id = Column(Integer, ForeignKey("cursos.id", ondelete="CASCADE"), nullable=False, index=True)
+    docente_id = Column(Integer, ForeignKey("docentes.id", ondelete="CASCADE"), index=True)
 
     # Relaciones
-    curso = relationship("Curso", back_populates="asignaturas")
-    docente = relationship("Docente", back_populates="asignaturas")
-    calificaciones = relationship("Calificacion", back_populates="asignatura", cascade="all, delete-orphan")
-    asistencias = relationship("Asistencia", back_populates="asignatura", cascade="all, delete-orphan")
+    curso = relationship("Curso", back_populates="asignaturas", lazy=CARGA_RELACIONES)
+    docente = relationship("Docente", back_populates="asignaturas", lazy=CARGA_RELACIONES)
+    calificaciones = relationship("Calificacion", back_populates="asignatura", cascade="all, delete-orphan", passive_deletes=True, lazy=CARGA_RELACIONES)
+    asistencias = relationship("Asistencia", back_populates="asignatura", cascade="all, delete-orphan", passive_deletes=True, lazy=CARGA_RELACIONES)
 
     def __repr__(self):
         return f"<Asignatura(id={self.id}, nombre='{self.nombre}', curso_id={self.curso_id})>"
@@ -1,10 +1,10 @@
 """
 Modelo de Asistencia
 """
-from sqlalchemy import Column, Integer, Date, ForeignKey, Enum
+from sqlalchemy import Column, Integer, Date, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import date
-from config.database import Base
+from config.database import Base, CARGA_RELACIONES
 from models.enums import EstadoAsistencia
 
 
@@ -12,18 +12,30 @@ class Asistencia(Base):
     """
     Modelo para la tabla asistencias.
     Representa el registro de asistencia de un estudiante en una asignatura.
+
+    La tabla está particionada por mes de la fecha (init_db.sql,
+    migrations/005): su clave primaria en la BD es (id, fecha), pero id es
+    único y sigue siendo la identidad de cada registro en el ORM.
     """
     __tablename__ = "asistencias"
+    __table_args__ = (
+        # Asistencia de una asignatura o de una matrícula, por rango de fechas
+        Index("ix_asistencias_asignatura_fecha", "asignatura_id", "fecha"),
+        Index("ix_asistencias_matricula_fecha", "matricula_id", "fecha"),
+        {"postgresql_partition_by": "RANGE (fecha)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    fecha = Column(Date, default=date.today, nullable=False)
-    estado = Column(Enum(EstadoAsistencia), nullable=False)
-    matricula_id = Column(Integer, ForeignKey("matriculas.id"), nullable=False)
-    asignatura_id = Column(Integer, ForeignKey("asignaturas.id"), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    fecha = Column(Date, default=date.today, primary_key=True)
+    estado = Column(Enum(EstadoAsistencia, name="estado_asistencia"), nullable=False)
+    matricula_id = Column(Integer, ForeignKey("matriculas.id", ondelete="CASCADE"), nullable=False)
+    asignatura_id = Column(Integer, ForeignKey("asignaturas.id", ondelete="CASCADE"), nullable=False)
 
     # Relaciones
-    matricula = relationship("Matricula", back_populates="asistencias")
-    asignatura = relationship("Asignatura", back_populates="asistencias")
+    matricula = relationship("Matricula", back_populates="asistencias", lazy=CARGA_RELACIONES)
+    asignatura = relationship("Asignatura", back_populates="asistencias", lazy=CARGA_RELACIONES)
+
+    __mapper_args__ = {"primary_key": [id]}
 
     def __repr__(self):
         return f"<Asistencia(id={self.id}, fecha='{self.fecha}', estado='{self.estado}', matricula_id={self.matricula_id})>"
@@ -1,9 +1,9 @@
 """
 Modelo de Calificación
 """
-from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy import Column, Integer, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
-from config.database import Base
+from config.database import Base, CARGA_RELACIONES
 
 
 class Calificacion(Base):
@@ -12,16 +12,21 @@ class Calificacion(Base):
     Representa las calificaciones de un estudiante en una asignatura.
     """
     __tablename__ = "calificaciones"
+    __table_args__ = (
+        # Notas de una matrícula y grupos del resumen (matrícula × asignatura × quimestre)
+        Index("ix_calificaciones_matricula_asignatura_quimestre", "matricula_id", "asignatura_id", "quimestre"),
+        Index("ix_calificaciones_asignatura", "asignatura_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     nota = Column(Float, nullable=False)  # Rango 0-10
     quimestre = Column(Integer, nullable=False)
-    matricula_id = Column(Integer, ForeignKey("matriculas.id"), nullable=False)
-    asignatura_id = Column(Integer, ForeignKey("asignaturas.id"), nullable=False)
+    matricula_id = Column(Integer, ForeignKey("matriculas.id", ondelete="CASCADE"), nullable=False)
+    asignatura_id = Column(Integer, ForeignKey("asignaturas.id", ondelete="CASCADE"), nullable=False)
 
     # Relaciones
-    matricula = relationship("Matricula", back_populates="calificaciones")
-    asignatura = relationship("Asignatura", back_populates="calificaciones")
+    matricula = relationship("Matricula", back_populates="calificaciones", lazy=CARGA_RELACIONES)
+    asignatura = relationship("Asignatura", back_populates="calificaciones", lazy=CARGA_RELACIONES)
 
     def __repr__(self):
         return f"<Calificacion(id={self.id}, nota={self.nota}, quimestre={self.quimestre}, matricula_id={self.matricula_id})>"
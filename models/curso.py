@@ -3,7 +3,7 @@ Modelo de Curso
 """
 from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import relationship
-from config.database import Base
+from config.database import Base, CARGA_RELACIONES
 
 
 class Curso(Base):
@@ -18,8 +18,8 @@ class Curso(Base):
     nivel = Column(String(50), nullable=False)
 
     # Relaciones
-    asignaturas = relationship("Asignatura", back_populates="curso", cascade="all, delete-orphan")
-    matriculas = relationship("Matricula", back_populates="curso", cascade="all, delete-orphan")
+    asignaturas = relationship("Asignatura", back_populates="curso", cascade="all, delete-orphan", passive_deletes=True, lazy=CARGA_RELACIONES)
+    matriculas = relationship("Matricula", back_populates="curso", cascade="all, delete-orphan", passive_deletes=True, lazy=CARGA_RELACIONES)
 
     def __repr__(self):
         return f"<Curso(id={self.id}, nombre='{self.nombre}', nivel='{self.nivel}')>"
@@ -3,7 +3,7 @@ Modelo de Docente
 """
 from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import relationship
-from config.database import Base
+from config.database import Base, CARGA_RELACIONES
 
 
 class Docente(Base):
@@ -20,7 +20,7 @@ class Docente(Base):
     correo = Column(String(100), unique=True, nullable=False, index=True)
 
     # Relaciones
-    asignaturas = relationship("Asignatura", back_populates="docente", cascade="all, delete-orphan")
+    asignaturas = relationship("Asignatura", back_populates="docente", cascade="all, delete-orphan", passive_deletes=True, lazy=CARGA_RELACIONES)
 
     def __repr__(self):
         return f"<Docente(id={self.id}, nombre='{self.nombre} {self.apellido}', titulo='{self.titulo}')>"
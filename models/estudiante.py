@@ -3,7 +3,7 @@ Modelo de Estudiante
 """
 from sqlalchemy import Column, Integer, String, Date, ForeignKey
 from sqlalchemy.orm import relationship
-from config.database import Base
+from config.database import Base, CARGA_RELACIONES
 
 
 class Estudiante(Base):
@@ -19,11 +19,11 @@ class Estudiante(Base):
     cedula = Column(String(20), unique=True, nullable=False, index=True)
     fecha_nacimiento = Column(Date, nullable=False)
     correo = Column(String(100))
-    representante_id = Column(Integer, ForeignKey("representantes.id"))
+    representante_id = Column(Integer, ForeignKey("representantes.id"), index=True)
 
     # Relaciones
-    representante = relationship("Representante", foreign_keys=[representante_id])
-    matriculas = relationship("Matricula", back_populates="estudiante", cascade="all, delete-orphan")
+    representante = relationship("Representante", foreign_keys=[representante_id], lazy=CARGA_RELACIONES)
+    matriculas = relationship("Matricula", back_populates="estudiante", cascade="all, delete-orphan", passive_deletes=True, lazy=CARGA_RELACIONES)
 
     def __repr__(self):
         return f"<Estudiante(id={self.id}, nombre='{self.nombre} {self.apellido}', cedula='{self.cedula}')>"
@@ -1,10 +1,10 @@
 """
 Modelo de Matrícula
 """
-from sqlalchemy import Column, Integer, Date, ForeignKey, Enum
+from sqlalchemy import Column, Integer, Date, ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import date
-from config.database import Base
+from config.database import Base, CARGA_RELACIONES
 from models.enums import EstadoMatricula
 
 
@@ -14,22 +14,31 @@ class Matricula(Base):
     Representa la inscripción de un estudiante en un curso.
     """
     __tablename__ = "matriculas"
+    __table_args__ = (
+        # Un estudiante se matricula una sola vez por curso; el índice también
+        # sirve las búsquedas por estudiante (columna inicial)
+        UniqueConstraint("estudiante_id", "curso_id", name="uq_matricula_estudiante_curso"),
+        # Listados por curso, opcionalmente filtrados por estado
+        Index("ix_matriculas_curso_estado", "curso_id", "estado"),
+        Index("ix_matriculas_estado", "estado"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     fecha = Column(Date, default=date.today, nullable=False)
-    estudiante_id = Column(Integer, ForeignKey("estudiantes.id"), nullable=False)
-    curso_id = Column(Integer, ForeignKey("cursos.id"), nullable=False)
+    estudiante_id = Column(Integer, ForeignKey("estudiantes.id", ondelete="CASCADE"), nullable=False)
+    curso_id = Column(Integer, ForeignKey("cursos.id", ondelete="CASCADE"), nullable=False)
     estado = Column(
-        Enum(EstadoMatricula),
+        Enum(EstadoMatricula, name="estado_matricula"),
         default=EstadoMatricula.REGISTRADO,
         nullable=False
     )
 
-    # Relaciones
-    estudiante = relationship("Estudiante", back_populates="matriculas")
-    curso = relationship("Curso", back_populates="matriculas")
-    calificaciones = relationship("Calificacion", back_populates="matricula", cascade="all, delete-orphan")
-    asistencias = relationship("Asistencia", back_populates="matricula", cascade="all, delete-orphan")
+    # Relaciones. Las calificaciones y asistencias las borra la BD
+    # (ON DELETE CASCADE); passive_deletes evita cargarlas para borrarlas
+    estudiante = relationship("Estudiante", back_populates="matriculas", lazy=CARGA_RELACIONES)
+    curso = relationship("Curso", back_populates="matriculas", lazy=CARGA_RELACIONES)
+    calificaciones = relationship("Calificacion", back_populates="matricula", cascade="all, delete-orphan", passive_deletes=True, lazy=CARGA_RELACIONES)
+    asistencias = relationship("Asistencia", back_populates="matricula", cascade="all, delete-orphan", passive_deletes=True, lazy=CARGA_RELACIONES)
 
     def __repr__(self):
         return f"<Matricula(id={self.id}, estudiante_id={self.estudiante_id}, curso_id={self.curso_id}, estado='{self.estado}')>"
@@ -14,7 +14,7 @@ class Representante(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     nombre = Column(String(100), nullable=False)
-    telefono = Column(String(20), nullable=False)
+    telefono = Column(String(20), nullable=False, index=True)
 
     def __repr__(self):
         return f"<Representante(id={self.id}, nombre='{self.nombre}')>"
@@ -0,0 +1,34 @@
+"""
+Modelo de Resumen de Calificaciones
+"""
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from config.database import Base
+
+
+class ResumenCalificacion(Base):
+    """
+    Modelo para la tabla resumen_calificaciones.
+    Acumula suma, cantidad, mínimo y máximo de las notas por
+    matrícula × asignatura × quimestre, para que los promedios se lean
+    de una fila en lugar de recorrer todas las calificaciones.
+    CalificacionRepository la mantiene al día en cada escritura.
+    """
+    __tablename__ = "resumen_calificaciones"
+
+    # Datos derivados: desaparecen junto con la matrícula o asignatura
+    matricula_id = Column(Integer, ForeignKey("matriculas.id", ondelete="CASCADE"), primary_key=True)
+    asignatura_id = Column(Integer, ForeignKey("asignaturas.id", ondelete="CASCADE"), primary_key=True)
+    quimestre = Column(Integer, primary_key=True)
+    suma = Column(Float, nullable=False, default=0)
+    cantidad = Column(Integer, nullable=False, default=0)
+    minimo = Column(Float, nullable=False)
+    maximo = Column(Float, nullable=False)
+
+    @property
+    def promedio(self) -> float:
+        """Promedio de las notas del grupo"""
+        return self.suma / self.cantidad if self.cantidad else 0.0
+
+    def __repr__(self):
+        return (f"<ResumenCalificacion(matricula_id={self.matricula_id}, asignatura_id={self.asignatura_id}, "
+                f"quimestre={self.quimestre}, cantidad={self.cantidad})>")
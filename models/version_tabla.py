@@ -0,0 +1,22 @@
+"""
+Modelo de Versión de Tabla
+"""
+from sqlalchemy import Column, String, BigInteger, DateTime, func
+from config.database import Base
+
+
+class VersionTabla(Base):
+    """
+    Modelo para la tabla versiones_tablas.
+    Un contador por tabla que un trigger por sentencia (registrar_version_tabla)
+    incrementa en cada INSERT, UPDATE, DELETE o TRUNCATE. Las rutas lo usan
+    como validador de caché HTTP (ETag / Last-Modified) sin leer la tabla.
+    """
+    __tablename__ = "versiones_tablas"
+
+    tabla = Column(String(63), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    modificado = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<VersionTabla(tabla='{self.tabla}', version={self.version})>"
@@ -0,0 +1,29 @@
+"""
+Script para reconstruir la tabla resumen_calificaciones
+
+La aplicación mantiene el resumen al día en cada escritura; este script
+solo hace falta tras cargar calificaciones por fuera de la API (SQL
+directo, restauraciones) o para corregir cualquier desviación.
+
+Uso:
+    python rebuild_grade_summary.py
+"""
+from config.database import SessionLocal
+from services.services import CalificacionService
+
+
+def rebuild_grade_summary():
+    """Recalcular el resumen de calificaciones desde cero"""
+    db = SessionLocal()
+    try:
+        grupos = CalificacionService(db).reconstruir_resumen()
+        print(f"✓ Resumen de calificaciones reconstruido: {grupos} grupos")
+    except Exception as e:
+        print(f"✗ Error al reconstruir el resumen: {e}")
+        raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_grade_summary()
@@ -9,8 +9,9 @@ CREATE TABLE matriculas (
     estudiante_id INT NOT NULL,
     curso_id INT NOT NULL,
     estado estado_matricula DEFAULT 'REGISTRADO',
-    CONSTRAINT fk_matricula_estudiante FOREIGN KEY (estudiante_id) REFERENCES estudiantes(id),
-    CONSTRAINT fk_matricula_curso FOREIGN KEY (curso_id) REFERENCES cursos(id)
+    CONSTRAINT fk_matricula_estudiante FOREIGN KEY (estudiante_id) REFERENCES estudiantes(id) ON DELETE CASCADE,
+    CONSTRAINT fk_matricula_curso FOREIGN KEY (curso_id) REFERENCES cursos(id) ON DELETE CASCADE,
+    CONSTRAINT uq_matricula_estudiante_curso UNIQUE (estudiante_id, curso_id)
 );
 
 -- Crear tabla Calificacion
@@ -20,17 +21,89 @@ CREATE TABLE calificaciones (
     quimestre INT NOT NULL,
     matricula_id INT NOT NULL,
     asignatura_id INT NOT NULL,
-    CONSTRAINT fk_calificacion_matricula FOREIGN KEY (matricula_id) REFERENCES matriculas(id),
-    CONSTRAINT fk_calificacion_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id)
+    CONSTRAINT fk_calificacion_matricula FOREIGN KEY (matricula_id) REFERENCES matriculas(id) ON DELETE CASCADE,
+    CONSTRAINT fk_calificacion_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id) ON DELETE CASCADE
 );
 
 -- Crear tabla Asistencia
+-- Particionada por mes de la fecha; la clave primaria debe incluir la clave
+-- de partición (id lo asigna la secuencia y sigue siendo único)
 CREATE TABLE asistencias (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     fecha DATE NOT NULL DEFAULT CURRENT_DATE,
     estado estado_asistencia NOT NULL,
     matricula_id INT NOT NULL,
     asignatura_id INT NOT NULL,
-    CONSTRAINT fk_asistencia_matricula FOREIGN KEY (matricula_id) REFERENCES matriculas(id),
-    CONSTRAINT fk_asistencia_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id)
+    CONSTRAINT pk_asistencias PRIMARY KEY (id, fecha),
+    CONSTRAINT fk_asistencia_matricula FOREIGN KEY (matricula_id) REFERENCES matriculas(id) ON DELETE CASCADE,
+    CONSTRAINT fk_asistencia_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id) ON DELETE CASCADE
+) PARTITION BY RANGE (fecha);
+
+-- Crear tabla Resumen de Calificaciones (mantenida por la aplicación)
+CREATE TABLE resumen_calificaciones (
+    matricula_id INT NOT NULL,
+    asignatura_id INT NOT NULL,
+    quimestre INT NOT NULL,
+    suma FLOAT NOT NULL DEFAULT 0,
+    cantidad INT NOT NULL DEFAULT 0,
+    minimo FLOAT NOT NULL,
+    maximo FLOAT NOT NULL,
+    CONSTRAINT pk_resumen_calificaciones PRIMARY KEY (matricula_id, asignatura_id, quimestre),
+    CONSTRAINT fk_resumen_matricula FOREIGN KEY (matricula_id) REFERENCES matriculas(id) ON DELETE CASCADE,
+    CONSTRAINT fk_resumen_asignatura FOREIGN KEY (asignatura_id) REFERENCES asignaturas(id) ON DELETE CASCADE
 );
+
+-- Índices para las búsquedas frecuentes
+CREATE INDEX ix_matriculas_curso_estado ON matriculas (curso_id, estado);
+CREATE INDEX ix_matriculas_estado ON matriculas (estado);
+CREATE INDEX ix_calificaciones_matricula_asignatura_quimestre ON calificaciones (matricula_id, asignatura_id, quimestre);
+CREATE INDEX ix_calificaciones_asignatura ON calificaciones (asignatura_id);
+CREATE INDEX ix_asistencias_asignatura_fecha ON asistencias (asignatura_id, fecha);
+CREATE INDEX ix_asistencias_matricula_fecha ON asistencias (matricula_id, fecha);
+
+-- Particiones mensuales de asistencias
+CREATE TABLE asistencias_default PARTITION OF asistencias DEFAULT;
+
+-- Crea las particiones mensuales (asistencias_AAAA_MM) que falten entre los
+-- meses de `desde` y `hasta`, moviendo a cada una las filas de su mes que
+-- estuvieran en asistencias_default, y las adjunta con ATTACH PARTITION.
+-- asistencias_default queda bloqueada hasta el commit: para escrituras
+-- desde que empieza el movimiento (así ninguna fila del mes entra entre el
+-- DELETE y el ATTACH) y también para lecturas desde el ATTACH, que la
+-- recorre con ACCESS EXCLUSIVE. Las demás particiones no se bloquean.
+-- Devuelve las creadas.
+CREATE OR REPLACE FUNCTION crear_particiones_asistencias(desde DATE, hasta DATE) RETURNS INT AS $$
+DECLARE
+    mes DATE := date_trunc('month', desde)::date;
+    siguiente DATE;
+    particion TEXT;
+    creadas INT := 0;
+BEGIN
+    -- Un solo creador a la vez (ej: dos tareas de mantenimiento simultáneas)
+    PERFORM pg_advisory_xact_lock(hashtext('crear_particiones_asistencias'));
+    WHILE mes <= hasta LOOP
+        siguiente := (mes + INTERVAL '1 month')::date;
+        particion := 'asistencias_' || to_char(mes, 'YYYY_MM');
+        IF to_regclass(particion) IS NULL THEN
+            BEGIN
+                EXECUTE format('CREATE TABLE %I (LIKE asistencias INCLUDING DEFAULTS)', particion);
+                LOCK TABLE asistencias_default IN SHARE ROW EXCLUSIVE MODE;
+                EXECUTE format('WITH movidas AS (DELETE FROM asistencias_default WHERE fecha >= %L AND fecha < %L RETURNING *) '
+                               'INSERT INTO %I SELECT * FROM movidas', mes, siguiente, particion);
+                EXECUTE format('ALTER TABLE asistencias ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                               particion, mes, siguiente);
+                creadas := creadas + 1;
+            EXCEPTION WHEN invalid_object_definition THEN
+                NULL;  -- El mes ya está dentro del rango de otra partición
+            END;
+        END IF;
+        mes := siguiente;
+    END LOOP;
+    RETURN creadas;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Desde el año lectivo 2024-2025 (el de los datos de ejemplo y de
+-- generate_dataset.py) hasta un año adelante
+-- (después, manage_partitions.py crea las que vayan haciendo falta)
+SELECT crear_particiones_asistencias(DATE '2024-09-01', (CURRENT_DATE + INTERVAL '12 months')::date);
@@ -2,6 +2,9 @@
 Módulo de Repositorios
 """
 from repositories.base import BaseRepository
+from repositories.archivo import ArchivoRepository
+from repositories.busqueda import BusquedaRepository
+from repositories.particiones import ParticionesRepository
 from repositories.repositories import (
     RepresentanteRepository,
     EstudianteRepository,
@@ -10,7 +13,8 @@ from repositories.repositories import (
     AsignaturaRepository,
     MatriculaRepository,
     AsistenciaRepository,
-    CalificacionRepository
+    CalificacionRepository,
+    ResumenCalificacionRepository,
 )
 
 __all__ = [
@@ -23,4 +27,8 @@ __all__ = [
     "MatriculaRepository",
     "AsistenciaRepository",
     "CalificacionRepository",
+    "ResumenCalificacionRepository",
+    "BusquedaRepository",
+    "ParticionesRepository",
+    "ArchivoRepository",
 ]
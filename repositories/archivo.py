@@ -0,0 +1,187 @@
+"""
+Archivo de años lectivos cerrados (esquema archivo)
+
+Un año lectivo se nombra por el año en que empieza: el año N va del día 1
+del mes ANIO_LECTIVO_MES_INICIO de N al mismo día de N+1 y le pertenecen
+las matrículas con fecha en ese rango.
+
+mover_lote pasa un lote de matrículas del año a archivo.matriculas y sus
+calificaciones y asistencias a archivo.calificaciones y archivo.asistencias
+(cada tabla con un DELETE ... RETURNING dentro del INSERT); las filas de
+resumen_calificaciones de esas matrículas se borran en cascada. Cada lote
+es una transacción corta que confirma el servicio: los bloqueos duran lo
+que tarda un lote y un archivo interrumpido continúa donde quedó.
+
+Las lecturas (read_matricula, get_promedio, get_asistencias, ...) repiten
+las de los repositorios de las tablas en uso; los servicios recurren a
+ellas cuando la matrícula pedida ya no está en las tablas en uso.
+"""
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import Integer, case, delete, extract, func, insert, literal, select
+from sqlalchemy.orm import Session
+from config.settings import ANIO_LECTIVO_MES_INICIO
+from models import (
+    Matricula, Calificacion, Asistencia,
+    MatriculaArchivada, CalificacionArchivada, AsistenciaArchivada
+)
+from repositories.base import BaseRepository
+
+
+def rango_anio_lectivo(anio: int, mes_inicio: int = ANIO_LECTIVO_MES_INICIO) -> Tuple[date, date]:
+    """
+    Primer día del año lectivo y primer día del siguiente.
+
+    >>> rango_anio_lectivo(2024, 7)
+    (datetime.date(2024, 7, 1), datetime.date(2025, 7, 1))
+    """
+    return date(anio, mes_inicio, 1), date(anio + 1, mes_inicio, 1)
+
+
+def anio_lectivo(fecha: date, mes_inicio: int = ANIO_LECTIVO_MES_INICIO) -> int:
+    """
+    Año lectivo al que pertenece una fecha.
+
+    >>> anio_lectivo(date(2025, 3, 10), 7)
+    2024
+    >>> anio_lectivo(date(2024, 7, 1), 7)
+    2024
+    """
+    return fecha.year if fecha.month >= mes_inicio else fecha.year - 1
+
+
+def _anio_lectivo_sql(fecha, mes_inicio: int = ANIO_LECTIVO_MES_INICIO):
+    """anio_lectivo como expresión SQL sobre una columna de fecha"""
+    anio = extract("year", fecha)
+    return case((extract("month", fecha) >= mes_inicio, anio), else_=anio - 1).cast(Integer)
+
+
+class AnioLectivo(NamedTuple):
+    """Matrículas de un año lectivo en las tablas en uso y en el archivo"""
+    anio: int
+    en_uso: int
+    archivadas: int
+
+
+class ArchivoRepository:
+    """Movimiento de años lectivos al archivo y lecturas sobre el archivo"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.matriculas = BaseRepository(db, MatriculaArchivada)
+
+    def mover_lote(self, anio: int, limite: int) -> Dict[str, int]:
+        """
+        Mueve al archivo hasta `limite` matrículas del año lectivo con sus
+        calificaciones y asistencias. No confirma la transacción.
+
+        Las matrículas del lote se bloquean (FOR UPDATE) hasta el commit:
+        una calificación o asistencia nueva para ellas espera y después
+        falla por la clave foránea, en lugar de perderse.
+
+        Args:
+            anio: Año lectivo
+            limite: Máximo de matrículas del lote
+
+        Returns:
+            Filas movidas de cada tabla ({"matriculas": 0, ...} si no quedan)
+        """
+        inicio, fin = rango_anio_lectivo(anio)
+        ids = list(self.db.scalars(
+            select(Matricula.id)
+            .where(Matricula.fecha >= inicio, Matricula.fecha < fin)
+            .order_by(Matricula.id)
+            .limit(limite)
+            .with_for_update()
+        ))
+        if not ids:
+            return {"matriculas": 0, "calificaciones": 0, "asistencias": 0}
+
+        columnas = [c.name for c in Matricula.__table__.columns]
+        self.db.execute(insert(MatriculaArchivada).from_select(
+            columnas + ["anio_lectivo"],
+            select(*(Matricula.__table__.c[c] for c in columnas), literal(anio))
+            .where(Matricula.id.in_(ids))
+        ))
+        movidas = {
+            "matriculas": len(ids),
+            "calificaciones": self._mover(Calificacion, CalificacionArchivada, ids),
+            "asistencias": self._mover(Asistencia, AsistenciaArchivada, ids),
+        }
+        self.db.execute(
+            delete(Matricula).where(Matricula.id.in_(ids)),
+            execution_options={"synchronize_session": False}
+        )
+        return movidas
+
+    def _mover(self, origen, destino, matricula_ids: Sequence[int]) -> int:
+        """Pasa las filas de las matrículas de `origen` a `destino` en una sentencia"""
+        columnas = [c.name for c in destino.__table__.columns]
+        borradas = (
+            delete(origen.__table__)
+            .where(origen.__table__.c.matricula_id.in_(matricula_ids))
+            .returning(*(origen.__table__.c[c] for c in columnas))
+            .cte("borradas")
+        )
+        return self.db.execute(
+            insert(destino.__table__).from_select(columnas, select(borradas)).add_cte(borradas)
+        ).rowcount
+
+    def anios(self) -> List[AnioLectivo]:
+        """Años lectivos con matrículas, en uso o archivadas, del más antiguo al más reciente"""
+        anio = _anio_lectivo_sql(Matricula.fecha)
+        en_uso = dict(self.db.execute(select(anio, func.count()).group_by(anio)).all())
+        archivadas = dict(self.db.execute(
+            select(MatriculaArchivada.anio_lectivo, func.count()).group_by(MatriculaArchivada.anio_lectivo)
+        ).all())
+        return [
+            AnioLectivo(a, en_uso.get(a, 0), archivadas.get(a, 0))
+            for a in sorted(en_uso.keys() | archivadas.keys())
+        ]
+
+    def read_matricula(self, id: int, include: Sequence[str] = ()) -> Optional[MatriculaArchivada]:
+        """Matrícula archivada por ID (con las relaciones de include)"""
+        return self.matriculas.read(id, include)
+
+    def get_matriculas_estudiante(self, estudiante_id: int,
+                                  include: Sequence[str] = ()) -> List[MatriculaArchivada]:
+        """Matrículas archivadas de un estudiante, de la más antigua a la más reciente"""
+        query = select(MatriculaArchivada).where(MatriculaArchivada.estudiante_id == estudiante_id)
+        if include:
+            query = query.options(*self.matriculas.opciones_carga(include))
+        return list(self.db.scalars(query.order_by(MatriculaArchivada.fecha, MatriculaArchivada.id)))
+
+    def get_calificaciones(self, matricula_id: int) -> List[CalificacionArchivada]:
+        """Calificaciones archivadas de una matrícula"""
+        return list(self.db.scalars(
+            select(CalificacionArchivada).where(CalificacionArchivada.matricula_id == matricula_id)
+        ))
+
+    def get_promedio(self, matricula_id: int, quimestre: Optional[int] = None,
+                     asignatura_id: Optional[int] = None) -> Optional[float]:
+        """
+        Promedio de una matrícula archivada, opcionalmente por quimestre y/o
+        asignatura (el archivo no tiene resumen: se calcula de las notas)
+        """
+        stmt = select(func.avg(CalificacionArchivada.nota)).where(CalificacionArchivada.matricula_id == matricula_id)
+        if quimestre is not None:
+            stmt = stmt.where(CalificacionArchivada.quimestre == quimestre)
+        if asignatura_id is not None:
+            stmt = stmt.where(CalificacionArchivada.asignatura_id == asignatura_id)
+        resultado = self.db.execute(stmt).scalar()
+        return float(resultado) if resultado is not None else None
+
+    def get_asistencias(self, desde: Optional[date] = None, hasta: Optional[date] = None,
+                        matricula_id: Optional[int] = None,
+                        asignatura_id: Optional[int] = None) -> List[AsistenciaArchivada]:
+        """Asistencias archivadas entre dos fechas (inclusive), ordenadas por fecha"""
+        query = select(AsistenciaArchivada)
+        if matricula_id is not None:
+            query = query.where(AsistenciaArchivada.matricula_id == matricula_id)
+        if asignatura_id is not None:
+            query = query.where(AsistenciaArchivada.asignatura_id == asignatura_id)
+        if desde is not None:
+            query = query.where(AsistenciaArchivada.fecha >= desde)
+        if hasta is not None:
+            query = query.where(AsistenciaArchivada.fecha <= hasta)
+        return list(self.db.scalars(query.order_by(AsistenciaArchivada.fecha, AsistenciaArchivada.id)))
@@ -2,12 +2,22 @@
 BaseRepository - Clase base para todos los repositorios
 Implementa métodos CRUD genéricos
 """
-from typing import TypeVar, Generic, List, Optional, Type
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import BinaryIO, Dict, TypeVar, Generic, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Type
+from sqlalchemy import BigInteger, Row, and_, case, cast, column, delete, func, inspect, insert, or_, select, table, update
+from sqlalchemy.dialects.postgresql import REGCLASS, insert as pg_insert
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy.exc import SQLAlchemyError
+from config.settings import TOTAL_EXACTO_HASTA
+from models.version_tabla import VersionTabla
+from repositories.importacion import ImportacionCSV
 
 T = TypeVar('T')
 
+# Filas por sentencia en las inserciones masivas (mantiene el número de
+# parámetros muy por debajo del límite de PostgreSQL)
+TAMANO_LOTE = 1000
+
 
 class BaseRepository(Generic[T]):
     """
@@ -48,34 +58,305 @@ class BaseRepository(Generic[T]):
             self.db.rollback()
             raise Exception(f"Error al crear {self.model.__name__}: {str(e)}")
 
-    def read(self, id: int) -> Optional[T]:
+    def create_many(self, objs_in: List[dict]) -> List[T]:
+        """
+        Crea varios registros en una sola transacción (un solo commit).
+        
+        Se ejecuta como un executemany de INSERT ... RETURNING, que
+        SQLAlchemy envía como INSERT multi-fila de hasta TAMANO_LOTE
+        registros cada uno, en lugar de add/commit/refresh por fila.
+        
+        Args:
+            objs_in: Lista de diccionarios con los datos
+            
+        Returns:
+            Lista de objetos creados, en el mismo orden de entrada
+            
+        Raises:
+            SQLAlchemyError: Si hay error en la BD
+        """
+        if not objs_in:
+            return []
+        try:
+            stmt = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+            db_objs = self.db.scalars(
+                stmt, objs_in, execution_options={"insertmanyvalues_page_size": TAMANO_LOTE}
+            ).all()
+            self._desvincular(db_objs)
+            self.db.commit()
+            return list(db_objs)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error al crear {self.model.__name__}: {str(e)}")
+
+    def upsert_many(self, objs_in: List[dict], conflict_columns: Sequence[str],
+                    update_columns: Optional[Sequence[str]] = None) -> List[T]:
+        """
+        Inserta o actualiza varios registros (INSERT ... ON CONFLICT DO UPDATE).
+        
+        Args:
+            objs_in: Lista de diccionarios con los datos
+            conflict_columns: Columnas de la restricción única que detecta el conflicto
+            update_columns: Columnas a actualizar en conflicto (por defecto, todas
+                las recibidas excepto las de conflicto)
+            
+        Returns:
+            Lista de objetos insertados o actualizados
+            
+        Raises:
+            ValueError: Si una clave de conflicto se repite en objs_in
+            SQLAlchemyError: Si hay error en la BD
+        """
+        if not objs_in:
+            return []
+
+        # Un mismo INSERT ... ON CONFLICT no puede tocar dos veces la misma
+        # fila; los servicios rechazan antes las claves repetidas por registro
+        claves = [tuple(obj[c] for c in conflict_columns) for obj in objs_in]
+        if len(set(claves)) != len(claves):
+            raise ValueError(f"Claves repetidas en el lote ({', '.join(conflict_columns)})")
+        filas = objs_in
+        if update_columns is None:
+            update_columns = [c for c in filas[0] if c not in conflict_columns]
+
+        try:
+            db_objs = []
+            for inicio in range(0, len(filas), TAMANO_LOTE):
+                stmt = pg_insert(self.model).values(filas[inicio:inicio + TAMANO_LOTE])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=list(conflict_columns),
+                    set_={c: stmt.excluded[c] for c in update_columns},
+                ).returning(self.model)
+                db_objs.extend(self.db.scalars(
+                    stmt, execution_options={"populate_existing": True}
+                ).all())
+            self._desvincular(db_objs)
+            self.db.commit()
+            return db_objs
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error al guardar {self.model.__name__}: {str(e)}")
+
+    def importar(self, importacion: ImportacionCSV, archivo: BinaryIO) -> Tuple[int, Dict[int, List[str]]]:
+        """
+        Importa un CSV en una sola transacción: COPY a la tabla temporal,
+        validación de todas las filas en SQL e INSERT ... SELECT.
+        
+        Si alguna fila no es válida no se inserta ninguna.
+        
+        Args:
+            importacion: Columnas y reglas de validación del CSV
+            archivo: CSV en binario con cabecera
+            
+        Returns:
+            (filas insertadas, errores por registro); errores vacío si se importó
+            
+        Raises:
+            ValueError: Si la cabecera o el formato del CSV no son válidos
+            SQLAlchemyError: Si hay error en la BD
+        """
+        try:
+            total = importacion.cargar(archivo)
+            errores = importacion.errores()
+            if errores:
+                self.db.rollback()
+                return 0, errores
+            self._insertar_importadas(importacion.filas())
+            self.db.commit()
+            return total, {}
+        except ValueError:
+            self.db.rollback()
+            raise
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error al importar {self.model.__name__}: {str(e)}")
+
+    def _insertar_importadas(self, filas) -> None:
+        """Inserta las filas validadas de una importación (SELECT de ImportacionCSV.filas)"""
+        self.db.execute(insert(self.model).from_select([c.name for c in filas.selected_columns], filas))
+
+    def _desvincular(self, db_objs: List[T]) -> None:
+        """
+        Saca los objetos de la sesión antes del commit para que no se expiren
+        y no haya que refrescarlos uno por uno (ya traen los datos del RETURNING).
+        """
+        for db_obj in db_objs:
+            self.db.expunge(db_obj)
+
+    def opciones_carga(self, include: Sequence[str]) -> list:
+        """
+        Traduce rutas de relaciones a opciones de carga anticipada.
+        
+        Cada ruta es una cadena de relaciones separadas por puntos, por
+        ejemplo "matriculas.calificaciones.asignatura". Las colecciones se
+        cargan con selectinload (una consulta IN por nivel) y las relaciones
+        a uno con joinedload (JOIN en la misma consulta), así el número de
+        consultas no depende de cuántas filas se devuelvan.
+        
+        Args:
+            include: Rutas de relaciones a cargar
+            
+        Returns:
+            Lista de opciones para Query.options()
+            
+        Raises:
+            ValueError: Si una ruta nombra una relación inexistente
+        """
+        opciones = []
+        for ruta in include:
+            modelo, opcion = self.model, None
+            for nombre in ruta.split("."):
+                relacion = inspect(modelo).relationships.get(nombre)
+                if relacion is None:
+                    raise ValueError(f"{modelo.__name__} no tiene la relación '{nombre}'")
+                cargar = selectinload if relacion.uselist else joinedload
+                atributo = getattr(modelo, nombre)
+                if opcion is None:
+                    opcion = cargar(atributo)
+                else:
+                    opcion = getattr(opcion, cargar.__name__)(atributo)
+                modelo = relacion.mapper.class_
+            opciones.append(opcion)
+        return opciones
+
+    def read(self, id: int, include: Sequence[str] = ()) -> Optional[T]:
         """
         Obtiene un registro por ID.
         
         Args:
             id: ID del registro
+            include: Relaciones a cargar junto con el registro (ver opciones_carga)
             
         Returns:
             Objeto encontrado o None
         """
-        return self.db.query(self.model).filter(self.model.id == id).first()
+        query = self.db.query(self.model)
+        if include:
+            query = query.options(*self.opciones_carga(include))
+        return query.filter(self.model.id == id).first()
+
+    def existing_ids(self, ids: Iterable[int]) -> Set[int]:
+        """
+        Indica cuáles de los IDs dados existen, con una sola consulta IN (...).
+        
+        Args:
+            ids: IDs a comprobar
+            
+        Returns:
+            Conjunto de los IDs que existen en la tabla
+        """
+        ids = set(ids)
+        if not ids:
+            return set()
+        return set(self.db.scalars(
+            select(self.model.id).where(self.model.id.in_(ids))
+        ))
 
-    def read_all(self, skip: int = 0, limit: int = 100) -> List[T]:
+    def read_all(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None,
+                 include: Sequence[str] = ()) -> List[T]:
         """
-        Obtiene todos los registros con paginación.
+        Obtiene todos los registros con paginación, ordenados por ID.
+        
+        Con after_id se pagina por clave (keyset): se traen los registros
+        con ID mayor al indicado, así cada página cuesta lo mismo sin
+        importar cuán profunda sea. En ese modo se ignora skip.
         
         Args:
             skip: Registros a saltar
             limit: Límite de registros a traer
+            after_id: ID del último registro de la página anterior
+            include: Relaciones a cargar junto con los registros (ver opciones_carga)
             
         Returns:
             Lista de objetos
         """
-        return self.db.query(self.model).offset(skip).limit(limit).all()
+        query = self.db.query(self.model).order_by(self.model.id)
+        if include:
+            query = query.options(*self.opciones_carga(include))
+        if after_id is not None:
+            query = query.filter(self.model.id > after_id)
+        else:
+            query = query.offset(skip)
+        return query.limit(limit).all()
+
+    def read_filas(self, columnas: Sequence[str], skip: int = 0, limit: int = 100,
+                   after_id: Optional[int] = None) -> List[Row]:
+        """
+        Como read_all, pero lee solo algunas columnas como filas (tuplas con
+        nombre) en lugar de objetos ORM: no se construye un objeto por fila
+        ni se llena el mapa de identidad de la sesión.
+        
+        Args:
+            columnas: Nombres de las columnas; los que no son columnas de la
+                tabla se omiten (ej: campos calculados del schema)
+            skip: Registros a saltar
+            limit: Límite de registros a traer
+            after_id: ID del último registro de la página anterior
+            
+        Returns:
+            Lista de filas ordenadas por ID
+        """
+        tabla = self.model.__table__
+        stmt = select(*(tabla.c[c] for c in columnas if c in tabla.c)).order_by(tabla.c.id)
+        if after_id is not None:
+            stmt = stmt.where(tabla.c.id > after_id)
+        else:
+            stmt = stmt.offset(skip)
+        return list(self.db.execute(stmt.limit(limit)))
+
+    def version(self) -> Tuple[str, int, Optional[datetime]]:
+        """
+        Versión de la tabla en versiones_tablas (la incrementa un trigger
+        en cada escritura; ver migrations/002_versiones_tablas.sql).
+        
+        Returns:
+            (tabla, versión, fecha de la última escritura); versión 0 y
+            fecha None si la tabla aún no tiene fila
+        """
+        tabla = self.model.__tablename__
+        fila = self.db.execute(
+            select(VersionTabla.version, VersionTabla.modificado).where(VersionTabla.tabla == tabla)
+        ).first()
+        return (tabla, fila.version, fila.modificado) if fila else (tabla, 0, None)
+
+    def columnas(self) -> List[str]:
+        """
+        Nombres de las columnas de la tabla, en el orden de iter_lotes.
+        
+        Returns:
+            Lista de nombres de columna
+        """
+        return [columna.name for columna in self.model.__table__.columns]
+
+    def iter_lotes(self, tamano_lote: int = TAMANO_LOTE) -> Iterator[list]:
+        """
+        Recorre toda la tabla, ordenada por clave primaria, en lotes de filas.
+        
+        La consulta usa un cursor del lado del servidor (yield_per), así que
+        en memoria solo hay un lote a la vez sin importar el tamaño de la
+        tabla. Se leen filas de columnas, no objetos ORM, para no llenar el
+        mapa de identidad de la sesión.
+        
+        Args:
+            tamano_lote: Filas por lote
+            
+        Returns:
+            Iterador de listas de filas (tuplas en el orden de columnas())
+        """
+        tabla = self.model.__table__
+        stmt = (
+            select(*tabla.columns)
+            .order_by(*tabla.primary_key.columns)
+            .execution_options(yield_per=tamano_lote)
+        )
+        for lote in self.db.execute(stmt).partitions():
+            yield lote
 
     def update(self, id: int, obj_in: dict) -> Optional[T]:
         """
-        Actualiza un registro existente.
+        Actualiza un registro existente con una sola sentencia
+        UPDATE ... WHERE id = :id RETURNING *, sin leerlo antes ni refrescarlo
+        después. Si el UPDATE no devuelve fila, el registro no existe.
         
         Args:
             id: ID del registro
@@ -84,16 +365,21 @@ class BaseRepository(Generic[T]):
         Returns:
             Objeto actualizado o None si no existe
         """
+        if not obj_in:
+            return self.read(id)
         try:
-            db_obj = self.read(id)
-            if not db_obj:
+            stmt = (
+                update(self.model)
+                .where(self.model.id == id)
+                .values(**obj_in)
+                .returning(self.model)
+            )
+            db_obj = self.db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
+            if db_obj is None:
+                self.db.rollback()
                 return None
-            
-            for key, value in obj_in.items():
-                setattr(db_obj, key, value)
-            
+            self._desvincular([db_obj])
             self.db.commit()
-            self.db.refresh(db_obj)
             return db_obj
         except SQLAlchemyError as e:
             self.db.rollback()
@@ -101,7 +387,11 @@ class BaseRepository(Generic[T]):
 
     def delete(self, id: int) -> bool:
         """
-        Elimina un registro.
+        Elimina un registro con una sola sentencia DELETE ... RETURNING id.
+        
+        Si el modelo tiene relaciones con cascade="delete" que la BD no
+        resuelve por sí misma (sin passive_deletes), se usa session.delete()
+        para que el ORM borre antes los hijos.
         
         Args:
             id: ID del registro
@@ -110,22 +400,103 @@ class BaseRepository(Generic[T]):
             True si se eliminó, False si no existe
         """
         try:
-            db_obj = self.read(id)
-            if not db_obj:
+            if self._borrado_en_cascada_orm():
+                db_obj = self.read(id)
+                if not db_obj:
+                    return False
+                self.db.delete(db_obj)
+                self.db.commit()
+                return True
+
+            eliminado = self.db.scalar(
+                delete(self.model).where(self.model.id == id).returning(self.model.id)
+            )
+            if eliminado is None:
+                self.db.rollback()
                 return False
-            
-            self.db.delete(db_obj)
             self.db.commit()
             return True
         except SQLAlchemyError as e:
             self.db.rollback()
             raise Exception(f"Error al eliminar {self.model.__name__}: {str(e)}")
 
+    def delete_many(self, ids: Iterable[int]) -> Set[int]:
+        """
+        Elimina varios registros con una sola sentencia
+        DELETE ... WHERE id IN (...) RETURNING id. Los registros hijos los
+        borra la BD (ON DELETE CASCADE). Si alguno no existe no se elimina
+        ninguno.
+        
+        Args:
+            ids: IDs de los registros
+            
+        Returns:
+            IDs que no existen (vacío si se eliminaron todos)
+        """
+        ids = set(ids)
+        if not ids:
+            return set()
+        try:
+            eliminados = set(self.db.scalars(
+                delete(self.model).where(self.model.id.in_(ids)).returning(self.model.id)
+            ))
+            faltantes = ids - eliminados
+            if faltantes:
+                self.db.rollback()
+                return faltantes
+            self.db.commit()
+            return set()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error al eliminar {self.model.__name__}: {str(e)}")
+
+    def _borrado_en_cascada_orm(self) -> bool:
+        """Indica si borrar un registro obliga al ORM a borrar sus hijos"""
+        return any(
+            relacion.cascade.delete and not relacion.passive_deletes
+            for relacion in inspect(self.model).relationships
+        )
+
     def count(self) -> int:
         """
-        Cuenta el total de registros.
+        Cuenta el total de registros (SELECT count(*) sobre la tabla, sin subconsulta).
         
         Returns:
             Número de registros
         """
-        return self.db.query(self.model).count()
+        return self.db.scalar(select(func.count()).select_from(self.model))
+
+    def total(self, exacto: bool = False, umbral: int = TOTAL_EXACTO_HASTA) -> Tuple[int, bool]:
+        """
+        Total de registros para las cabeceras de los listados, en una sola
+        consulta: si las estadísticas del planificador (pg_class.reltuples)
+        indican al menos `umbral` filas se devuelve esa estimación, sin
+        recorrer la tabla; si no, se cuenta. El count(*) es un InitPlan que
+        PostgreSQL solo ejecuta si se usa. En una tabla particionada se suman
+        las estimaciones de sus particiones (autovacuum no analiza la tabla
+        padre, así que la suya puede estar desactualizada).
+        
+        Args:
+            exacto: Contar siempre, sin importar el tamaño
+            umbral: Filas estimadas desde las que se usa la estimación
+            
+        Returns:
+            (total, True si es una estimación)
+        """
+        if exacto:
+            return self.count(), False
+        pg_class = table("pg_class", column("oid"), column("reltuples"), column("relkind"))
+        pg_inherits = table("pg_inherits", column("inhrelid"), column("inhparent"))
+        tabla = cast(self.model.__tablename__, REGCLASS)
+        # reltuples es -1 en las tablas aún no analizadas
+        filas = func.coalesce(func.sum(func.greatest(pg_class.c.reltuples, 0)), 0)
+        estimado = select(filas.label("filas")).where(or_(
+            and_(pg_class.c.oid == tabla, pg_class.c.relkind != "p"),
+            pg_class.c.oid.in_(select(pg_inherits.c.inhrelid).where(pg_inherits.c.inhparent == tabla)),
+        )).subquery()
+        grande = estimado.c.filas >= umbral
+        contar = select(func.count()).select_from(self.model).scalar_subquery()
+        fila = self.db.execute(
+            select(case((grande, cast(estimado.c.filas, BigInteger)), else_=contar), grande)
+        ).one()
+        return fila[0], fila[1]
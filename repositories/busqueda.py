@@ -0,0 +1,98 @@
+"""
+Búsqueda aproximada de personas (estudiantes, docentes y representantes)
+
+Cada persona se busca en un solo texto, texto_busqueda(nombre, apellido,
+cedula, correo, ...), que es también la expresión de su índice GIN de
+trigramas (pg_trgm). Una persona coincide si el texto contiene la consulta
+(ILIKE, sirve para prefijos, cédulas y correos parciales) o si alguna parte
+del texto se parece a ella (operador %> de similitud por palabra, tolera
+errores de escritura). Ambas condiciones usan el índice.
+
+Los resultados se ordenan por word_similarity: una palabra que empieza
+como la consulta puntúa más alto que una coincidencia en medio de otra.
+Cada tipo aporta como mucho `limit` candidatos y se devuelven los mejores
+del conjunto en una sola consulta.
+"""
+from typing import List, NamedTuple, Optional, Sequence
+from sqlalchemy import Row, func, literal, select, union_all
+from sqlalchemy.orm import Session
+from models import Estudiante, Docente, Representante
+
+
+class FuentePersonas(NamedTuple):
+    """Tabla en la que se busca y columnas que forman cada resultado"""
+    modelo: type
+    campos: Sequence[str]    # Argumentos de texto_busqueda, en el orden del índice
+    nombre: Sequence[str]    # Columnas que forman el nombre mostrado
+    detalle: str             # Columna que ayuda a distinguir homónimos
+
+
+# Las columnas de `campos` deben coincidir con los índices ix_*_busqueda
+# (init_db.sql, migrations/004_busqueda_personas.sql)
+FUENTES = {
+    "estudiante": FuentePersonas(Estudiante, ("nombre", "apellido", "cedula", "correo"), ("nombre", "apellido"), "cedula"),
+    "docente": FuentePersonas(Docente, ("nombre", "apellido", "correo"), ("nombre", "apellido"), "correo"),
+    "representante": FuentePersonas(Representante, ("nombre", "telefono"), ("nombre",), "telefono"),
+}
+
+
+def patron_contiene(consulta: str) -> str:
+    """
+    Patrón ILIKE que busca la consulta literal en cualquier posición.
+
+    >>> patron_contiene("ana")
+    '%ana%'
+    >>> patron_contiene("50%_a\\\\b")
+    '%50\\\\%\\\\_a\\\\\\\\b%'
+    """
+    escapada = consulta.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escapada}%"
+
+
+class BusquedaRepository:
+    """Consultas de búsqueda por texto sobre las tablas de personas"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def buscar(self, consulta: str, tipos: Optional[Sequence[str]] = None, limit: int = 20) -> List[Row]:
+        """
+        Busca personas cuyo texto contenga o se parezca a la consulta.
+
+        Args:
+            consulta: Texto a buscar (ya normalizado)
+            tipos: Claves de FUENTES en las que buscar (todas si se omite)
+            limit: Máximo de resultados
+
+        Returns:
+            Filas (tipo, id, nombre, detalle, puntaje) de mayor a menor puntaje
+        """
+        ramas = [self._rama(tipo, consulta, limit) for tipo in (tipos or FUENTES)]
+        resultados = (union_all(*ramas) if len(ramas) > 1 else ramas[0]).subquery()
+        return list(self.db.execute(
+            select(resultados)
+            .order_by(resultados.c.puntaje.desc(), resultados.c.nombre, resultados.c.id)
+            .limit(limit)
+        ))
+
+    def _rama(self, tipo: str, consulta: str, limit: int):
+        """Mejores `limit` candidatos de un tipo de persona"""
+        fuente = FUENTES[tipo]
+        modelo = fuente.modelo
+        texto = func.texto_busqueda(*(getattr(modelo, campo) for campo in fuente.campos))
+        puntaje = func.word_similarity(consulta, texto)
+        nombre = getattr(modelo, fuente.nombre[0])
+        for campo in fuente.nombre[1:]:
+            nombre = nombre + " " + getattr(modelo, campo)
+        return (
+            select(
+                literal(tipo).label("tipo"),
+                modelo.id.label("id"),
+                nombre.label("nombre"),
+                getattr(modelo, fuente.detalle).label("detalle"),
+                puntaje.label("puntaje"),
+            )
+            .where(texto.op("%>")(consulta) | texto.ilike(patron_contiene(consulta), escape="\\"))
+            .order_by(puntaje.desc(), modelo.id)
+            .limit(limit)
+        )
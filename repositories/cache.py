@@ -0,0 +1,359 @@
+"""
+Caché de lectura para las tablas de catálogo (cursos, asignaturas, docentes
+y representantes)
+
+Estas tablas cambian poco, pero cada alta de matrícula, calificación o
+asistencia vuelve a leerlas para validar las referencias. RepositorioEnCache
+sirve read/read_all/read_filas/existing_ids/total desde la caché y solo consulta la BD en un
+fallo; los servicios invalidan la tabla al escribir en ella (invalidar_cache).
+
+Con varios workers cada uno tiene su propia caché: las escrituras emiten
+NOTIFY en el canal CANAL_INVALIDACION dentro de su transacción (PostgreSQL
+lo entrega solo si hay commit) y EscuchaInvalidaciones, un hilo por worker
+con LISTEN sobre una conexión propia, descarta las tablas notificadas.
+
+En la caché se guardan copias desligadas de la sesión con solo las columnas
+(sin relaciones). En un acierto la copia se une a la sesión actual con
+merge(load=False), que no ejecuta SQL. El backend predeterminado es un LRU
+en memoria del proceso con tiempo de vida (CACHE_TTL); con usar_backend_cache
+se puede poner otro con la misma interfaz (obtener, guardar, invalidar,
+generacion).
+
+Una lectura que falla en la caché toma la generación de la tabla antes de
+consultar la BD y la pasa a guardar: si la tabla se invalidó mientras
+tanto, la fila leída puede ser anterior a la escritura y no se guarda.
+"""
+import logging
+import select
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar
+from sqlalchemy import Row, event, inspect, text
+from sqlalchemy.orm import Session, make_transient_to_detached
+from config.settings import CACHE_ENTRADAS, CACHE_TTL
+from repositories.base import BaseRepository
+
+T = TypeVar('T')
+
+logger = logging.getLogger(__name__)
+
+# Canal de PostgreSQL por el que se anuncian las tablas modificadas
+CANAL_INVALIDACION = "invalidacion_cache"
+
+# Tablas servidas desde la caché (las que se descartan al reconectar la escucha)
+TABLAS_CATALOGO = ("cursos", "asignaturas", "docentes", "representantes")
+
+
+class CacheLRU:
+    """
+    Caché en memoria con desalojo LRU y tiempo de vida por entrada.
+
+    Las claves son tuplas cuyo primer elemento es el nombre de la tabla,
+    así invalidar(tabla) descarta todas las entradas de esa tabla. Además
+    incrementa la generación de la tabla: guardar con una generación
+    anterior no hace nada.
+
+    >>> ahora = [0.0]
+    >>> cache = CacheLRU(max_entradas=2, ttl=10, reloj=lambda: ahora[0])
+    >>> cache.guardar(("cursos", 1), "1A")
+    >>> cache.guardar(("cursos", 2), "1B")
+    >>> cache.obtener(("cursos", 1))
+    '1A'
+    >>> cache.guardar(("docentes", 7), "Ana")   # desaloja ("cursos", 2), el menos usado
+    >>> cache.obtener(("cursos", 2)) is None
+    True
+    >>> ahora[0] = 10.0
+    >>> cache.obtener(("cursos", 1)) is None      # expirada
+    True
+    >>> cache.guardar(("cursos", 3), "2A")
+    >>> cache.invalidar("cursos")
+    >>> cache.obtener(("cursos", 3)) is None
+    True
+    >>> generacion = cache.generacion("cursos")
+    >>> cache.invalidar("cursos")               # una escritura durante la lectura
+    >>> cache.guardar(("cursos", 4), "2B", generacion)
+    >>> cache.obtener(("cursos", 4)) is None
+    True
+    """
+
+    def __init__(self, max_entradas: int, ttl: float, reloj: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_entradas: Entradas máximas antes de desalojar la menos usada
+            ttl: Segundos que vive cada entrada
+            reloj: Función que devuelve el tiempo actual en segundos
+        """
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._reloj = reloj
+        self._datos: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._generaciones: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: tuple):
+        """Valor guardado para la clave, o None si no está o expiró"""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            expira, valor = entrada
+            if expira <= self._reloj():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def generacion(self, tabla: str) -> int:
+        """Número de veces que se ha invalidado la tabla"""
+        with self._lock:
+            return self._generaciones.get(tabla, 0)
+
+    def guardar(self, clave: tuple, valor, generacion: Optional[int] = None) -> None:
+        """
+        Guarda un valor, desalojando las entradas menos usadas si hace falta.
+
+        Args:
+            clave: Tupla que empieza con el nombre de la tabla
+            valor: Valor a guardar
+            generacion: Generación de la tabla tomada antes de leer el valor;
+                si la tabla se invalidó después, el valor no se guarda
+        """
+        with self._lock:
+            if generacion is not None and self._generaciones.get(clave[0], 0) != generacion:
+                return
+            self._datos[clave] = (self._reloj() + self.ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def invalidar(self, tabla: str) -> None:
+        """Descarta todas las entradas de la tabla"""
+        with self._lock:
+            self._generaciones[tabla] = self._generaciones.get(tabla, 0) + 1
+            for clave in [c for c in self._datos if c[0] == tabla]:
+                del self._datos[clave]
+
+
+# Backend en uso (None = caché desactivada con CACHE_TTL=0)
+_backend = CacheLRU(CACHE_ENTRADAS, CACHE_TTL) if CACHE_TTL > 0 else None
+
+
+def backend_cache():
+    """Backend de la caché en uso, o None si está desactivada"""
+    return _backend
+
+
+def usar_backend_cache(backend) -> None:
+    """
+    Reemplaza el backend de la caché (None la desactiva).
+
+    Args:
+        backend: Objeto con obtener(clave), guardar(clave, valor, generacion),
+            invalidar(tabla) y generacion(tabla). Un backend compartido entre procesos debe
+            serializar los valores (las copias desligadas admiten pickle).
+    """
+    global _backend
+    _backend = backend
+
+
+def invalidar_cache(*tablas: str) -> None:
+    """Descarta de la caché todas las entradas de las tablas dadas"""
+    if _backend is not None:
+        for tabla in tablas:
+            _backend.invalidar(tabla)
+
+
+def notificar_al_confirmar(db: Session, tablas: Sequence[str]) -> Callable[[], None]:
+    """
+    Emite NOTIFY con cada tabla en cada commit de la sesión, dentro de la
+    misma transacción que la escritura (si hay rollback no se notifica).
+
+    Args:
+        db: Sesión que hará la escritura
+        tablas: Tablas que modifica
+
+    Returns:
+        Función que deja de notificar (llamarla al terminar la operación)
+    """
+    def notificar(sesion):
+        for tabla in tablas:
+            sesion.execute(text("SELECT pg_notify(:canal, :tabla)"),
+                           {"canal": CANAL_INVALIDACION, "tabla": tabla})
+
+    event.listen(db, "before_commit", notificar)
+    return lambda: event.remove(db, "before_commit", notificar)
+
+
+class EscuchaInvalidaciones(threading.Thread):
+    """
+    Hilo que escucha CANAL_INVALIDACION y descarta de la caché local las
+    tablas notificadas (también las escritas por este mismo worker, que ya
+    las invalidó; descartarlas otra vez no cuesta nada).
+
+    Usa una conexión psycopg2 propia, fuera del pool. Si se pierde, se
+    reconecta y descarta todas las tablas de catálogo, porque las
+    notificaciones enviadas mientras tanto no se reciben; cada error queda
+    en el log. Con otro driver no arranca (solo avisa): las escrituras de
+    otros workers se ven al expirar CACHE_TTL o al comprobar la versión de
+    la tabla (sincronizar_version).
+    """
+
+    def __init__(self, engine, espera: float = 1.0, reintento: float = 5.0):
+        """
+        Args:
+            engine: Motor síncrono (se usa su URL y su driver)
+            espera: Segundos entre comprobaciones de la señal de parada
+            reintento: Segundos antes de reconectar tras un error
+        """
+        super().__init__(name="escucha-invalidaciones", daemon=True)
+        self.engine = engine
+        self.espera = espera
+        self.reintento = reintento
+        self._parar = threading.Event()
+
+    def start(self) -> None:
+        driver = self.engine.dialect.driver
+        if driver != "psycopg2":
+            logger.warning("Escucha de invalidaciones desactivada: necesita el driver psycopg2 "
+                           "(poll/notifies) y el motor usa %s", driver)
+            return
+        super().start()
+
+    def detener(self) -> None:
+        self._parar.set()
+        if self.is_alive():
+            self.join(timeout=self.espera + 1)
+
+    def run(self) -> None:
+        while not self._parar.is_set():
+            conexion = None
+            try:
+                conexion = self._conectar()
+                invalidar_cache(*TABLAS_CATALOGO)
+                self._escuchar(conexion)
+            except Exception:
+                logger.exception("Error en la escucha de invalidaciones; se reconecta en %s s", self.reintento)
+                self._parar.wait(self.reintento)
+            finally:
+                if conexion is not None:
+                    conexion.close()
+
+    def _conectar(self):
+        dialecto = self.engine.dialect
+        cargs, cparams = dialecto.create_connect_args(self.engine.url)
+        conexion = dialecto.connect(*cargs, **cparams)
+        conexion.autocommit = True
+        with conexion.cursor() as cursor:
+            cursor.execute(f"LISTEN {CANAL_INVALIDACION}")
+        return conexion
+
+    def _escuchar(self, conexion) -> None:
+        while not self._parar.is_set():
+            if not select.select([conexion], [], [], self.espera)[0]:
+                continue
+            conexion.poll()
+            tablas = {aviso.payload for aviso in conexion.notifies}
+            conexion.notifies.clear()
+            invalidar_cache(*tablas)
+
+
+# Última versión de cada tabla (versiones_tablas) vista por este proceso
+_versiones_vistas: Dict[str, int] = {}
+
+
+def sincronizar_version(tabla: str, version: int) -> None:
+    """
+    Descarta la tabla de la caché si su versión en la BD no es la última
+    que vio este proceso: la escritura de otro worker ya se confirmó aunque
+    su NOTIFY aún no haya llegado.
+    """
+    if _versiones_vistas.get(tabla) != version:
+        invalidar_cache(tabla)
+        _versiones_vistas[tabla] = version
+
+
+class RepositorioEnCache(BaseRepository[T]):
+    """
+    Repositorio cuyas lecturas sin include se sirven desde la caché.
+    Las lecturas con include (relaciones anidadas) siempre van a la BD.
+    """
+
+    def read(self, id: int, include: Sequence[str] = ()) -> Optional[T]:
+        cache = backend_cache()
+        if include or cache is None:
+            return super().read(id, include)
+        clave = (self.model.__tablename__, "id", id)
+        copia = cache.obtener(clave)
+        if copia is not None:
+            return self.db.merge(copia, load=False)
+        generacion = cache.generacion(clave[0])
+        db_obj = super().read(id)
+        if db_obj is not None:
+            cache.guardar(clave, self._copia(db_obj), generacion)
+        return db_obj
+
+    def read_all(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None,
+                 include: Sequence[str] = ()) -> List[T]:
+        cache = backend_cache()
+        if include or cache is None:
+            return super().read_all(skip, limit, after_id, include)
+        clave = (self.model.__tablename__, "pagina", skip if after_id is None else None, limit, after_id)
+        copias = cache.obtener(clave)
+        if copias is not None:
+            return [self.db.merge(copia, load=False) for copia in copias]
+        generacion = cache.generacion(clave[0])
+        db_objs = super().read_all(skip, limit, after_id)
+        cache.guardar(clave, [self._copia(db_obj) for db_obj in db_objs], generacion)
+        return db_objs
+
+    def read_filas(self, columnas: Sequence[str], skip: int = 0, limit: int = 100,
+                   after_id: Optional[int] = None) -> List[Row]:
+        """Las filas no están ligadas a la sesión: se guardan tal cual"""
+        cache = backend_cache()
+        if cache is None:
+            return super().read_filas(columnas, skip, limit, after_id)
+        clave = (self.model.__tablename__, "filas", tuple(columnas), skip if after_id is None else None, limit, after_id)
+        filas = cache.obtener(clave)
+        if filas is None:
+            generacion = cache.generacion(clave[0])
+            filas = super().read_filas(columnas, skip, limit, after_id)
+            cache.guardar(clave, filas, generacion)
+        return filas
+
+    def existing_ids(self, ids: Iterable[int]) -> Set[int]:
+        """Los IDs en caché existen; solo se consultan los demás"""
+        cache = backend_cache()
+        ids = set(ids)
+        if cache is None:
+            return super().existing_ids(ids)
+        tabla = self.model.__tablename__
+        en_cache = {id for id in ids if cache.obtener((tabla, "id", id)) is not None}
+        return en_cache | super().existing_ids(ids - en_cache)
+
+    def total(self, exacto: bool = False, **kwargs) -> Tuple[int, bool]:
+        """El total de la tabla también se guarda en la caché (se invalida con ella)"""
+        cache = backend_cache()
+        if cache is None:
+            return super().total(exacto, **kwargs)
+        clave = (self.model.__tablename__, "total", exacto)
+        total = cache.obtener(clave)
+        if total is None:
+            generacion = cache.generacion(clave[0])
+            total = super().total(exacto, **kwargs)
+            cache.guardar(clave, total, generacion)
+        return total
+
+    def version(self) -> Tuple[str, int, Optional[datetime]]:
+        """Versión de la tabla; si cambió, los datos en caché ya no sirven"""
+        tabla, version, modificado = super().version()
+        sincronizar_version(tabla, version)
+        return tabla, version, modificado
+
+    def _copia(self, db_obj: T) -> T:
+        """Copia desligada con los valores de las columnas del objeto"""
+        columnas = inspect(self.model).column_attrs
+        copia = self.model(**{c.key: getattr(db_obj, c.key) for c in columnas})
+        make_transient_to_detached(copia)
+        return copia
@@ -0,0 +1,212 @@
+"""
+Importación masiva desde CSV con COPY FROM STDIN
+
+El archivo se copia tal cual a una tabla temporal de texto; la conversión
+de tipos, las reglas de validación y las claves foráneas se comprueban con
+una sola consulta sobre todas las filas, y los datos válidos se insertan
+con INSERT ... SELECT. Nada se valida fila por fila en Python.
+"""
+import csv
+from enum import Enum
+from typing import BinaryIO, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+from sqlalchemy import column, text
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+# Errores que se devuelven como máximo (las primeras filas con problemas)
+MAX_ERRORES = 100
+
+ENTERO = r"^\s*[+-]?\d{1,9}\s*$"
+DECIMAL = r"^\s*[+-]?(\d+([.,]\d*)?|[.,]\d+)\s*$"
+FECHA = r"^\s*\d{4}-\d{2}-\d{2}\s*$"
+
+
+def como_entero(valor: str) -> str:
+    """Expresión SQL que convierte el texto a integer (NULL si no es válido)"""
+    return f"CASE WHEN {valor} ~ '{ENTERO}' THEN trim({valor})::integer END"
+
+
+def como_decimal(valor: str) -> str:
+    """Expresión SQL que convierte el texto a número, aceptando coma decimal (NULL si no es válido)"""
+    return f"CASE WHEN {valor} ~ '{DECIMAL}' THEN replace(trim({valor}), ',', '.')::double precision END"
+
+
+def como_fecha(valor: str) -> str:
+    """Expresión SQL que convierte una fecha AAAA-MM-DD a date (NULL si no existe en el calendario)"""
+    anio, mes, dia = (f"split_part(trim({valor}), '-', {i})::integer" for i in (1, 2, 3))
+    return (
+        f"CASE WHEN {valor} ~ '{FECHA}' AND {anio} >= 1 AND {mes} BETWEEN 1 AND 12 THEN "
+        f"CASE WHEN {dia} BETWEEN 1 AND extract(day from make_date({anio}, {mes}, 1) + interval '1 month - 1 day') "
+        f"THEN trim({valor})::date END END"
+    )
+
+
+def como_enum(enum: Type[Enum], tipo_pg: str) -> Callable[[str], str]:
+    """
+    Conversión a un tipo enumerado de PostgreSQL (sin distinguir mayúsculas).
+
+    >>> from models.enums import EstadoAsistencia
+    >>> como_enum(EstadoAsistencia, "estado_asistencia")("r.estado")
+    "CASE WHEN upper(trim(r.estado)) IN ('PRESENTE', 'AUSENTE', 'ATRASO', 'JUSTIFICADO') THEN upper(trim(r.estado))::estado_asistencia END"
+    """
+    valores = ", ".join(f"'{e.value}'" for e in enum)
+
+    def conversion(valor: str) -> str:
+        return f"CASE WHEN upper(trim({valor})) IN ({valores}) THEN upper(trim({valor}))::{tipo_pg} END"
+    return conversion
+
+
+class ColumnaCSV(NamedTuple):
+    """
+    Columna aceptada en el CSV.
+
+    conversion: Función que recibe la columna de texto y devuelve la expresión SQL tipada
+    tipo: Tipo de SQLAlchemy del valor convertido
+    predeterminado: Expresión SQL usada si la columna falta o está vacía
+        (None = columna obligatoria)
+    """
+    conversion: Callable[[str], str]
+    tipo: object
+    predeterminado: Optional[str] = None
+
+
+class ImportacionCSV:
+    """
+    Carga y valida un CSV en una tabla temporal de la transacción actual.
+
+    La tabla temporal se elimina al terminar la transacción (ON COMMIT DROP),
+    así que cargar, validar e insertar deben ocurrir antes del commit o rollback.
+    """
+
+    def __init__(self, db: Session, destino: str, columnas: Dict[str, ColumnaCSV],
+                 referencias: Dict[str, Tuple[str, str]] = None,
+                 reglas: Sequence[Tuple[str, str]] = ()):
+        """
+        Args:
+            db: Sesión de SQLAlchemy
+            destino: Tabla donde se insertarán las filas (ej: "calificaciones")
+            columnas: Columnas aceptadas en el CSV
+            referencias: {columna: (tabla, entidad)} claves foráneas a comprobar
+            reglas: (condición, mensaje) en SQL sobre los valores convertidos
+                (alias t); la fila es inválida si la condición es verdadera
+        """
+        self.db = db
+        self.tabla = f"importacion_{destino}"
+        self.columnas = columnas
+        self.referencias = referencias or {}
+        self.reglas = reglas
+
+    def cargar(self, archivo: BinaryIO) -> int:
+        """
+        Lee la cabecera y copia el resto del archivo con COPY FROM STDIN.
+
+        Args:
+            archivo: CSV en binario (UTF-8) con cabecera
+
+        Returns:
+            Número de filas cargadas
+
+        Raises:
+            ValueError: Si la cabecera no es válida o el CSV está mal formado
+        """
+        cabecera = archivo.readline().decode("utf-8-sig")
+        encontradas = [c.strip().lower() for c in next(csv.reader([cabecera]), [])]
+        desconocidas = [c for c in encontradas if c not in self.columnas]
+        faltantes = [
+            c for c, definicion in self.columnas.items()
+            if definicion.predeterminado is None and c not in encontradas
+        ]
+        if desconocidas or faltantes or len(set(encontradas)) != len(encontradas):
+            raise ValueError(
+                f"Cabecera inválida: se esperan las columnas {', '.join(self.columnas)}"
+                + (f"; faltan {', '.join(faltantes)}" if faltantes else "")
+                + (f"; sobran {', '.join(desconocidas)}" if desconocidas else "")
+            )
+
+        definicion = ", ".join(f"{c} text" for c in self.columnas)
+        self.db.execute(text(
+            f"CREATE TEMP TABLE {self.tabla} "
+            f"(linea bigint GENERATED ALWAYS AS IDENTITY, {definicion}) ON COMMIT DROP"
+        ))
+        self._copiar(encontradas, archivo)
+        # Sin estadísticas el planificador supone una tabla temporal pequeña
+        # y valida las claves foráneas con bucles anidados
+        self.db.execute(text(f"ANALYZE {self.tabla}"))
+        return self.db.execute(text(f"SELECT count(*) FROM {self.tabla}")).scalar()
+
+    def _copiar(self, columnas: List[str], archivo: BinaryIO) -> None:
+        """Ejecuta COPY con el driver de la conexión (psycopg2 o asyncpg)"""
+        conexion = self.db.connection().connection
+        driver = conexion.driver_connection
+        try:
+            if hasattr(driver, "copy_to_table"):
+                from asyncpg import PostgresError as ErrorCopia
+                await_only(driver.copy_to_table(self.tabla, source=archivo, columns=columnas, format="csv"))
+            else:
+                from psycopg2 import Error as ErrorCopia
+                with conexion.cursor() as cursor:
+                    cursor.copy_expert(
+                        f"COPY {self.tabla} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT csv)", archivo
+                    )
+        except ErrorCopia as e:
+            raise ValueError(f"CSV inválido: {str(e).splitlines()[0]}")
+
+    def _convertidas(self) -> str:
+        """
+        FROM con cada fila de texto (r) y sus valores convertidos (t).
+        OFFSET 0 evita que el planificador aplane la subconsulta y repita
+        cada conversión (expresiones regulares) en cada uso de t.
+        """
+        valores = ", ".join(
+            f"{c.conversion(f'r.{nombre}')} AS {nombre}" for nombre, c in self.columnas.items()
+        )
+        return f"{self.tabla} r CROSS JOIN LATERAL (SELECT {valores} OFFSET 0) t"
+
+    def errores(self, limite: int = MAX_ERRORES) -> Dict[int, List[str]]:
+        """
+        Valida todas las filas cargadas en una sola consulta.
+
+        Args:
+            limite: Máximo de filas con errores a devolver
+
+        Returns:
+            Mensajes de error por posición de registro (0 = primera fila de datos)
+        """
+        mensajes = []
+        for nombre, c in self.columnas.items():
+            invalido = f"t.{nombre} IS NULL"
+            if c.predeterminado is not None:
+                invalido += f" AND NULLIF(trim(r.{nombre}), '') IS NOT NULL"
+            mensajes.append(
+                f"CASE WHEN {invalido} THEN 'Valor inválido en {nombre}: ' || COALESCE(r.{nombre}, '(vacío)') END"
+            )
+        uniones = []
+        for i, (nombre, (tabla, entidad)) in enumerate(self.referencias.items()):
+            uniones.append(f"LEFT JOIN {tabla} ref{i} ON ref{i}.id = t.{nombre}")
+            mensajes.append(
+                f"CASE WHEN t.{nombre} IS NOT NULL AND ref{i}.id IS NULL "
+                f"THEN '{entidad} con ID ' || t.{nombre} || ' no existe' END"
+            )
+        mensajes.extend(f"CASE WHEN {condicion} THEN '{mensaje}' END" for condicion, mensaje in self.reglas)
+
+        filas = self.db.execute(text(
+            f"SELECT linea, errores FROM ("
+            f"  SELECT r.linea, array_remove(ARRAY[{', '.join(mensajes)}], NULL) AS errores"
+            f"  FROM {self._convertidas()} {' '.join(uniones)}"
+            f") v WHERE cardinality(errores) > 0 ORDER BY linea LIMIT :limite"
+        ), {"limite": limite})
+        return {linea - 1: list(errores) for linea, errores in filas}
+
+    def filas(self):
+        """
+        SELECT de los valores convertidos, con los predeterminados aplicados,
+        en el orden del archivo (para INSERT ... SELECT).
+        """
+        valores = ", ".join(
+            f"COALESCE(t.{nombre}, {c.predeterminado}) AS {nombre}" if c.predeterminado is not None
+            else f"t.{nombre}"
+            for nombre, c in self.columnas.items()
+        )
+        return text(f"SELECT {valores} FROM {self._convertidas()} ORDER BY r.linea").columns(
+            *(column(nombre, c.tipo) for nombre, c in self.columnas.items())
+        )
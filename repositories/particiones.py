@@ -0,0 +1,86 @@
+"""
+Particiones mensuales de asistencias
+
+asistencias está particionada por rango de fecha: una partición por mes
+(asistencias_AAAA_MM), asistencias_default para las fechas que aún no
+tienen la suya y, en las bases migradas con migrations/005,
+asistencias_historico con todo lo anterior a la migración.
+
+La función SQL crear_particiones_asistencias crea las particiones que
+falten y les mueve las filas de su mes que hubieran caído en la partición
+por defecto. Hay que crearlas antes de que lleguen las fechas (ver
+manage_partitions.py); mientras tanto las filas van a asistencias_default,
+que no se poda por fecha.
+"""
+from datetime import date
+from typing import List, NamedTuple, Optional
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+# Partición que recibe las fechas sin partición propia
+PARTICION_POR_DEFECTO = "asistencias_default"
+
+
+def sumar_meses(fecha: date, meses: int) -> date:
+    """
+    Primer día del mes que está `meses` meses después del de la fecha.
+
+    >>> sumar_meses(date(2024, 11, 15), 3)
+    datetime.date(2025, 2, 1)
+    >>> sumar_meses(date(2024, 1, 31), 0)
+    datetime.date(2024, 1, 1)
+    """
+    indice = fecha.year * 12 + fecha.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+class Particion(NamedTuple):
+    """Partición de asistencias con su rango y sus filas estimadas"""
+    nombre: str
+    rango: str    # "FOR VALUES FROM (...) TO (...)" o "DEFAULT"
+    filas: int    # Estimación del planificador (0 si aún no se analizó)
+
+
+class ParticionesRepository:
+    """Creación y consulta de las particiones de asistencias"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def crear(self, desde: date, hasta: date) -> int:
+        """
+        Crea las particiones mensuales que falten entre los meses de las dos fechas.
+
+        Args:
+            desde: Fecha del primer mes
+            hasta: Fecha del último mes (inclusive)
+
+        Returns:
+            Número de particiones creadas
+        """
+        creadas = self.db.execute(select(func.crear_particiones_asistencias(desde, hasta))).scalar_one()
+        self.db.commit()
+        return creadas
+
+    def asegurar(self, meses: int, hoy: Optional[date] = None) -> int:
+        """
+        Crea las particiones desde el mes actual hasta `meses` meses adelante.
+
+        Returns:
+            Número de particiones creadas
+        """
+        hoy = hoy or date.today()
+        return self.crear(hoy, sumar_meses(hoy, meses))
+
+    def listar(self) -> List[Particion]:
+        """Particiones de asistencias ordenadas por nombre"""
+        filas = self.db.execute(text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), greatest(c.reltuples, 0)::bigint "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'asistencias'::regclass ORDER BY c.relname"
+        ))
+        return [Particion(*fila) for fila in filas]
+
+    def filas_sin_particion(self) -> int:
+        """Filas en la partición por defecto (fechas de meses sin partición)"""
+        return self.db.execute(text(f"SELECT count(*) FROM {PARTICION_POR_DEFECTO}")).scalar_one()
@@ -2,16 +2,21 @@
 Repositorios para todas las entidades
 CRUD básico sin lógica de negocio
 """
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from repositories.base import BaseRepository
+from datetime import date
+from typing import Optional, Dict, List, Iterable, Sequence, Set, Tuple
+from sqlalchemy import Integer, and_, bindparam, delete, func, insert, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, aliased
+from repositories.base import BaseRepository, TAMANO_LOTE
+from repositories.cache import RepositorioEnCache
 from models import (
     Representante, Estudiante, Docente, Curso, Asignatura,
-    Matricula, Asistencia, Calificacion
+    Matricula, Asistencia, Calificacion, ResumenCalificacion, EstadoMatricula
 )
 
 
-class RepresentanteRepository(BaseRepository[Representante]):
+class RepresentanteRepository(RepositorioEnCache[Representante]):
     """Repositorio para Representantes"""
     
     def __init__(self, db: Session):
@@ -42,6 +47,15 @@ class EstudianteRepository(BaseRepository[Estudiante]):
             Estudiante.correo == correo
         ).first()
 
+    def get_cedulas_existentes(self, cedulas: Iterable[str]) -> Set[str]:
+        """Devuelve cuáles de las cédulas dadas ya están registradas"""
+        cedulas = set(cedulas)
+        if not cedulas:
+            return set()
+        return set(self.db.scalars(
+            select(Estudiante.cedula).where(Estudiante.cedula.in_(cedulas))
+        ))
+
     def get_by_representante(self, representante_id: int) -> List[Estudiante]:
         """Obtiene todos los estudiantes de un representante"""
         return self.db.query(Estudiante).filter(
@@ -49,7 +63,7 @@ class EstudianteRepository(BaseRepository[Estudiante]):
         ).all()
 
 
-class DocenteRepository(BaseRepository[Docente]):
+class DocenteRepository(RepositorioEnCache[Docente]):
     """Repositorio para Docentes"""
     
     def __init__(self, db: Session):
@@ -61,8 +75,17 @@ class DocenteRepository(BaseRepository[Docente]):
             Docente.correo == correo
         ).first()
 
+    def get_correos_existentes(self, correos: Iterable[str]) -> Set[str]:
+        """Devuelve cuáles de los correos dados ya están registrados"""
+        correos = set(correos)
+        if not correos:
+            return set()
+        return set(self.db.scalars(
+            select(Docente.correo).where(Docente.correo.in_(correos))
+        ))
+
 
-class CursoRepository(BaseRepository[Curso]):
+class CursoRepository(RepositorioEnCache[Curso]):
     """Repositorio para Cursos"""
     
     def __init__(self, db: Session):
@@ -81,7 +104,7 @@ class CursoRepository(BaseRepository[Curso]):
         ).all()
 
 
-class AsignaturaRepository(BaseRepository[Asignatura]):
+class AsignaturaRepository(RepositorioEnCache[Asignatura]):
     """Repositorio para Asignaturas"""
     
     def __init__(self, db: Session):
@@ -106,9 +129,12 @@ class MatriculaRepository(BaseRepository[Matricula]):
     def __init__(self, db: Session):
         super().__init__(db, Matricula)
 
-    def get_by_estudiante(self, estudiante_id: int) -> List[Matricula]:
-        """Obtiene todas las matrículas de un estudiante"""
-        return self.db.query(Matricula).filter(
+    def get_by_estudiante(self, estudiante_id: int, include: Sequence[str] = ()) -> List[Matricula]:
+        """Obtiene todas las matrículas de un estudiante (con las relaciones de include)"""
+        query = self.db.query(Matricula)
+        if include:
+            query = query.options(*self.opciones_carga(include))
+        return query.filter(
             Matricula.estudiante_id == estudiante_id
         ).all()
 
@@ -131,6 +157,46 @@ class MatriculaRepository(BaseRepository[Matricula]):
             Matricula.curso_id == curso_id
         ).first()
 
+    def retirar(self, ids: Iterable[int] = (), estudiante_ids: Iterable[int] = ()) -> List[Matricula]:
+        """
+        Pasa a RETIRADO, con un solo UPDATE, las matrículas indicadas y todas
+        las de los estudiantes indicados. Las que ya estaban retiradas o
+        graduadas no cambian.
+        
+        Returns:
+            Matrículas que se retiraron
+        """
+        ids, estudiante_ids = set(ids), set(estudiante_ids)
+        if not ids and not estudiante_ids:
+            return []
+        try:
+            stmt = (
+                update(Matricula)
+                .where(Matricula.id.in_(ids) | Matricula.estudiante_id.in_(estudiante_ids))
+                .where(Matricula.estado.not_in([EstadoMatricula.RETIRADO, EstadoMatricula.GRADUADO]))
+                .values(estado=EstadoMatricula.RETIRADO)
+                .returning(Matricula)
+            )
+            db_objs = self.db.scalars(stmt, execution_options={"populate_existing": True}).all()
+            self._desvincular(db_objs)
+            self.db.commit()
+            return sorted(db_objs, key=lambda m: m.id)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error al retirar Matricula: {str(e)}")
+
+    def get_pares_existentes(self, pares: Iterable[Tuple[int, int]]) -> Set[Tuple[int, int]]:
+        """Devuelve cuáles de los pares (estudiante_id, curso_id) ya tienen matrícula"""
+        pares = set(pares)
+        if not pares:
+            return set()
+        filas = self.db.execute(
+            select(Matricula.estudiante_id, Matricula.curso_id).where(
+                tuple_(Matricula.estudiante_id, Matricula.curso_id).in_(pares)
+            )
+        )
+        return {tuple(fila) for fila in filas}
+
 
 class AsistenciaRepository(BaseRepository[Asistencia]):
     """Repositorio para Asistencias"""
@@ -138,17 +204,44 @@ class AsistenciaRepository(BaseRepository[Asistencia]):
     def __init__(self, db: Session):
         super().__init__(db, Asistencia)
 
-    def get_by_matricula(self, matricula_id: int) -> List[Asistencia]:
-        """Obtiene todas las asistencias de una matrícula"""
-        return self.db.query(Asistencia).filter(
-            Asistencia.matricula_id == matricula_id
-        ).all()
-
-    def get_by_asignatura(self, asignatura_id: int) -> List[Asistencia]:
-        """Obtiene todas las asistencias de una asignatura"""
-        return self.db.query(Asistencia).filter(
-            Asistencia.asignatura_id == asignatura_id
-        ).all()
+    def get_by_matricula(self, matricula_id: int, desde: Optional[date] = None,
+                         hasta: Optional[date] = None) -> List[Asistencia]:
+        """Obtiene las asistencias de una matrícula (entre dos fechas, si se indican)"""
+        return self.get_by_periodo(desde, hasta, matricula_id=matricula_id)
+
+    def get_by_asignatura(self, asignatura_id: int, desde: Optional[date] = None,
+                          hasta: Optional[date] = None) -> List[Asistencia]:
+        """Obtiene las asistencias de una asignatura (entre dos fechas, si se indican)"""
+        return self.get_by_periodo(desde, hasta, asignatura_id=asignatura_id)
+
+    def get_by_periodo(self, desde: Optional[date] = None, hasta: Optional[date] = None,
+                       matricula_id: Optional[int] = None,
+                       asignatura_id: Optional[int] = None) -> List[Asistencia]:
+        """
+        Obtiene las asistencias entre dos fechas (inclusive), ordenadas por fecha.
+        
+        La tabla está particionada por mes: con desde/hasta PostgreSQL solo
+        lee las particiones de esos meses.
+        
+        Args:
+            desde: Primera fecha (sin límite si se omite)
+            hasta: Última fecha (sin límite si se omite)
+            matricula_id: Solo las de esta matrícula
+            asignatura_id: Solo las de esta asignatura
+            
+        Returns:
+            Lista de asistencias
+        """
+        query = select(Asistencia)
+        if matricula_id is not None:
+            query = query.where(Asistencia.matricula_id == matricula_id)
+        if asignatura_id is not None:
+            query = query.where(Asistencia.asignatura_id == asignatura_id)
+        if desde is not None:
+            query = query.where(Asistencia.fecha >= desde)
+        if hasta is not None:
+            query = query.where(Asistencia.fecha <= hasta)
+        return list(self.db.scalars(query.order_by(Asistencia.fecha, Asistencia.id)))
 
     def get_by_estado(self, estado: str) -> List[Asistencia]:
         """Obtiene asistencias por estado"""
@@ -157,11 +250,358 @@ class AsistenciaRepository(BaseRepository[Asistencia]):
         ).all()
 
 
+class ResumenCalificacionRepository:
+    """
+    Repositorio para el resumen de calificaciones (resumen_calificaciones)
+
+    Sus métodos de escritura no confirman la transacción: se ejecutan
+    dentro de la misma transacción que modifica las calificaciones.
+
+    Cada escritura toma antes un bloqueo de asesoría por grupo
+    (pg_advisory_xact_lock, hasta el commit) en orden de _id_bloqueo. Así
+    recalcular, que reemplaza el grupo con un agregado leído de
+    calificaciones, espera a que terminen las sumas concurrentes del grupo
+    y lee sus notas, en lugar de sobrescribirlas con un agregado anterior.
+    """
+
+    CLAVE = ("matricula_id", "asignatura_id", "quimestre")
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def sumar(self, calificaciones: Iterable[dict]) -> None:
+        """
+        Acumula notas nuevas en sus grupos con INSERT ... ON CONFLICT DO UPDATE.
+        Las notas de un mismo grupo se agregan antes de enviarlas.
+        """
+        grupos: Dict[Tuple[int, int, int], dict] = {}
+        for cal in calificaciones:
+            clave = tuple(cal[c] for c in self.CLAVE)
+            nota = cal["nota"]
+            grupo = grupos.get(clave)
+            if grupo is None:
+                grupos[clave] = dict(zip(self.CLAVE, clave), suma=nota, cantidad=1, minimo=nota, maximo=nota)
+            else:
+                grupo["suma"] += nota
+                grupo["cantidad"] += 1
+                grupo["minimo"] = min(grupo["minimo"], nota)
+                grupo["maximo"] = max(grupo["maximo"], nota)
+
+        self._bloquear(grupos)
+        filas = [grupos[clave] for clave in sorted(grupos)]
+        for inicio in range(0, len(filas), TAMANO_LOTE):
+            self.db.execute(self._acumular(
+                pg_insert(ResumenCalificacion).values(filas[inicio:inicio + TAMANO_LOTE])
+            ))
+
+    def sumar_desde(self, notas) -> None:
+        """
+        Acumula las notas de una subconsulta o CTE con columnas matricula_id,
+        asignatura_id, quimestre y nota, agregándolas en la BD (para cargas
+        masivas que no pasan por Python).
+
+        Las claves solo se conocen dentro de la sentencia, así que los
+        bloqueos de los grupos se toman en ella, antes de acumular cada uno.
+        """
+        columnas = [notas.c[c] for c in self.CLAVE]
+        agregado = select(
+            *columnas,
+            func.sum(notas.c.nota).label("suma"),
+            func.count(notas.c.nota).label("cantidad"),
+            func.min(notas.c.nota).label("minimo"),
+            func.max(notas.c.nota).label("maximo"),
+            self._id_bloqueo(*columnas).label("bloqueo"),
+        ).group_by(*columnas).subquery()
+        # PostgreSQL evalúa las funciones volátiles de la lista de salida
+        # después del ORDER BY: los bloqueos se toman en orden de _id_bloqueo
+        bloqueados = select(
+            agregado, func.pg_advisory_xact_lock(agregado.c.bloqueo).label("bloqueado")
+        ).order_by(agregado.c.bloqueo).subquery()
+        campos = [*self.CLAVE, "suma", "cantidad", "minimo", "maximo"]
+        self.db.execute(self._acumular(pg_insert(ResumenCalificacion).from_select(
+            campos, select(*(bloqueados.c[c] for c in campos))
+        )))
+
+    def _bloquear(self, claves: Iterable[Tuple[int, int, int]]) -> None:
+        """
+        Toma el bloqueo de asesoría de cada grupo hasta el fin de la transacción.
+
+        Todas las escrituras los toman en orden de _id_bloqueo, así dos
+        transacciones no se interbloquean.
+        """
+        claves = sorted(set(claves))
+        if not claves:
+            return
+        arreglos = [
+            bindparam(f"{campo}s", [clave[i] for clave in claves], type_=ARRAY(Integer))
+            for i, campo in enumerate(self.CLAVE)
+        ]
+        grupos = func.unnest(*arreglos).table_valued(*self.CLAVE).render_derived(name="grupos")
+        ids = (
+            select(self._id_bloqueo(*(grupos.c[c] for c in self.CLAVE)).label("id"))
+            .distinct()
+            .order_by("id")
+            .subquery()
+        )
+        self.db.execute(select(func.count(func.pg_advisory_xact_lock(ids.c.id))))
+
+    @staticmethod
+    def _id_bloqueo(matricula_id, asignatura_id, quimestre):
+        """Clave del bloqueo de asesoría de un grupo (expresión SQL)"""
+        return func.hashtext(func.concat_ws(",", matricula_id, asignatura_id, quimestre))
+
+    def _acumular(self, stmt):
+        """Suma los grupos que ya existen en lugar de reemplazarlos (ON CONFLICT DO UPDATE)"""
+        return stmt.on_conflict_do_update(
+            index_elements=list(self.CLAVE),
+            set_={
+                "suma": ResumenCalificacion.suma + stmt.excluded.suma,
+                "cantidad": ResumenCalificacion.cantidad + stmt.excluded.cantidad,
+                "minimo": func.least(ResumenCalificacion.minimo, stmt.excluded.minimo),
+                "maximo": func.greatest(ResumenCalificacion.maximo, stmt.excluded.maximo),
+            },
+        )
+
+    def recalcular(self, claves: Iterable[Tuple[int, int, int]]) -> None:
+        """
+        Recalcula desde calificaciones los grupos indicados (matricula_id,
+        asignatura_id, quimestre). Se usa al modificar o eliminar notas,
+        donde el mínimo y el máximo no pueden ajustarse de forma incremental.
+        Los cambios pendientes de la sesión deben estar ya enviados (flush).
+
+        El agregado se lee en sentencias posteriores a los bloqueos: con
+        READ COMMITTED ven las notas que sumaron las transacciones por las
+        que hubo que esperar.
+        """
+        claves = sorted(set(claves))
+        if not claves:
+            return
+        self._bloquear(claves)
+        columnas = [getattr(Calificacion, c) for c in self.CLAVE]
+        resumen = [getattr(ResumenCalificacion, c) for c in self.CLAVE]
+
+        stmt = pg_insert(ResumenCalificacion).from_select(
+            [*self.CLAVE, "suma", "cantidad", "minimo", "maximo"],
+            self._agregado().where(tuple_(*columnas).in_(claves)),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(self.CLAVE),
+            set_={c: stmt.excluded[c] for c in ("suma", "cantidad", "minimo", "maximo")},
+        )
+        self.db.execute(stmt)
+
+        # Grupos que se quedaron sin notas
+        self.db.execute(
+            delete(ResumenCalificacion)
+            .where(tuple_(*resumen).in_(claves))
+            .where(~select(Calificacion.id).where(
+                *(c == r for c, r in zip(columnas, resumen))
+            ).exists())
+        )
+
+    def reconstruir(self) -> int:
+        """
+        Vacía el resumen y lo vuelve a calcular a partir de todas las calificaciones.
+
+        Bloquea las escrituras de calificaciones hasta el commit (SHARE), así
+        ninguna nota se suma o recalcula a la vez sobre el resumen vaciado.
+
+        Returns:
+            Número de grupos generados
+        """
+        self.db.execute(text("LOCK TABLE calificaciones IN SHARE MODE"))
+        self.db.execute(delete(ResumenCalificacion))
+        resultado = self.db.execute(insert(ResumenCalificacion).from_select(
+            [*self.CLAVE, "suma", "cantidad", "minimo", "maximo"],
+            self._agregado(),
+        ))
+        return resultado.rowcount
+
+    @classmethod
+    def _agregado(cls):
+        """SELECT con suma, cantidad, mínimo y máximo de las notas por grupo"""
+        columnas = [getattr(Calificacion, c) for c in cls.CLAVE]
+        return select(
+            *columnas,
+            func.sum(Calificacion.nota),
+            func.count(Calificacion.nota),
+            func.min(Calificacion.nota),
+            func.max(Calificacion.nota),
+        ).group_by(*columnas)
+
+    @staticmethod
+    def _promedio():
+        """Promedio ponderado de varios grupos: suma total / cantidad total"""
+        return func.sum(ResumenCalificacion.suma) / func.nullif(func.sum(ResumenCalificacion.cantidad), 0)
+
+    def get_promedio(self, matricula_id: int, quimestre: Optional[int] = None,
+                     asignatura_id: Optional[int] = None) -> Optional[float]:
+        """Promedio de una matrícula, opcionalmente por quimestre y/o asignatura"""
+        stmt = select(self._promedio()).where(ResumenCalificacion.matricula_id == matricula_id)
+        if quimestre is not None:
+            stmt = stmt.where(ResumenCalificacion.quimestre == quimestre)
+        if asignatura_id is not None:
+            stmt = stmt.where(ResumenCalificacion.asignatura_id == asignatura_id)
+        resultado = self.db.execute(stmt).scalar()
+        return float(resultado) if resultado is not None else None
+
+    def get_ranking(self, curso_id: int, quimestre: Optional[int] = None,
+                    asignatura_id: Optional[int] = None, limit: int = 10) -> List[Tuple]:
+        """
+        Estudiantes de un curso ordenados por promedio (de mayor a menor).
+        Empates comparten posición (RANK).
+        """
+        promedio = self._promedio()
+        stmt = (
+            select(
+                func.rank().over(order_by=promedio.desc()).label("posicion"),
+                Matricula.id.label("matricula_id"),
+                Estudiante.id.label("estudiante_id"),
+                Estudiante.nombre,
+                Estudiante.apellido,
+                promedio.label("promedio"),
+                func.sum(ResumenCalificacion.cantidad).label("cantidad"),
+            )
+            .join(Matricula, Matricula.id == ResumenCalificacion.matricula_id)
+            .join(Estudiante, Estudiante.id == Matricula.estudiante_id)
+            .where(Matricula.curso_id == curso_id)
+            .group_by(Matricula.id, Estudiante.id, Estudiante.nombre, Estudiante.apellido)
+            .order_by(promedio.desc(), Matricula.id)
+            .limit(limit)
+        )
+        if quimestre is not None:
+            stmt = stmt.where(ResumenCalificacion.quimestre == quimestre)
+        if asignatura_id is not None:
+            stmt = stmt.where(ResumenCalificacion.asignatura_id == asignatura_id)
+        return self.db.execute(stmt).all()
+
+
 class CalificacionRepository(BaseRepository[Calificacion]):
-    """Repositorio para Calificaciones"""
+    """
+    Repositorio para Calificaciones
+    Las escrituras actualizan resumen_calificaciones en la misma transacción.
+    """
     
     def __init__(self, db: Session):
         super().__init__(db, Calificacion)
+        self.resumen = ResumenCalificacionRepository(db)
+
+    def create(self, obj_in: dict) -> Calificacion:
+        """Crea una calificación y la suma a su grupo del resumen"""
+        try:
+            db_obj = Calificacion(**obj_in)
+            self.db.add(db_obj)
+            self.db.flush()
+            self.resumen.sumar([obj_in])
+            self.db.commit()
+            self.db.refresh(db_obj)
+            return db_obj
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error al crear Calificacion: {str(e)}")
+
+    def create_many(self, objs_in: List[dict]) -> List[Calificacion]:
+        """Crea varias calificaciones y las acumula en el resumen por grupo"""
+        if not objs_in:
+            return []
+        try:
+            stmt = insert(Calificacion).returning(Calificacion, sort_by_parameter_order=True)
+            db_objs = self.db.scalars(stmt, objs_in).all()
+            self.resumen.sumar(objs_in)
+            self._desvincular(db_objs)
+            self.db.commit()
+            return list(db_objs)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error al crear Calificacion: {str(e)}")
+
+    def update(self, id: int, obj_in: dict) -> Optional[Calificacion]:
+        """
+        Actualiza una calificación y recalcula su grupo (y el anterior si cambió).
+        
+        El UPDATE se une consigo mismo (UPDATE ... FROM calificaciones anterior)
+        para devolver en el mismo RETURNING la fila nueva y el grupo que tenía
+        antes, sin leerla primero.
+        """
+        if not obj_in:
+            return self.read(id)
+        try:
+            anterior = aliased(Calificacion)
+            stmt = (
+                update(Calificacion)
+                .where(Calificacion.id == id, anterior.id == Calificacion.id)
+                .values(**obj_in)
+                .returning(Calificacion, anterior.matricula_id, anterior.asignatura_id, anterior.quimestre)
+            )
+            fila = self.db.execute(
+                stmt, execution_options={"populate_existing": True, "synchronize_session": False}
+            ).one_or_none()
+            if fila is None:
+                self.db.rollback()
+                return None
+            db_obj = fila[0]
+            self.resumen.recalcular({tuple(fila[1:]), self._grupo(db_obj)})
+            self._desvincular([db_obj])
+            self.db.commit()
+            return db_obj
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error al actualizar Calificacion: {str(e)}")
+
+    def delete(self, id: int) -> bool:
+        """Elimina una calificación (DELETE ... RETURNING su grupo) y recalcula el grupo"""
+        try:
+            grupo = self.db.execute(
+                delete(Calificacion)
+                .where(Calificacion.id == id)
+                .returning(Calificacion.matricula_id, Calificacion.asignatura_id, Calificacion.quimestre)
+            ).one_or_none()
+            if grupo is None:
+                self.db.rollback()
+                return False
+            self.resumen.recalcular([tuple(grupo)])
+            self.db.commit()
+            return True
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error al eliminar Calificacion: {str(e)}")
+
+    def delete_many(self, ids: Iterable[int]) -> Set[int]:
+        """Elimina varias calificaciones con un solo DELETE y recalcula sus grupos"""
+        ids = set(ids)
+        if not ids:
+            return set()
+        try:
+            filas = self.db.execute(
+                delete(Calificacion)
+                .where(Calificacion.id.in_(ids))
+                .returning(Calificacion.id, Calificacion.matricula_id,
+                           Calificacion.asignatura_id, Calificacion.quimestre)
+            ).all()
+            faltantes = ids - {fila.id for fila in filas}
+            if faltantes:
+                self.db.rollback()
+                return faltantes
+            self.resumen.recalcular(tuple(fila[1:]) for fila in filas)
+            self.db.commit()
+            return set()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise Exception(f"Error al eliminar Calificacion: {str(e)}")
+
+    def _insertar_importadas(self, filas) -> None:
+        """Inserta las calificaciones importadas y las acumula en el resumen en una sola sentencia"""
+        nuevas = insert(Calificacion).from_select(
+            [c.name for c in filas.selected_columns], filas
+        ).returning(
+            Calificacion.matricula_id, Calificacion.asignatura_id, Calificacion.quimestre, Calificacion.nota
+        ).cte("nuevas")
+        self.resumen.sumar_desde(nuevas)
+
+    @staticmethod
+    def _grupo(cal: Calificacion) -> Tuple[int, int, int]:
+        """Clave del grupo del resumen al que pertenece una calificación"""
+        return (cal.matricula_id, cal.asignatura_id, cal.quimestre)
 
     def get_by_matricula(self, matricula_id: int) -> List[Calificacion]:
         """Obtiene todas las calificaciones de una matrícula"""
@@ -182,9 +622,52 @@ class CalificacionRepository(BaseRepository[Calificacion]):
         ).all()
 
     def get_promedio_estudiante(self, matricula_id: int) -> float:
-        """Calcula el promedio de calificaciones de un estudiante"""
-        from sqlalchemy import func
-        result = self.db.query(func.avg(Calificacion.nota)).filter(
-            Calificacion.matricula_id == matricula_id
-        ).scalar()
-        return float(result) if result else 0.0
+        """Calcula el promedio de calificaciones de un estudiante (desde el resumen)"""
+        result = self.resumen.get_promedio(matricula_id)
+        return result if result else 0.0
+
+    def get_libreta_curso(self, curso_id: int, quimestre: Optional[int] = None) -> List[Tuple]:
+        """
+        Promedios de un curso en una sola consulta GROUP BY GROUPING SETS
+        sobre resumen_calificaciones: (estudiante, asignatura), (estudiante),
+        (asignatura) y total del curso.
+
+        Cada fila trae matricula_id, estudiante_id, nombre, apellido,
+        asignatura_id, asignatura, promedio, cantidad y las marcas
+        agrupa_matricula / agrupa_asignatura (1 si la columna está agregada).
+        Los estudiantes sin notas aparecen con asignatura_id nulo y cantidad 0.
+        """
+        condicion = ResumenCalificacion.matricula_id == Matricula.id
+        if quimestre is not None:
+            condicion = and_(condicion, ResumenCalificacion.quimestre == quimestre)
+
+        alumno = (Matricula.id, Estudiante.id, Estudiante.nombre, Estudiante.apellido)
+        materia = (ResumenCalificacion.asignatura_id, Asignatura.nombre)
+
+        stmt = (
+            select(
+                Matricula.id.label("matricula_id"),
+                Estudiante.id.label("estudiante_id"),
+                Estudiante.nombre,
+                Estudiante.apellido,
+                ResumenCalificacion.asignatura_id,
+                Asignatura.nombre.label("asignatura"),
+                ResumenCalificacionRepository._promedio().label("promedio"),
+                func.coalesce(func.sum(ResumenCalificacion.cantidad), 0).label("cantidad"),
+                func.grouping(Matricula.id).label("agrupa_matricula"),
+                func.grouping(ResumenCalificacion.asignatura_id).label("agrupa_asignatura"),
+            )
+            .select_from(Matricula)
+            .join(Estudiante, Estudiante.id == Matricula.estudiante_id)
+            .outerjoin(ResumenCalificacion, condicion)
+            .outerjoin(Asignatura, Asignatura.id == ResumenCalificacion.asignatura_id)
+            .where(Matricula.curso_id == curso_id)
+            .group_by(func.grouping_sets(
+                tuple_(*alumno, *materia),
+                tuple_(*alumno),
+                tuple_(*materia),
+                tuple_(),
+            ))
+            .order_by(Estudiante.apellido, Estudiante.nombre, Matricula.id, Asignatura.nombre)
+        )
+        return self.db.execute(stmt).all()
@@ -2,7 +2,7 @@
 Rutas e inicialización del Router
 """
 from fastapi import APIRouter
-from . import representante, estudiante, docente, curso, asignatura, matricula, calificacion, asistencia
+from . import representante, estudiante, docente, curso, asignatura, matricula, calificacion, asistencia, busqueda
 
 # Crear router principal
 api_router = APIRouter(prefix="/api/v1")
@@ -16,5 +16,6 @@ api_router.include_router(asignatura.router)
 api_router.include_router(matricula.router)
 api_router.include_router(calificacion.router)
 api_router.include_router(asistencia.router)
+api_router.include_router(busqueda.router)
 
 __all__ = ["api_router"]
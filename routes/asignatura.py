@@ -1,25 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
-from config.database import SessionLocal
-from services.services import AsignaturaService
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, Request
+from config.settings import JSON_RAPIDO
+from services.async_services import get_servicio
+from services.services import AsignaturaService, ErrorValidacionLote
 from schemas.asignatura import AsignaturaCreate, AsignaturaUpdate, AsignaturaRead
-from typing import List
+from typing import List, Optional
+from routes.paginacion import resolver_after_id, agregar_siguiente_cursor, agregar_total
+from routes.respuestas import columnas_lectura, respuesta_filas
+from routes.exportacion import FormatoExportacion, respuesta_exportacion
+from routes.inclusion import resolver_include
+from routes.condicional import respuesta_condicional
 
 router = APIRouter(prefix="/asignaturas", tags=["Asignaturas"])
 
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Servicio ejecutado en modo síncrono o asíncrono según DB_ASYNC
+get_service = get_servicio(AsignaturaService)
 
 
 @router.post("", response_model=AsignaturaRead, status_code=201)
-def crear_asignatura(asig: AsignaturaCreate, db = Depends(get_db)):
+async def crear_asignatura(asig: AsignaturaCreate, service = Depends(get_service)):
     """Crear una nueva asignatura"""
-    service = AsignaturaService(db)
-    return service.crear_asignatura(
+    return await service.crear_asignatura(
         nombre=asig.nombre,
         descripcion=asig.descripcion,
         curso_id=asig.curso_id,
@@ -27,37 +27,84 @@ def crear_asignatura(asig: AsignaturaCreate, db = Depends(get_db)):
     )
 
 
+@router.post("/bulk", response_model=List[AsignaturaRead], status_code=201)
+async def crear_asignaturas_lote(asigs: List[AsignaturaCreate], service = Depends(get_service)):
+    """Crear varias asignaturas en una sola transacción"""
+    try:
+        return await service.crear_asignaturas_lote([asig.dict() for asig in asigs])
+    except ErrorValidacionLote as e:
+        raise HTTPException(status_code=400, detail=e.errores)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/export")
+async def exportar_asignaturas(formato: FormatoExportacion = Query("csv", alias="format")):
+    """
+    Exportar todas las asignaturas en CSV o NDJSON (format=csv|ndjson).
+    La respuesta se envía por partes mientras se lee la tabla.
+    """
+    return respuesta_exportacion(AsignaturaService, formato, "asignaturas")
+
+
 @router.get("/{asig_id}", response_model=AsignaturaRead)
-def obtener_asignatura(asig_id: int, db = Depends(get_db)):
-    """Obtener una asignatura por ID"""
-    service = AsignaturaService(db)
-    asig = service.obtener_asignatura(asig_id)
+async def obtener_asignatura(request: Request, response: Response, asig_id: int,
+                             include: Optional[str] = None, service = Depends(get_service)):
+    """
+    Obtener una asignatura por ID.
+    Con include se cargan relaciones anidadas (ej: include=docente,curso).
+    Sin include responde 304 si la tabla no cambió (If-None-Match / If-Modified-Since).
+    """
+    rutas = resolver_include(include, AsignaturaRead)
+    no_modificado = await respuesta_condicional(request, response, service, rutas)
+    if no_modificado:
+        return no_modificado
+    asig = await service.obtener_asignatura(asig_id, rutas)
     if not asig:
         raise HTTPException(status_code=404, detail="Asignatura no encontrada")
     return asig
 
 
 @router.get("", response_model=List[AsignaturaRead])
-def listar_asignaturas(skip: int = 0, limit: int = 10, db = Depends(get_db)):
-    """Listar todas las asignaturas"""
-    service = AsignaturaService(db)
-    return service.listar_asignaturas(skip, limit)
+async def listar_asignaturas(request: Request, response: Response, skip: int = 0, limit: int = 10,
+                             after_id: Optional[int] = None, cursor: Optional[str] = None,
+                             include: Optional[str] = None, total_exacto: bool = Query(False, alias="exact_count"),
+                             service = Depends(get_service)):
+    """
+    Listar todas las asignaturas.
+    Con after_id o cursor se pagina por clave (keyset) en lugar de usar skip;
+    la cabecera X-Next-Cursor trae el cursor de la página siguiente.
+    X-Total-Count trae el total (estimado en tablas grandes salvo exact_count=true).
+    Con include se cargan relaciones anidadas sin una consulta por fila.
+    Sin include responde 304 si la tabla no cambió (If-None-Match / If-Modified-Since).
+    """
+    rutas = resolver_include(include, AsignaturaRead)
+    no_modificado = await respuesta_condicional(request, response, service, rutas)
+    if no_modificado:
+        return no_modificado
+    after_id = resolver_after_id(after_id, cursor)
+    rapido = JSON_RAPIDO and not rutas
+    if rapido:
+        asigs = await service.listar_filas(columnas_lectura(AsignaturaRead), skip, limit, after_id)
+    else:
+        asigs = await service.listar_asignaturas(skip, limit, after_id, rutas)
+    agregar_siguiente_cursor(response, asigs, limit)
+    await agregar_total(response, service, total_exacto)
+    return respuesta_filas(asigs, AsignaturaRead, response) if rapido else asigs
 
 
 @router.put("/{asig_id}", response_model=AsignaturaRead)
-def actualizar_asignatura(asig_id: int, asig: AsignaturaUpdate, db = Depends(get_db)):
+async def actualizar_asignatura(asig_id: int, asig: AsignaturaUpdate, service = Depends(get_service)):
     """Actualizar una asignatura"""
-    service = AsignaturaService(db)
-    updated = service.actualizar_asignatura(asig_id, **asig.dict(exclude_unset=True))
+    updated = await service.actualizar_asignatura(asig_id, **asig.dict(exclude_unset=True))
     if not updated:
         raise HTTPException(status_code=404, detail="Asignatura no encontrada")
     return updated
 
 
 @router.delete("/{asig_id}", status_code=204)
-def eliminar_asignatura(asig_id: int, db = Depends(get_db)):
+async def eliminar_asignatura(asig_id: int, service = Depends(get_service)):
     """Eliminar una asignatura"""
-    service = AsignaturaService(db)
-    success = service.eliminar_asignatura(asig_id)
+    success = await service.eliminar_asignatura(asig_id)
     if not success:
         raise HTTPException(status_code=404, detail="Asignatura no encontrada")
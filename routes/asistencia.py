@@ -1,26 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
-from config.database import SessionLocal
-from services.services import AsistenciaService
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from config.settings import JSON_RAPIDO
+from services.async_services import get_servicio
+from services.services import AsistenciaService, ErrorValidacionLote
 from schemas.asistencia import AsistenciaCreate, AsistenciaUpdate, AsistenciaRead
-from typing import List
+from typing import List, Optional
+from datetime import date
+from routes.paginacion import resolver_after_id, agregar_siguiente_cursor, agregar_total
+from routes.respuestas import columnas_lectura, respuesta_filas
+from routes.exportacion import FormatoExportacion, respuesta_exportacion
+from routes.importacion import CUERPO_CSV, recibir_csv
+from routes.inclusion import resolver_include
 
 router = APIRouter(prefix="/asistencias", tags=["Asistencias"])
 
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Servicio ejecutado en modo síncrono o asíncrono según DB_ASYNC
+get_service = get_servicio(AsistenciaService)
 
 
 @router.post("", response_model=AsistenciaRead, status_code=201)
-def crear_asistencia(asis: AsistenciaCreate, db = Depends(get_db)):
+async def crear_asistencia(asis: AsistenciaCreate, service = Depends(get_service)):
     """Crear una nueva asistencia"""
-    service = AsistenciaService(db)
     try:
-        return service.crear_asistencia(
+        return await service.crear_asistencia(
             estado=asis.estado.value if hasattr(asis.estado, 'value') else asis.estado,
             matricula_id=asis.matricula_id,
             asignatura_id=asis.asignatura_id,
@@ -30,32 +31,104 @@ def crear_asistencia(asis: AsistenciaCreate, db = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/bulk", response_model=List[AsistenciaRead], status_code=201)
+async def crear_asistencias_lote(asis_lote: List[AsistenciaCreate], service = Depends(get_service)):
+    """Crear varias asistencias en una sola transacción"""
+    try:
+        return await service.crear_asistencias_lote([
+            {**asis.dict(), "estado": asis.estado.value} for asis in asis_lote
+        ])
+    except ErrorValidacionLote as e:
+        raise HTTPException(status_code=400, detail=e.errores)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/import", status_code=201, openapi_extra=CUERPO_CSV)
+async def importar_asistencias(request: Request, service = Depends(get_service)):
+    """
+    Importar asistencias desde un CSV enviado como cuerpo (Content-Type: text/csv)
+    con cabecera fecha,estado,matricula_id,asignatura_id.
+    Se cargan con COPY y se validan todas las filas; si alguna falla no se importa ninguna.
+    """
+    archivo = await recibir_csv(request)
+    try:
+        return {"importadas": await service.importar_asistencias_csv(archivo)}
+    except ErrorValidacionLote as e:
+        raise HTTPException(status_code=400, detail=e.errores)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        archivo.close()
+
+
+@router.get("/periodo", response_model=List[AsistenciaRead])
+async def obtener_asistencias_periodo(desde: Optional[date] = None, hasta: Optional[date] = None,
+                                      matricula_id: Optional[int] = None, asignatura_id: Optional[int] = None,
+                                      service = Depends(get_service)):
+    """
+    Asistencias de una matrícula y/o asignatura entre dos fechas (inclusive),
+    ordenadas por fecha. Solo se leen las particiones de los meses pedidos.
+    """
+    try:
+        return await service.obtener_por_periodo(desde, hasta, matricula_id, asignatura_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/export")
+async def exportar_asistencias(formato: FormatoExportacion = Query("csv", alias="format")):
+    """
+    Exportar todas las asistencias en CSV o NDJSON (format=csv|ndjson).
+    La respuesta se envía por partes mientras se lee la tabla.
+    """
+    return respuesta_exportacion(AsistenciaService, formato, "asistencias")
+
+
 @router.get("/{asis_id}", response_model=AsistenciaRead)
-def obtener_asistencia(asis_id: int, db = Depends(get_db)):
-    """Obtener una asistencia por ID"""
-    service = AsistenciaService(db)
-    asis = service.obtener_asistencia(asis_id)
+async def obtener_asistencia(asis_id: int, include: Optional[str] = None, service = Depends(get_service)):
+    """
+    Obtener una asistencia por ID.
+    Con include se cargan relaciones anidadas (ej: include=matricula.estudiante).
+    """
+    asis = await service.obtener_asistencia(asis_id, resolver_include(include, AsistenciaRead))
     if not asis:
         raise HTTPException(status_code=404, detail="Asistencia no encontrada")
     return asis
 
 
 @router.get("", response_model=List[AsistenciaRead])
-def listar_asistencias(skip: int = 0, limit: int = 10, db = Depends(get_db)):
-    """Listar todas las asistencias"""
-    service = AsistenciaService(db)
-    return service.listar_asistencias(skip, limit)
+async def listar_asistencias(response: Response, skip: int = 0, limit: int = 10,
+                             after_id: Optional[int] = None, cursor: Optional[str] = None,
+                             include: Optional[str] = None, total_exacto: bool = Query(False, alias="exact_count"),
+                             service = Depends(get_service)):
+    """
+    Listar todas las asistencias.
+    Con after_id o cursor se pagina por clave (keyset) en lugar de usar skip;
+    la cabecera X-Next-Cursor trae el cursor de la página siguiente.
+    X-Total-Count trae el total (estimado en tablas grandes salvo exact_count=true).
+    Con include se cargan relaciones anidadas sin una consulta por fila.
+    """
+    rutas = resolver_include(include, AsistenciaRead)
+    after_id = resolver_after_id(after_id, cursor)
+    rapido = JSON_RAPIDO and not rutas
+    if rapido:
+        asis_lista = await service.listar_filas(columnas_lectura(AsistenciaRead), skip, limit, after_id)
+    else:
+        asis_lista = await service.listar_asistencias(skip, limit, after_id, rutas)
+    agregar_siguiente_cursor(response, asis_lista, limit)
+    await agregar_total(response, service, total_exacto)
+    return respuesta_filas(asis_lista, AsistenciaRead, response) if rapido else asis_lista
 
 
 @router.put("/{asis_id}", response_model=AsistenciaRead)
-def actualizar_asistencia(asis_id: int, asis: AsistenciaUpdate, db = Depends(get_db)):
+async def actualizar_asistencia(asis_id: int, asis: AsistenciaUpdate, service = Depends(get_service)):
     """Actualizar una asistencia"""
-    service = AsistenciaService(db)
     try:
         update_dict = asis.dict(exclude_unset=True)
         if 'estado' in update_dict and hasattr(update_dict['estado'], 'value'):
             update_dict['estado'] = update_dict['estado'].value
-        updated = service.actualizar_asistencia(asis_id, **update_dict)
+        updated = await service.actualizar_asistencia(asis_id, **update_dict)
         if not updated:
             raise HTTPException(status_code=404, detail="Asistencia no encontrada")
         return updated
@@ -64,9 +137,8 @@ def actualizar_asistencia(asis_id: int, asis: AsistenciaUpdate, db = Depends(get
 
 
 @router.delete("/{asis_id}", status_code=204)
-def eliminar_asistencia(asis_id: int, db = Depends(get_db)):
+async def eliminar_asistencia(asis_id: int, service = Depends(get_service)):
     """Eliminar una asistencia"""
-    service = AsistenciaService(db)
-    success = service.eliminar_asistencia(asis_id)
+    success = await service.eliminar_asistencia(asis_id)
     if not success:
         raise HTTPException(status_code=404, detail="Asistencia no encontrada")
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from services.async_services import get_servicio
+from services.services import BusquedaService
+from schemas.busqueda import ResultadoBusqueda, TipoPersona
+from typing import List, Optional
+
+router = APIRouter(prefix="/search", tags=["Búsqueda"])
+
+# Servicio ejecutado en modo síncrono o asíncrono según DB_ASYNC
+get_service = get_servicio(BusquedaService)
+
+
+@router.get("", response_model=List[ResultadoBusqueda])
+async def buscar_personas(q: str = Query(..., min_length=BusquedaService.LONGITUD_MINIMA, max_length=100),
+                          tipo: Optional[TipoPersona] = None, limit: int = Query(20, ge=1, le=100),
+                          service = Depends(get_service)):
+    """
+    Buscar estudiantes, docentes y representantes por nombre, apellido,
+    cédula, correo o teléfono. Acepta fragmentos (prefijos, cédulas o
+    correos parciales) y errores de escritura; los más parecidos primero.
+    """
+    try:
+        return await service.buscar(q, tipo, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,26 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
-from config.database import SessionLocal
-from services.services import CalificacionService
-from schemas.calificacion import CalificacionCreate, CalificacionUpdate, CalificacionRead
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from config.settings import JSON_RAPIDO
+from services.async_services import get_servicio
+from services.services import CalificacionService, ErrorValidacionLote
+from schemas.calificacion import (
+    CalificacionCreate, CalificacionUpdate, CalificacionRead,
+    LibretaCurso, PromedioEstudiante, PosicionRanking
+)
+from typing import List, Optional
+from routes.paginacion import resolver_after_id, agregar_siguiente_cursor, agregar_total
+from routes.respuestas import columnas_lectura, respuesta_filas
+from routes.exportacion import FormatoExportacion, respuesta_exportacion
+from routes.importacion import CUERPO_CSV, recibir_csv
+from routes.inclusion import resolver_include
 
 router = APIRouter(prefix="/calificaciones", tags=["Calificaciones"])
 
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Servicio ejecutado en modo síncrono o asíncrono según DB_ASYNC
+get_service = get_servicio(CalificacionService)
 
 
 @router.post("", response_model=CalificacionRead, status_code=201)
-def crear_calificacion(cal: CalificacionCreate, db = Depends(get_db)):
+async def crear_calificacion(cal: CalificacionCreate, service = Depends(get_service)):
     """Crear una nueva calificación"""
-    service = CalificacionService(db)
     try:
-        return service.crear_calificacion(
+        return await service.crear_calificacion(
             nota=cal.nota,
             quimestre=cal.quimestre,
             matricula_id=cal.matricula_id,
@@ -30,29 +33,122 @@ def crear_calificacion(cal: CalificacionCreate, db = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/bulk", response_model=List[CalificacionRead], status_code=201)
+async def crear_calificaciones_lote(cals: List[CalificacionCreate], service = Depends(get_service)):
+    """Crear varias calificaciones en una sola transacción"""
+    try:
+        return await service.crear_calificaciones_lote([cal.dict() for cal in cals])
+    except ErrorValidacionLote as e:
+        raise HTTPException(status_code=400, detail=e.errores)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/import", status_code=201, openapi_extra=CUERPO_CSV)
+async def importar_calificaciones(request: Request, service = Depends(get_service)):
+    """
+    Importar calificaciones desde un CSV enviado como cuerpo (Content-Type: text/csv)
+    con cabecera nota,quimestre,matricula_id,asignatura_id.
+    Se cargan con COPY y se validan todas las filas; si alguna falla no se importa ninguna.
+    """
+    archivo = await recibir_csv(request)
+    try:
+        return {"importadas": await service.importar_calificaciones_csv(archivo)}
+    except ErrorValidacionLote as e:
+        raise HTTPException(status_code=400, detail=e.errores)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        archivo.close()
+
+
+@router.get("/libreta", response_model=LibretaCurso)
+async def obtener_libreta(curso_id: int, quimestre: Optional[int] = None, service = Depends(get_service)):
+    """
+    Libreta de un curso: promedios por estudiante y asignatura, promedio
+    general de cada estudiante, de cada asignatura y del curso.
+    Sin quimestre se promedian todos los quimestres.
+    """
+    try:
+        return await service.generar_libreta(curso_id, quimestre)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/promedio", response_model=PromedioEstudiante)
+async def obtener_promedio(matricula_id: int, quimestre: Optional[int] = None,
+                           asignatura_id: Optional[int] = None, service = Depends(get_service)):
+    """Promedio de una matrícula, opcionalmente por quimestre y/o asignatura"""
+    promedio = await service.obtener_promedio(matricula_id, quimestre, asignatura_id)
+    return {
+        "matricula_id": matricula_id,
+        "quimestre": quimestre,
+        "asignatura_id": asignatura_id,
+        "promedio": round(promedio, 2),
+    }
+
+
+@router.get("/ranking", response_model=List[PosicionRanking])
+async def obtener_ranking(curso_id: int, quimestre: Optional[int] = None,
+                          asignatura_id: Optional[int] = None, limit: int = 10,
+                          service = Depends(get_service)):
+    """Ranking de los estudiantes de un curso por promedio (de mayor a menor)"""
+    try:
+        return await service.obtener_ranking(curso_id, quimestre, asignatura_id, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/export")
+async def exportar_calificaciones(formato: FormatoExportacion = Query("csv", alias="format")):
+    """
+    Exportar todas las calificaciones en CSV o NDJSON (format=csv|ndjson).
+    La respuesta se envía por partes mientras se lee la tabla.
+    """
+    return respuesta_exportacion(CalificacionService, formato, "calificaciones")
+
+
 @router.get("/{cal_id}", response_model=CalificacionRead)
-def obtener_calificacion(cal_id: int, db = Depends(get_db)):
-    """Obtener una calificación por ID"""
-    service = CalificacionService(db)
-    cal = service.obtener_calificacion(cal_id)
+async def obtener_calificacion(cal_id: int, include: Optional[str] = None, service = Depends(get_service)):
+    """
+    Obtener una calificación por ID.
+    Con include se cargan relaciones anidadas (ej: include=matricula.estudiante,asignatura).
+    """
+    cal = await service.obtener_calificacion(cal_id, resolver_include(include, CalificacionRead))
     if not cal:
         raise HTTPException(status_code=404, detail="Calificación no encontrada")
     return cal
 
 
 @router.get("", response_model=List[CalificacionRead])
-def listar_calificaciones(skip: int = 0, limit: int = 10, db = Depends(get_db)):
-    """Listar todas las calificaciones"""
-    service = CalificacionService(db)
-    return service.listar_calificaciones(skip, limit)
+async def listar_calificaciones(response: Response, skip: int = 0, limit: int = 10,
+                                after_id: Optional[int] = None, cursor: Optional[str] = None,
+                                include: Optional[str] = None, total_exacto: bool = Query(False, alias="exact_count"),
+                                service = Depends(get_service)):
+    """
+    Listar todas las calificaciones.
+    Con after_id o cursor se pagina por clave (keyset) en lugar de usar skip;
+    la cabecera X-Next-Cursor trae el cursor de la página siguiente.
+    X-Total-Count trae el total (estimado en tablas grandes salvo exact_count=true).
+    Con include se cargan relaciones anidadas sin una consulta por fila.
+    """
+    rutas = resolver_include(include, CalificacionRead)
+    after_id = resolver_after_id(after_id, cursor)
+    rapido = JSON_RAPIDO and not rutas
+    if rapido:
+        cals = await service.listar_filas(columnas_lectura(CalificacionRead), skip, limit, after_id)
+    else:
+        cals = await service.listar_calificaciones(skip, limit, after_id, rutas)
+    agregar_siguiente_cursor(response, cals, limit)
+    await agregar_total(response, service, total_exacto)
+    return respuesta_filas(cals, CalificacionRead, response) if rapido else cals
 
 
 @router.put("/{cal_id}", response_model=CalificacionRead)
-def actualizar_calificacion(cal_id: int, cal: CalificacionUpdate, db = Depends(get_db)):
+async def actualizar_calificacion(cal_id: int, cal: CalificacionUpdate, service = Depends(get_service)):
     """Actualizar una calificación"""
-    service = CalificacionService(db)
     try:
-        updated = service.actualizar_calificacion(cal_id, **cal.dict(exclude_unset=True))
+        updated = await service.actualizar_calificacion(cal_id, **cal.dict(exclude_unset=True))
         if not updated:
             raise HTTPException(status_code=404, detail="Calificación no encontrada")
         return updated
@@ -61,9 +157,8 @@ def actualizar_calificacion(cal_id: int, cal: CalificacionUpdate, db = Depends(g
 
 
 @router.delete("/{cal_id}", status_code=204)
-def eliminar_calificacion(cal_id: int, db = Depends(get_db)):
+async def eliminar_calificacion(cal_id: int, service = Depends(get_service)):
     """Eliminar una calificación"""
-    service = CalificacionService(db)
-    success = service.eliminar_calificacion(cal_id)
+    success = await service.eliminar_calificacion(cal_id)
     if not success:
         raise HTTPException(status_code=404, detail="Calificación no encontrada")
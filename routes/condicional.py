@@ -0,0 +1,110 @@
+"""
+GET condicional (ETag / Last-Modified) para las rutas de lectura
+
+Los validadores salen de versiones_tablas, un contador por tabla que un
+trigger incrementa en cada escritura. Si el cliente envía If-None-Match con
+el ETag actual (o If-Modified-Since posterior a la última escritura) se
+responde 304 sin consultar ni serializar los datos.
+
+El validador es de toda la tabla: cualquier escritura en ella invalida
+todas sus respuestas, a cambio de que comprobarlo cueste una lectura por
+clave primaria. Las respuestas con include no se validan, porque también
+dependen de las tablas relacionadas.
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+from fastapi import Request, Response
+
+# El cliente puede guardar la respuesta pero debe revalidarla en cada uso
+CACHE_CONTROL = "private, no-cache"
+
+
+def etiqueta(tabla: str, version: int) -> str:
+    """
+    ETag débil de la versión de una tabla.
+
+    >>> etiqueta("cursos", 12)
+    'W/"cursos-12"'
+    """
+    return f'W/"{tabla}-{version}"'
+
+
+def coincide_etag(if_none_match: str, etag: str) -> bool:
+    """
+    Compara If-None-Match con el ETag (comparación débil).
+
+    >>> coincide_etag('W/"cursos-3", W/"cursos-4"', 'W/"cursos-4"')
+    True
+    >>> coincide_etag('"cursos-4"', 'W/"cursos-4"')
+    True
+    >>> coincide_etag('*', 'W/"cursos-4"')
+    True
+    >>> coincide_etag('W/"cursos-3"', 'W/"cursos-4"')
+    False
+    """
+    opaca = etag.removeprefix("W/")
+    for candidata in if_none_match.split(","):
+        candidata = candidata.strip()
+        if candidata == "*" or candidata.removeprefix("W/") == opaca:
+            return True
+    return False
+
+
+def cabeceras_validacion(tabla: str, version: int, modificado: Optional[datetime]) -> Dict[str, str]:
+    """
+    Cabeceras ETag, Last-Modified y Cache-Control de una versión.
+
+    >>> cabeceras_validacion("cursos", 3, datetime(2024, 9, 2, 8, 30, tzinfo=timezone.utc))
+    {'ETag': 'W/"cursos-3"', 'Cache-Control': 'private, no-cache', 'Last-Modified': 'Mon, 02 Sep 2024 08:30:00 GMT'}
+    """
+    cabeceras = {"ETag": etiqueta(tabla, version), "Cache-Control": CACHE_CONTROL}
+    if modificado is not None:
+        cabeceras["Last-Modified"] = format_datetime(modificado.astimezone(timezone.utc), usegmt=True)
+    return cabeceras
+
+
+def no_modificado(request: Request, cabeceras: Dict[str, str], modificado: Optional[datetime]) -> bool:
+    """
+    Indica si la copia del cliente sigue vigente. If-None-Match tiene
+    prioridad; If-Modified-Since solo se usa si no se envió un ETag.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return coincide_etag(if_none_match, cabeceras["ETag"])
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or modificado is None:
+        return False
+    try:
+        fecha = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if fecha.tzinfo is None:
+        return False
+    # La fecha HTTP tiene resolución de segundos
+    return modificado.replace(microsecond=0) <= fecha
+
+
+async def respuesta_condicional(request: Request, response: Response, service,
+                                include: list) -> Optional[Response]:
+    """
+    Valida la petición contra la versión de la tabla del servicio.
+
+    Args:
+        request: Petición (If-None-Match / If-Modified-Since)
+        response: Respuesta de la ruta, a la que se agregan los validadores
+        service: Servicio de la ruta (debe tener el método version())
+        include: Relaciones pedidas; si hay alguna no se valida
+
+    Returns:
+        Respuesta 304 si el cliente tiene la versión actual; None si la ruta
+        debe continuar y responder normalmente
+    """
+    if include:
+        return None
+    tabla, version, modificado = await service.version()
+    cabeceras = cabeceras_validacion(tabla, version, modificado)
+    if no_modificado(request, cabeceras, modificado):
+        return Response(status_code=304, headers=cabeceras)
+    response.headers.update(cabeceras)
+    return None
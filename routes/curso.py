@@ -1,58 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException
-from config.database import SessionLocal
-from services.services import CursoService
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, Request
+from config.settings import JSON_RAPIDO
+from services.async_services import get_servicio
+from services.services import CursoService, ErrorValidacionLote
 from schemas.curso import CursoCreate, CursoUpdate, CursoRead
-from typing import List
+from typing import List, Optional
+from routes.paginacion import resolver_after_id, agregar_siguiente_cursor, agregar_total
+from routes.respuestas import columnas_lectura, respuesta_filas
+from routes.exportacion import FormatoExportacion, respuesta_exportacion
+from routes.inclusion import resolver_include
+from routes.condicional import respuesta_condicional
 
 router = APIRouter(prefix="/cursos", tags=["Cursos"])
 
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Servicio ejecutado en modo síncrono o asíncrono según DB_ASYNC
+get_service = get_servicio(CursoService)
 
 
 @router.post("", response_model=CursoRead, status_code=201)
-def crear_curso(cur: CursoCreate, db = Depends(get_db)):
+async def crear_curso(cur: CursoCreate, service = Depends(get_service)):
     """Crear un nuevo curso"""
-    service = CursoService(db)
-    return service.crear_curso(nombre=cur.nombre, nivel=cur.nivel)
+    return await service.crear_curso(nombre=cur.nombre, nivel=cur.nivel)
+
+
+@router.post("/bulk", response_model=List[CursoRead], status_code=201)
+async def crear_cursos_lote(cursos: List[CursoCreate], service = Depends(get_service)):
+    """Crear varios cursos en una sola transacción"""
+    try:
+        return await service.crear_cursos_lote([curso.dict() for curso in cursos])
+    except ErrorValidacionLote as e:
+        raise HTTPException(status_code=400, detail=e.errores)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/export")
+async def exportar_cursos(formato: FormatoExportacion = Query("csv", alias="format")):
+    """
+    Exportar todos los cursos en CSV o NDJSON (format=csv|ndjson).
+    La respuesta se envía por partes mientras se lee la tabla.
+    """
+    return respuesta_exportacion(CursoService, formato, "cursos")
 
 
 @router.get("/{cur_id}", response_model=CursoRead)
-def obtener_curso(cur_id: int, db = Depends(get_db)):
-    """Obtener un curso por ID"""
-    service = CursoService(db)
-    cur = service.obtener_curso(cur_id)
+async def obtener_curso(request: Request, response: Response, cur_id: int,
+                        include: Optional[str] = None, service = Depends(get_service)):
+    """
+    Obtener un curso por ID.
+    Con include se cargan relaciones anidadas (ej: include=matriculas.estudiante).
+    Sin include responde 304 si la tabla no cambió (If-None-Match / If-Modified-Since).
+    """
+    rutas = resolver_include(include, CursoRead)
+    no_modificado = await respuesta_condicional(request, response, service, rutas)
+    if no_modificado:
+        return no_modificado
+    cur = await service.obtener_curso(cur_id, rutas)
     if not cur:
         raise HTTPException(status_code=404, detail="Curso no encontrado")
     return cur
 
 
 @router.get("", response_model=List[CursoRead])
-def listar_cursos(skip: int = 0, limit: int = 10, db = Depends(get_db)):
-    """Listar todos los cursos"""
-    service = CursoService(db)
-    return service.listar_cursos(skip, limit)
+async def listar_cursos(request: Request, response: Response, skip: int = 0, limit: int = 10,
+                        after_id: Optional[int] = None, cursor: Optional[str] = None,
+                        include: Optional[str] = None, total_exacto: bool = Query(False, alias="exact_count"),
+                        service = Depends(get_service)):
+    """
+    Listar todos los cursos.
+    Con after_id o cursor se pagina por clave (keyset) en lugar de usar skip;
+    la cabecera X-Next-Cursor trae el cursor de la página siguiente.
+    X-Total-Count trae el total (estimado en tablas grandes salvo exact_count=true).
+    Con include se cargan relaciones anidadas sin una consulta por fila.
+    Sin include responde 304 si la tabla no cambió (If-None-Match / If-Modified-Since).
+    """
+    rutas = resolver_include(include, CursoRead)
+    no_modificado = await respuesta_condicional(request, response, service, rutas)
+    if no_modificado:
+        return no_modificado
+    after_id = resolver_after_id(after_id, cursor)
+    rapido = JSON_RAPIDO and not rutas
+    if rapido:
+        cursos = await service.listar_filas(columnas_lectura(CursoRead), skip, limit, after_id)
+    else:
+        cursos = await service.listar_cursos(skip, limit, after_id, rutas)
+    agregar_siguiente_cursor(response, cursos, limit)
+    await agregar_total(response, service, total_exacto)
+    return respuesta_filas(cursos, CursoRead, response) if rapido else cursos
 
 
 @router.put("/{cur_id}", response_model=CursoRead)
-def actualizar_curso(cur_id: int, cur: CursoUpdate, db = Depends(get_db)):
+async def actualizar_curso(cur_id: int, cur: CursoUpdate, service = Depends(get_service)):
     """Actualizar un curso"""
-    service = CursoService(db)
-    updated = service.actualizar_curso(cur_id, **cur.dict(exclude_unset=True))
+    updated = await service.actualizar_curso(cur_id, **cur.dict(exclude_unset=True))
     if not updated:
         raise HTTPException(status_code=404, detail="Curso no encontrado")
     return updated
 
 
 @router.delete("/{cur_id}", status_code=204)
-def eliminar_curso(cur_id: int, db = Depends(get_db)):
+async def eliminar_curso(cur_id: int, service = Depends(get_service)):
     """Eliminar un curso"""
-    service = CursoService(db)
-    success = service.eliminar_curso(cur_id)
+    success = await service.eliminar_curso(cur_id)
     if not success:
         raise HTTPException(status_code=404, detail="Curso no encontrado")
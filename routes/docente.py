@@ -1,26 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
-from config.database import SessionLocal
-from services.services import DocenteService
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from config.settings import JSON_RAPIDO
+from services.async_services import get_servicio
+from services.services import DocenteService, ErrorValidacionLote
 from schemas.docente import DocenteCreate, DocenteUpdate, DocenteRead
-from typing import List
+from typing import List, Optional
+from routes.paginacion import resolver_after_id, agregar_siguiente_cursor, agregar_total
+from routes.respuestas import columnas_lectura, respuesta_filas
+from routes.exportacion import FormatoExportacion, respuesta_exportacion
+from routes.inclusion import resolver_include
 
 router = APIRouter(prefix="/docentes", tags=["Docentes"])
 
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Servicio ejecutado en modo síncrono o asíncrono según DB_ASYNC
+get_service = get_servicio(DocenteService)
 
 
 @router.post("", response_model=DocenteRead, status_code=201)
-def crear_docente(doc: DocenteCreate, db = Depends(get_db)):
+async def crear_docente(doc: DocenteCreate, service = Depends(get_service)):
     """Crear un nuevo docente"""
-    service = DocenteService(db)
     try:
-        return service.crear_docente(
+        return await service.crear_docente(
             nombre=doc.nombre,
             apellido=doc.apellido,
             titulo=doc.titulo,
@@ -30,29 +29,73 @@ def crear_docente(doc: DocenteCreate, db = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/bulk", response_model=List[DocenteRead], status_code=201)
+async def crear_docentes_lote(docs: List[DocenteCreate], upsert: bool = False, service = Depends(get_service)):
+    """
+    Crear varios docentes en una sola transacción.
+    Con upsert=true, los docentes existentes (por correo) se actualizan.
+    """
+    try:
+        registros = [doc.dict() for doc in docs]
+        if upsert:
+            return await service.guardar_docentes_lote(registros)
+        return await service.crear_docentes_lote(registros)
+    except ErrorValidacionLote as e:
+        raise HTTPException(status_code=400, detail=e.errores)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/export")
+async def exportar_docentes(formato: FormatoExportacion = Query("csv", alias="format")):
+    """
+    Exportar todos los docentes en CSV o NDJSON (format=csv|ndjson).
+    La respuesta se envía por partes mientras se lee la tabla.
+    """
+    return respuesta_exportacion(DocenteService, formato, "docentes")
+
+
 @router.get("/{doc_id}", response_model=DocenteRead)
-def obtener_docente(doc_id: int, db = Depends(get_db)):
-    """Obtener un docente por ID"""
-    service = DocenteService(db)
-    doc = service.obtener_docente(doc_id)
+async def obtener_docente(doc_id: int, include: Optional[str] = None, service = Depends(get_service)):
+    """
+    Obtener un docente por ID.
+    Con include se cargan relaciones anidadas (ej: include=asignaturas.curso).
+    """
+    doc = await service.obtener_docente(doc_id, resolver_include(include, DocenteRead))
     if not doc:
         raise HTTPException(status_code=404, detail="Docente no encontrado")
     return doc
 
 
 @router.get("", response_model=List[DocenteRead])
-def listar_docentes(skip: int = 0, limit: int = 10, db = Depends(get_db)):
-    """Listar todos los docentes"""
-    service = DocenteService(db)
-    return service.listar_docentes(skip, limit)
+async def listar_docentes(response: Response, skip: int = 0, limit: int = 10,
+                          after_id: Optional[int] = None, cursor: Optional[str] = None,
+                          include: Optional[str] = None, total_exacto: bool = Query(False, alias="exact_count"),
+                          service = Depends(get_service)):
+    """
+    Listar todos los docentes.
+    Con after_id o cursor se pagina por clave (keyset) en lugar de usar skip;
+    la cabecera X-Next-Cursor trae el cursor de la página siguiente.
+    X-Total-Count trae el total (estimado en tablas grandes salvo exact_count=true).
+    Con include se cargan relaciones anidadas sin una consulta por fila.
+    """
+    rutas = resolver_include(include, DocenteRead)
+    after_id = resolver_after_id(after_id, cursor)
+    rapido = JSON_RAPIDO and not rutas
+    if rapido:
+        docs = await service.listar_filas(columnas_lectura(DocenteRead), skip, limit, after_id)
+    else:
+        docs = await service.listar_docentes(skip, limit, after_id, rutas)
+    agregar_siguiente_cursor(response, docs, limit)
+    await agregar_total(response, service, total_exacto)
+    return respuesta_filas(docs, DocenteRead, response) if rapido else docs
 
 
 @router.put("/{doc_id}", response_model=DocenteRead)
-def actualizar_docente(doc_id: int, doc: DocenteUpdate, db = Depends(get_db)):
+async def actualizar_docente(doc_id: int, doc: DocenteUpdate, service = Depends(get_service)):
     """Actualizar un docente"""
-    service = DocenteService(db)
     try:
-        updated = service.actualizar_docente(doc_id, **doc.dict(exclude_unset=True))
+        updated = await service.actualizar_docente(doc_id, **doc.dict(exclude_unset=True))
         if not updated:
             raise HTTPException(status_code=404, detail="Docente no encontrado")
         return updated
@@ -61,9 +104,8 @@ def actualizar_docente(doc_id: int, doc: DocenteUpdate, db = Depends(get_db)):
 
 
 @router.delete("/{doc_id}", status_code=204)
-def eliminar_docente(doc_id: int, db = Depends(get_db)):
+async def eliminar_docente(doc_id: int, service = Depends(get_service)):
     """Eliminar un docente"""
-    service = DocenteService(db)
-    success = service.eliminar_docente(doc_id)
+    success = await service.eliminar_docente(doc_id)
     if not success:
         raise HTTPException(status_code=404, detail="Docente no encontrado")
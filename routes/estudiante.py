@@ -1,26 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
-from config.database import SessionLocal
-from services.services import EstudianteService
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, Request
+from config.settings import JSON_RAPIDO
+from services.async_services import get_servicio
+from services.services import EstudianteService, ErrorValidacionLote
 from schemas.estudiante import EstudianteCreate, EstudianteUpdate, EstudianteRead
-from typing import List
+from typing import List, Optional
+from routes.paginacion import resolver_after_id, agregar_siguiente_cursor, agregar_total
+from routes.respuestas import columnas_lectura, respuesta_filas
+from routes.exportacion import FormatoExportacion, respuesta_exportacion
+from routes.inclusion import resolver_include
+from routes.condicional import respuesta_condicional
 
 router = APIRouter(prefix="/estudiantes", tags=["Estudiantes"])
 
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Servicio ejecutado en modo síncrono o asíncrono según DB_ASYNC
+get_service = get_servicio(EstudianteService)
 
 
 @router.post("", response_model=EstudianteRead, status_code=201)
-def crear_estudiante(est: EstudianteCreate, db = Depends(get_db)):
+async def crear_estudiante(est: EstudianteCreate, service = Depends(get_service)):
     """Crear un nuevo estudiante"""
-    service = EstudianteService(db)
     try:
-        return service.crear_estudiante(
+        return await service.crear_estudiante(
             nombre=est.nombre,
             apellido=est.apellido,
             cedula=est.cedula,
@@ -32,29 +32,96 @@ def crear_estudiante(est: EstudianteCreate, db = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/bulk", response_model=List[EstudianteRead], status_code=201)
+async def crear_estudiantes_lote(ests: List[EstudianteCreate], upsert: bool = False, service = Depends(get_service)):
+    """
+    Crear varios estudiantes en una sola transacción.
+    Con upsert=true, los estudiantes existentes (por cédula) se actualizan.
+    """
+    try:
+        registros = [est.dict() for est in ests]
+        if upsert:
+            return await service.guardar_estudiantes_lote(registros)
+        return await service.crear_estudiantes_lote(registros)
+    except ErrorValidacionLote as e:
+        raise HTTPException(status_code=400, detail=e.errores)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/bulk", status_code=204)
+async def eliminar_estudiantes_lote(ids: List[int], service = Depends(get_service)):
+    """
+    Eliminar varios estudiantes (lista de IDs) con una sola sentencia; la BD
+    borra en cascada sus matrículas, calificaciones y asistencias.
+    Si algún ID no existe no se elimina ninguno.
+    """
+    try:
+        await service.eliminar_estudiantes_lote(ids)
+    except ErrorValidacionLote as e:
+        raise HTTPException(status_code=400, detail=e.errores)
+
+
+@router.get("/export")
+async def exportar_estudiantes(formato: FormatoExportacion = Query("csv", alias="format")):
+    """
+    Exportar todos los estudiantes en CSV o NDJSON (format=csv|ndjson).
+    La respuesta se envía por partes mientras se lee la tabla.
+    """
+    return respuesta_exportacion(EstudianteService, formato, "estudiantes")
+
+
 @router.get("/{est_id}", response_model=EstudianteRead)
-def obtener_estudiante(est_id: int, db = Depends(get_db)):
-    """Obtener un estudiante por ID"""
-    service = EstudianteService(db)
-    est = service.obtener_estudiante(est_id)
+async def obtener_estudiante(request: Request, response: Response, est_id: int,
+                             include: Optional[str] = None, service = Depends(get_service)):
+    """
+    Obtener un estudiante por ID.
+    Con include se cargan relaciones anidadas (ej: include=matriculas.calificaciones.asignatura).
+    Sin include responde 304 si la tabla no cambió (If-None-Match / If-Modified-Since).
+    """
+    rutas = resolver_include(include, EstudianteRead)
+    no_modificado = await respuesta_condicional(request, response, service, rutas)
+    if no_modificado:
+        return no_modificado
+    est = await service.obtener_estudiante(est_id, rutas)
     if not est:
         raise HTTPException(status_code=404, detail="Estudiante no encontrado")
     return est
 
 
 @router.get("", response_model=List[EstudianteRead])
-def listar_estudiantes(skip: int = 0, limit: int = 10, db = Depends(get_db)):
-    """Listar todos los estudiantes"""
-    service = EstudianteService(db)
-    return service.listar_estudiantes(skip, limit)
+async def listar_estudiantes(request: Request, response: Response, skip: int = 0, limit: int = 10,
+                             after_id: Optional[int] = None, cursor: Optional[str] = None,
+                             include: Optional[str] = None, total_exacto: bool = Query(False, alias="exact_count"),
+                             service = Depends(get_service)):
+    """
+    Listar todos los estudiantes.
+    Con after_id o cursor se pagina por clave (keyset) en lugar de usar skip;
+    la cabecera X-Next-Cursor trae el cursor de la página siguiente.
+    X-Total-Count trae el total (estimado en tablas grandes salvo exact_count=true).
+    Con include se cargan relaciones anidadas sin una consulta por fila.
+    Sin include responde 304 si la tabla no cambió (If-None-Match / If-Modified-Since).
+    """
+    rutas = resolver_include(include, EstudianteRead)
+    no_modificado = await respuesta_condicional(request, response, service, rutas)
+    if no_modificado:
+        return no_modificado
+    after_id = resolver_after_id(after_id, cursor)
+    rapido = JSON_RAPIDO and not rutas
+    if rapido:
+        ests = await service.listar_filas(columnas_lectura(EstudianteRead), skip, limit, after_id)
+    else:
+        ests = await service.listar_estudiantes(skip, limit, after_id, rutas)
+    agregar_siguiente_cursor(response, ests, limit)
+    await agregar_total(response, service, total_exacto)
+    return respuesta_filas(ests, EstudianteRead, response) if rapido else ests
 
 
 @router.put("/{est_id}", response_model=EstudianteRead)
-def actualizar_estudiante(est_id: int, est: EstudianteUpdate, db = Depends(get_db)):
+async def actualizar_estudiante(est_id: int, est: EstudianteUpdate, service = Depends(get_service)):
     """Actualizar un estudiante"""
-    service = EstudianteService(db)
     try:
-        updated = service.actualizar_estudiante(est_id, **est.dict(exclude_unset=True))
+        updated = await service.actualizar_estudiante(est_id, **est.dict(exclude_unset=True))
         if not updated:
             raise HTTPException(status_code=404, detail="Estudiante no encontrado")
         return updated
@@ -63,9 +130,8 @@ def actualizar_estudiante(est_id: int, est: EstudianteUpdate, db = Depends(get_d
 
 
 @router.delete("/{est_id}", status_code=204)
-def eliminar_estudiante(est_id: int, db = Depends(get_db)):
+async def eliminar_estudiante(est_id: int, service = Depends(get_service)):
     """Eliminar un estudiante"""
-    service = EstudianteService(db)
-    success = service.eliminar_estudiante(est_id)
+    success = await service.eliminar_estudiante(est_id)
     if not success:
         raise HTTPException(status_code=404, detail="Estudiante no encontrado")
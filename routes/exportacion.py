@@ -0,0 +1,123 @@
+"""
+Exportación completa de una tabla en CSV o NDJSON (un objeto JSON por línea)
+
+La respuesta se envía por partes mientras se lee la tabla con un cursor del
+lado del servidor, así que la memoria usada no depende del número de filas.
+El generador abre su propia sesión: la de la petición se cierra antes de
+terminar de enviar la respuesta.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Iterable, Iterator, List, Literal, Type
+from fastapi.responses import StreamingResponse
+from config.database import SessionLocal
+from config.settings import JSON_RAPIDO
+from routes.respuestas import codificar_json
+
+FormatoExportacion = Literal["csv", "ndjson"]
+
+TIPOS_CONTENIDO = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def valor_plano(valor):
+    """
+    Convierte un valor de la BD a un tipo que CSV y JSON representan igual.
+
+    >>> from models.enums import EstadoAsistencia
+    >>> valor_plano(EstadoAsistencia.PRESENTE)
+    'PRESENTE'
+    >>> valor_plano(date(2024, 9, 2))
+    '2024-09-02'
+    >>> valor_plano(8.5)
+    8.5
+    """
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return valor
+
+
+def lineas_csv(columnas: List[str], lotes: Iterable[list]) -> Iterator[str]:
+    """
+    Genera el CSV (cabecera y luego un bloque de texto por lote).
+
+    >>> list(lineas_csv(["id", "nombre"], [[(1, "Ana"), (2, "Luis, Jr.")]]))
+    ['id,nombre\\r\\n', '1,Ana\\r\\n2,"Luis, Jr."\\r\\n']
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(columnas)
+    yield buffer.getvalue()
+    for lote in lotes:
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerows([valor_plano(v) for v in fila] for fila in lote)
+        yield buffer.getvalue()
+
+
+def lineas_ndjson(columnas: List[str], lotes: Iterable[list]) -> Iterator[str]:
+    """
+    Genera el NDJSON (un bloque de texto por lote).
+
+    >>> list(lineas_ndjson(["id", "nombre"], [[(1, "Ana")]]))
+    ['{"id": 1, "nombre": "Ana"}\\n']
+    """
+    for lote in lotes:
+        yield "".join(
+            json.dumps(dict(zip(columnas, map(valor_plano, fila))), ensure_ascii=False) + "\n"
+            for fila in lote
+        )
+
+
+def lineas_ndjson_rapido(columnas: List[str], lotes: Iterable[list]) -> Iterator[bytes]:
+    """
+    Genera el NDJSON con codificar_json (ruta rápida, JSON_RAPIDO=1): fechas
+    y enumeraciones se codifican sin pasar por valor_plano.
+
+    >>> list(lineas_ndjson_rapido(["id", "nombre"], [[(1, "Ana")]]))
+    [b'{"id":1,"nombre":"Ana"}\\n']
+    """
+    for lote in lotes:
+        yield b"".join(codificar_json(dict(zip(columnas, fila))) + b"\n" for fila in lote)
+
+
+def respuesta_exportacion(servicio_cls: Type, formato: FormatoExportacion, nombre: str) -> StreamingResponse:
+    """
+    Crea la respuesta que exporta la tabla del repositorio del servicio.
+
+    Starlette recorre el generador en su threadpool con el motor síncrono,
+    también con DB_ASYNC=1 (el cursor del servidor es propio de esa conexión).
+
+    Args:
+        servicio_cls: Clase del servicio (su atributo repo define la tabla)
+        formato: "csv" o "ndjson"
+        nombre: Nombre base del archivo descargado (ej: "asistencias")
+
+    Returns:
+        StreamingResponse con la tabla completa
+    """
+    if formato == "csv":
+        serializar = lineas_csv
+    else:
+        serializar = lineas_ndjson_rapido if JSON_RAPIDO else lineas_ndjson
+
+    def generar() -> Iterator[str]:
+        db = SessionLocal()
+        try:
+            repo = servicio_cls(db).repo
+            yield from serializar(repo.columnas(), repo.iter_lotes())
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        generar(),
+        media_type=TIPOS_CONTENIDO[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nombre}.{formato}"'},
+    )
@@ -0,0 +1,54 @@
+"""
+Recepción de archivos CSV para las rutas de importación
+
+El CSV se envía como cuerpo de la petición (Content-Type: text/csv), por
+ejemplo: curl --data-binary @notas.csv -H "Content-Type: text/csv" ...
+Se guarda en un archivo temporal mientras llega (en memoria hasta
+TAMANO_EN_MEMORIA bytes) para pasarlo luego a COPY FROM STDIN. Un cuerpo de
+más de IMPORTACION_TAMANO_MAXIMO bytes se rechaza con 413.
+"""
+from tempfile import SpooledTemporaryFile
+from fastapi import HTTPException, Request
+from config.settings import IMPORTACION_TAMANO_MAXIMO
+
+TAMANO_EN_MEMORIA = 8 * 1024 * 1024
+
+# Documentación del cuerpo para OpenAPI (la ruta lee el cuerpo sin un modelo)
+CUERPO_CSV = {
+    "requestBody": {
+        "required": True,
+        "content": {"text/csv": {"schema": {"type": "string", "format": "binary"}}},
+    }
+}
+
+
+async def recibir_csv(request: Request) -> SpooledTemporaryFile:
+    """
+    Guarda el cuerpo de la petición en un archivo temporal.
+
+    Los bytes se cuentan mientras llegan (Content-Length puede faltar o
+    mentir): al pasar de IMPORTACION_TAMANO_MAXIMO se descarta lo recibido.
+
+    Returns:
+        Archivo binario posicionado al inicio (cerrarlo al terminar)
+
+    Raises:
+        HTTPException: 413 si el cuerpo supera el tamaño máximo
+    """
+    demasiado_grande = HTTPException(
+        status_code=413,
+        detail=f"El CSV supera el tamaño máximo de {IMPORTACION_TAMANO_MAXIMO} bytes"
+    )
+    longitud = request.headers.get("content-length", "")
+    if longitud.isdigit() and int(longitud) > IMPORTACION_TAMANO_MAXIMO:
+        raise demasiado_grande
+    archivo = SpooledTemporaryFile(max_size=TAMANO_EN_MEMORIA)
+    recibidos = 0
+    async for trozo in request.stream():
+        recibidos += len(trozo)
+        if recibidos > IMPORTACION_TAMANO_MAXIMO:
+            archivo.close()
+            raise demasiado_grande
+        archivo.write(trozo)
+    archivo.seek(0)
+    return archivo
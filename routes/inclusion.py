@@ -0,0 +1,48 @@
+"""
+Carga de relaciones bajo demanda para las rutas de lectura (?include=)
+
+El parámetro include recibe rutas de relaciones separadas por comas, por
+ejemplo `?include=matriculas.calificaciones.asignatura,representante`.
+Cada relación pedida se carga de forma anticipada en el repositorio y se
+incluye anidada en la respuesta.
+"""
+from typing import List, Optional, Type
+from fastapi import HTTPException
+from schemas.base import LecturaORM
+
+# Límite de rutas por petición, para acotar las consultas de carga
+MAX_RUTAS_INCLUDE = 10
+
+
+def resolver_include(include: Optional[str], schema: Type[LecturaORM]) -> List[str]:
+    """
+    Separa y valida las rutas del parámetro include contra el schema de
+    lectura: solo pueden pedirse relaciones que el schema sabe serializar.
+
+    Args:
+        include: Valor del parámetro (ej: "matriculas.curso,representante")
+        schema: Schema de lectura de la ruta (ej: EstudianteRead)
+
+    Returns:
+        Lista de rutas de relaciones, sin duplicados
+
+    Raises:
+        HTTPException: 400 si alguna ruta no es válida o forma un ciclo
+    """
+    if not include:
+        return []
+    rutas = list(dict.fromkeys(r.strip() for r in include.split(",") if r.strip()))
+    if len(rutas) > MAX_RUTAS_INCLUDE:
+        raise HTTPException(status_code=400, detail=f"Se permiten como máximo {MAX_RUTAS_INCLUDE} rutas en include")
+    for ruta in rutas:
+        actual, recorridos = schema, {schema}
+        for nombre in ruta.split("."):
+            actual = actual.schema_relacion(nombre)
+            if actual is None:
+                raise HTTPException(status_code=400, detail=f"No se puede incluir '{ruta}': relación '{nombre}' desconocida")
+            # Volver a un tipo ya recorrido (ej: estudiante.matriculas.estudiante)
+            # anidaría un objeto dentro de sí mismo
+            if actual in recorridos:
+                raise HTTPException(status_code=400, detail=f"No se puede incluir '{ruta}': la relación '{nombre}' vuelve a un nivel anterior")
+            recorridos.add(actual)
+    return rutas
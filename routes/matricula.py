@@ -1,26 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
-from config.database import SessionLocal
-from services.services import MatriculaService
-from schemas.matricula import MatriculaCreate, MatriculaUpdate, MatriculaRead
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from config.settings import JSON_RAPIDO
+from services.async_services import get_servicio
+from services.services import MatriculaService, ErrorValidacionLote
+from schemas.matricula import MatriculaCreate, MatriculaUpdate, MatriculaRead, MatriculaRetiro
+from typing import List, Optional
+from routes.paginacion import resolver_after_id, agregar_siguiente_cursor, agregar_total
+from routes.respuestas import columnas_lectura, respuesta_filas
+from routes.exportacion import FormatoExportacion, respuesta_exportacion
+from routes.inclusion import resolver_include
 
 router = APIRouter(prefix="/matriculas", tags=["Matrículas"])
 
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Servicio ejecutado en modo síncrono o asíncrono según DB_ASYNC
+get_service = get_servicio(MatriculaService)
 
 
 @router.post("", response_model=MatriculaRead, status_code=201)
-def crear_matricula(mat: MatriculaCreate, db = Depends(get_db)):
+async def crear_matricula(mat: MatriculaCreate, service = Depends(get_service)):
     """Crear una nueva matrícula"""
-    service = MatriculaService(db)
     try:
-        return service.crear_matricula(
+        return await service.crear_matricula(
             estudiante_id=mat.estudiante_id,
             curso_id=mat.curso_id,
             estado=mat.estado.value if hasattr(mat.estado, 'value') else mat.estado,
@@ -30,32 +29,111 @@ def crear_matricula(mat: MatriculaCreate, db = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/bulk", response_model=List[MatriculaRead], status_code=201)
+async def crear_matriculas_lote(mats: List[MatriculaCreate], service = Depends(get_service)):
+    """Crear varias matrículas en una sola transacción"""
+    try:
+        return await service.crear_matriculas_lote([
+            {**mat.dict(), "estado": mat.estado.value} for mat in mats
+        ])
+    except ErrorValidacionLote as e:
+        raise HTTPException(status_code=400, detail=e.errores)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/bulk", status_code=204)
+async def eliminar_matriculas_lote(ids: List[int], service = Depends(get_service)):
+    """
+    Eliminar varias matrículas (lista de IDs) con una sola sentencia; la BD
+    borra en cascada sus calificaciones y asistencias.
+    Si algún ID no existe no se elimina ninguna.
+    """
+    try:
+        await service.eliminar_matriculas_lote(ids)
+    except ErrorValidacionLote as e:
+        raise HTTPException(status_code=400, detail=e.errores)
+
+
+@router.post("/retirar", response_model=List[MatriculaRead])
+async def retirar_matriculas(retiro: MatriculaRetiro, service = Depends(get_service)):
+    """
+    Retirar en bloque (estado RETIRADO) las matrículas indicadas y todas las
+    de los estudiantes indicados, con un solo UPDATE.
+    Devuelve las matrículas retiradas; las ya retiradas o graduadas no cambian.
+    """
+    try:
+        return await service.retirar_matriculas(retiro.matricula_ids, retiro.estudiante_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/export")
+async def exportar_matriculas(formato: FormatoExportacion = Query("csv", alias="format")):
+    """
+    Exportar todas las matrículas en CSV o NDJSON (format=csv|ndjson).
+    La respuesta se envía por partes mientras se lee la tabla.
+    """
+    return respuesta_exportacion(MatriculaService, formato, "matriculas")
+
+
+@router.get("/historial", response_model=List[MatriculaRead])
+async def obtener_historial(estudiante_id: int, include: Optional[str] = None, service = Depends(get_service)):
+    """
+    Historial de matrículas de un estudiante, incluidas las de años lectivos
+    archivados (archivada=true), de la más antigua a la más reciente.
+    Con include se cargan relaciones anidadas (ej: include=curso,calificaciones).
+    """
+    try:
+        return await service.obtener_historial(estudiante_id, resolver_include(include, MatriculaRead))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/{mat_id}", response_model=MatriculaRead)
-def obtener_matricula(mat_id: int, db = Depends(get_db)):
-    """Obtener una matrícula por ID"""
-    service = MatriculaService(db)
-    mat = service.obtener_matricula(mat_id)
+async def obtener_matricula(mat_id: int, include: Optional[str] = None, service = Depends(get_service)):
+    """
+    Obtener una matrícula por ID (también de años lectivos archivados).
+    Con include se cargan relaciones anidadas (ej: include=estudiante,curso).
+    """
+    mat = await service.obtener_matricula(mat_id, resolver_include(include, MatriculaRead))
     if not mat:
         raise HTTPException(status_code=404, detail="Matrícula no encontrada")
     return mat
 
 
 @router.get("", response_model=List[MatriculaRead])
-def listar_matriculas(skip: int = 0, limit: int = 10, db = Depends(get_db)):
-    """Listar todas las matrículas"""
-    service = MatriculaService(db)
-    return service.listar_matriculas(skip, limit)
+async def listar_matriculas(response: Response, skip: int = 0, limit: int = 10,
+                            after_id: Optional[int] = None, cursor: Optional[str] = None,
+                            include: Optional[str] = None, total_exacto: bool = Query(False, alias="exact_count"),
+                            service = Depends(get_service)):
+    """
+    Listar todas las matrículas.
+    Con after_id o cursor se pagina por clave (keyset) en lugar de usar skip;
+    la cabecera X-Next-Cursor trae el cursor de la página siguiente.
+    X-Total-Count trae el total (estimado en tablas grandes salvo exact_count=true).
+    Con include se cargan relaciones anidadas sin una consulta por fila.
+    """
+    rutas = resolver_include(include, MatriculaRead)
+    after_id = resolver_after_id(after_id, cursor)
+    rapido = JSON_RAPIDO and not rutas
+    if rapido:
+        mats = await service.listar_filas(columnas_lectura(MatriculaRead), skip, limit, after_id)
+    else:
+        mats = await service.listar_matriculas(skip, limit, after_id, rutas)
+    agregar_siguiente_cursor(response, mats, limit)
+    await agregar_total(response, service, total_exacto)
+    return respuesta_filas(mats, MatriculaRead, response) if rapido else mats
 
 
 @router.put("/{mat_id}", response_model=MatriculaRead)
-def actualizar_matricula(mat_id: int, mat: MatriculaUpdate, db = Depends(get_db)):
+async def actualizar_matricula(mat_id: int, mat: MatriculaUpdate, service = Depends(get_service)):
     """Actualizar una matrícula"""
-    service = MatriculaService(db)
     try:
         update_dict = mat.dict(exclude_unset=True)
         if 'estado' in update_dict and hasattr(update_dict['estado'], 'value'):
             update_dict['estado'] = update_dict['estado'].value
-        updated = service.actualizar_matricula(mat_id, **update_dict)
+        updated = await service.actualizar_matricula(mat_id, **update_dict)
         if not updated:
             raise HTTPException(status_code=404, detail="Matrícula no encontrada")
         return updated
@@ -64,9 +142,8 @@ def actualizar_matricula(mat_id: int, mat: MatriculaUpdate, db = Depends(get_db)
 
 
 @router.delete("/{mat_id}", status_code=204)
-def eliminar_matricula(mat_id: int, db = Depends(get_db)):
+async def eliminar_matricula(mat_id: int, service = Depends(get_service)):
     """Eliminar una matrícula"""
-    service = MatriculaService(db)
-    success = service.eliminar_matricula(mat_id)
+    success = await service.eliminar_matricula(mat_id)
     if not success:
         raise HTTPException(status_code=404, detail="Matrícula no encontrada")
@@ -0,0 +1,89 @@
+"""
+Paginación por cursor (keyset) para las rutas de listado
+
+El cursor es opaco para el cliente: codifica el ID del último registro
+entregado y se devuelve en la cabecera X-Next-Cursor cuando puede haber
+más páginas.
+
+El total de registros va en X-Total-Count. En las tablas grandes es la
+estimación de las estadísticas de PostgreSQL (X-Total-Count-Estimated: true),
+que no recorre la tabla; con exact_count=true se cuenta siempre.
+"""
+import base64
+import binascii
+import json
+from typing import List, Optional
+from fastapi import HTTPException, Response
+
+CABECERA_CURSOR = "X-Next-Cursor"
+CABECERA_TOTAL = "X-Total-Count"
+CABECERA_TOTAL_ESTIMADO = "X-Total-Count-Estimated"
+
+
+def codificar_cursor(ultimo_id: int) -> str:
+    """
+    Genera el cursor que apunta a los registros posteriores a `ultimo_id`.
+
+    >>> codificar_cursor(42)
+    'eyJhZnRlcl9pZCI6IDQyfQ'
+    """
+    datos = json.dumps({"after_id": ultimo_id}).encode()
+    return base64.urlsafe_b64encode(datos).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> int:
+    """
+    Obtiene el ID contenido en un cursor generado por codificar_cursor.
+
+    >>> decodificar_cursor(codificar_cursor(42))
+    42
+    >>> decodificar_cursor("no-es-un-cursor")
+    Traceback (most recent call last):
+    ...
+    ValueError: Cursor inválido
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        after_id = datos["after_id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValueError("Cursor inválido")
+    if not isinstance(after_id, int):
+        raise ValueError("Cursor inválido")
+    return after_id
+
+
+def resolver_after_id(after_id: Optional[int], cursor: Optional[str]) -> Optional[int]:
+    """
+    Determina desde qué ID continuar, a partir del parámetro explícito
+    after_id o del cursor opaco (que tiene prioridad).
+    """
+    if cursor is None:
+        return after_id
+    try:
+        return decodificar_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def agregar_siguiente_cursor(response: Response, items: List, limit: int) -> None:
+    """
+    Añade la cabecera X-Next-Cursor si la página vino completa
+    (una página incompleta indica que no hay más registros).
+    """
+    if items and len(items) >= limit:
+        response.headers[CABECERA_CURSOR] = codificar_cursor(items[-1].id)
+
+
+async def agregar_total(response: Response, service, exacto: bool) -> None:
+    """
+    Añade las cabeceras X-Total-Count y X-Total-Count-Estimated.
+
+    Args:
+        response: Respuesta de la ruta de listado
+        service: Servicio de la ruta (debe tener el método total())
+        exacto: Contar siempre, aunque la tabla sea grande
+    """
+    total, estimado = await service.total(exacto)
+    response.headers[CABECERA_TOTAL] = str(total)
+    response.headers[CABECERA_TOTAL_ESTIMADO] = "true" if estimado else "false"
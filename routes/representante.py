@@ -1,58 +1,86 @@
-from fastapi import APIRouter, Depends, HTTPException
-from config.database import SessionLocal
-from services.services import RepresentanteService
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from config.settings import JSON_RAPIDO
+from services.async_services import get_servicio
+from services.services import RepresentanteService, ErrorValidacionLote
 from schemas.representante import RepresentanteCreate, RepresentanteUpdate, RepresentanteRead
-from typing import List
+from typing import List, Optional
+from routes.paginacion import resolver_after_id, agregar_siguiente_cursor, agregar_total
+from routes.respuestas import columnas_lectura, respuesta_filas
+from routes.exportacion import FormatoExportacion, respuesta_exportacion
 
 router = APIRouter(prefix="/representantes", tags=["Representantes"])
 
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Servicio ejecutado en modo síncrono o asíncrono según DB_ASYNC
+get_service = get_servicio(RepresentanteService)
 
 
 @router.post("", response_model=RepresentanteRead, status_code=201)
-def crear_representante(rep: RepresentanteCreate, db = Depends(get_db)):
+async def crear_representante(rep: RepresentanteCreate, service = Depends(get_service)):
     """Crear un nuevo representante"""
-    service = RepresentanteService(db)
-    return service.crear_representante(nombre=rep.nombre, telefono=rep.telefono)
+    return await service.crear_representante(nombre=rep.nombre, telefono=rep.telefono)
+
+
+@router.post("/bulk", response_model=List[RepresentanteRead], status_code=201)
+async def crear_representantes_lote(reps: List[RepresentanteCreate], service = Depends(get_service)):
+    """Crear varios representantes en una sola transacción"""
+    try:
+        return await service.crear_representantes_lote([rep.dict() for rep in reps])
+    except ErrorValidacionLote as e:
+        raise HTTPException(status_code=400, detail=e.errores)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/export")
+async def exportar_representantes(formato: FormatoExportacion = Query("csv", alias="format")):
+    """
+    Exportar todos los representantes en CSV o NDJSON (format=csv|ndjson).
+    La respuesta se envía por partes mientras se lee la tabla.
+    """
+    return respuesta_exportacion(RepresentanteService, formato, "representantes")
 
 
 @router.get("/{rep_id}", response_model=RepresentanteRead)
-def obtener_representante(rep_id: int, db = Depends(get_db)):
+async def obtener_representante(rep_id: int, service = Depends(get_service)):
     """Obtener un representante por ID"""
-    service = RepresentanteService(db)
-    rep = service.obtener_representante(rep_id)
+    rep = await service.obtener_representante(rep_id)
     if not rep:
         raise HTTPException(status_code=404, detail="Representante no encontrado")
     return rep
 
 
 @router.get("", response_model=List[RepresentanteRead])
-def listar_representantes(skip: int = 0, limit: int = 10, db = Depends(get_db)):
-    """Listar todos los representantes"""
-    service = RepresentanteService(db)
-    return service.listar_representantes(skip, limit)
+async def listar_representantes(response: Response, skip: int = 0, limit: int = 10,
+                                after_id: Optional[int] = None, cursor: Optional[str] = None,
+                                total_exacto: bool = Query(False, alias="exact_count"), service = Depends(get_service)):
+    """
+    Listar todos los representantes.
+    Con after_id o cursor se pagina por clave (keyset) en lugar de usar skip;
+    la cabecera X-Next-Cursor trae el cursor de la página siguiente.
+    X-Total-Count trae el total (estimado en tablas grandes salvo exact_count=true).
+    """
+    after_id = resolver_after_id(after_id, cursor)
+    if JSON_RAPIDO:
+        reps = await service.listar_filas(columnas_lectura(RepresentanteRead), skip, limit, after_id)
+    else:
+        reps = await service.listar_representantes(skip, limit, after_id)
+    agregar_siguiente_cursor(response, reps, limit)
+    await agregar_total(response, service, total_exacto)
+    return respuesta_filas(reps, RepresentanteRead, response) if JSON_RAPIDO else reps
 
 
 @router.put("/{rep_id}", response_model=RepresentanteRead)
-def actualizar_representante(rep_id: int, rep: RepresentanteUpdate, db = Depends(get_db)):
+async def actualizar_representante(rep_id: int, rep: RepresentanteUpdate, service = Depends(get_service)):
     """Actualizar un representante"""
-    service = RepresentanteService(db)
-    updated = service.actualizar_representante(rep_id, **rep.dict(exclude_unset=True))
+    updated = await service.actualizar_representante(rep_id, **rep.dict(exclude_unset=True))
     if not updated:
         raise HTTPException(status_code=404, detail="Representante no encontrado")
     return updated
 
 
 @router.delete("/{rep_id}", status_code=204)
-def eliminar_representante(rep_id: int, db = Depends(get_db)):
+async def eliminar_representante(rep_id: int, service = Depends(get_service)):
     """Eliminar un representante"""
-    service = RepresentanteService(db)
-    success = service.eliminar_representante(rep_id)
+    success = await service.eliminar_representante(rep_id)
     if not success:
         raise HTTPException(status_code=404, detail="Representante no encontrado")
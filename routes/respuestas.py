@@ -0,0 +1,99 @@
+"""
+Ruta rápida de serialización JSON para listados (JSON_RAPIDO=1)
+
+Normalmente un listado devuelve objetos ORM que FastAPI valida uno por uno
+contra el response_model (EstudianteRead, ...) antes de escribirlos en
+JSON; en páginas grandes ese trabajo por fila domina el tiempo de CPU.
+
+En la ruta rápida el repositorio lee solo las columnas del schema como
+filas (read_filas) y respuesta_filas las escribe directamente en JSON, sin
+construir objetos ORM ni modelos de Pydantic. Las filas vienen de la BD y
+ya cumplen el schema (tipos de columna y NOT NULL), así que no se validan
+otra vez. Solo se usa sin include: las relaciones anidadas siguen el
+camino normal.
+
+La codificación usa orjson si está instalado y si no pydantic_core.to_json;
+para los tipos de las columnas (int, float, str, date, Enum y None) ambos
+producen el mismo JSON que el response_model.
+"""
+from typing import Dict, List, Sequence, Type
+from fastapi import Response
+from pydantic_core import PydanticUndefined, to_json
+from schemas.base import LecturaORM
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional: sin ella se usa pydantic_core
+    orjson = None
+
+
+def codificar_json(contenido) -> bytes:
+    """
+    Codifica en JSON (UTF-8, sin espacios) con orjson o pydantic_core.
+
+    >>> from datetime import date
+    >>> from models.enums import EstadoAsistencia
+    >>> codificar_json([{"id": 1, "fecha": date(2024, 9, 2), "estado": EstadoAsistencia.PRESENTE, "nota": 8.5}])
+    b'[{"id":1,"fecha":"2024-09-02","estado":"PRESENTE","nota":8.5}]'
+    """
+    if orjson is not None:
+        return orjson.dumps(contenido)
+    return to_json(contenido)
+
+
+class RespuestaJSONRapida(Response):
+    """Respuesta JSON codificada con codificar_json"""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return codificar_json(content)
+
+
+def columnas_lectura(schema: Type[LecturaORM]) -> List[str]:
+    """
+    Campos del schema de lectura que no son relaciones.
+
+    >>> from schemas.calificacion import CalificacionRead
+    >>> columnas_lectura(CalificacionRead)
+    ['id', 'nota', 'quimestre', 'matricula_id', 'asignatura_id']
+    """
+    return [campo for campo in schema.model_fields if schema.schema_relacion(campo) is None]
+
+
+def _faltantes(schema: Type[LecturaORM], presentes: Sequence[str]) -> Dict[str, object]:
+    """
+    Valores por defecto de los campos del schema (sin relaciones) que las filas no traen.
+
+    >>> from schemas.matricula import MatriculaRead
+    >>> _faltantes(MatriculaRead, ["id", "fecha", "estudiante_id", "curso_id", "estado"])
+    {'archivada': False}
+    """
+    return {
+        campo: schema.model_fields[campo].default
+        for campo in columnas_lectura(schema)
+        if campo not in presentes and schema.model_fields[campo].default is not PydanticUndefined
+    }
+
+
+def respuesta_filas(filas: Sequence, schema: Type[LecturaORM], response: Response) -> RespuestaJSONRapida:
+    """
+    Escribe las filas de read_filas como la lista JSON que produciría el schema.
+
+    Args:
+        filas: Filas con las columnas de columnas_lectura(schema); los
+            campos que la tabla no tiene toman el valor por defecto del schema
+        schema: Schema de lectura del listado (ej: EstudianteRead)
+        response: Respuesta de la ruta, de la que se copian las cabeceras
+            (X-Next-Cursor, X-Total-Count, ETag, ...)
+
+    Returns:
+        Respuesta con el JSON ya codificado
+    """
+    contenido = []
+    if filas:
+        campos = filas[0]._fields
+        faltantes = _faltantes(schema, campos)
+        contenido = [{**dict(zip(campos, fila)), **faltantes} for fila in filas]
+    respuesta = RespuestaJSONRapida(contenido)
+    respuesta.raw_headers.extend(response.headers.raw)
+    return respuesta
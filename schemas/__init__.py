@@ -38,3 +38,24 @@ __all__ = [
     "AsistenciaCreate",
     "AsistenciaRead",
 ]
+
+# Los schemas de lectura se referencian entre sí (ej: EstudianteRead.matriculas
+# -> MatriculaRead.estudiante); se resuelven las referencias cuando ya existen todos
+from schemas.estudiante import EstudianteRead as _EstudianteRead
+from schemas.docente import DocenteRead as _DocenteRead
+from schemas.curso import CursoRead as _CursoRead
+from schemas.asignatura import AsignaturaRead as _AsignaturaRead
+from schemas.matricula import MatriculaRead as _MatriculaRead
+from schemas.calificacion import CalificacionRead as _CalificacionRead
+from schemas.asistencia import AsistenciaRead as _AsistenciaRead
+from schemas.representante import RepresentanteRead as _RepresentanteRead
+
+_LECTURAS = {
+    schema.__name__: schema
+    for schema in (
+        _RepresentanteRead, _EstudianteRead, _DocenteRead, _CursoRead,
+        _AsignaturaRead, _MatriculaRead, _CalificacionRead, _AsistenciaRead,
+    )
+}
+for _schema in _LECTURAS.values():
+    _schema.model_rebuild(_types_namespace=_LECTURAS)
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
+from schemas.base import LecturaORM
 
 
 class AsignaturaCreate(BaseModel):
@@ -36,7 +37,7 @@ class AsignaturaUpdate(BaseModel):
         }
 
 
-class AsignaturaRead(BaseModel):
+class AsignaturaRead(LecturaORM):
     """Schema para leer una asignatura"""
     id: int
     nombre: str
@@ -44,5 +45,11 @@ class AsignaturaRead(BaseModel):
     curso_id: int
     docente_id: Optional[int]
 
+    # Relaciones: presentes solo si se piden con ?include=
+    curso: Optional["CursoRead"] = None
+    docente: Optional["DocenteRead"] = None
+    calificaciones: Optional[List["CalificacionRead"]] = None
+    asistencias: Optional[List["AsistenciaRead"]] = None
+
     class Config:
         from_attributes = True
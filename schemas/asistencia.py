@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import date
 from enum import Enum
+from schemas.base import LecturaORM
 
 
 class EstadoAsistenciaEnum(str, Enum):
@@ -45,7 +46,7 @@ class AsistenciaUpdate(BaseModel):
         }
 
 
-class AsistenciaRead(BaseModel):
+class AsistenciaRead(LecturaORM):
     """Schema para leer una asistencia"""
     id: int
     fecha: date
@@ -53,5 +54,9 @@ class AsistenciaRead(BaseModel):
     matricula_id: int
     asignatura_id: int
 
+    # Relaciones: presentes solo si se piden con ?include=
+    matricula: Optional["MatriculaRead"] = None
+    asignatura: Optional["AsignaturaRead"] = None
+
     class Config:
         from_attributes = True
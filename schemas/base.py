@@ -0,0 +1,60 @@
+"""
+Base para los schemas de lectura que se construyen desde modelos ORM
+"""
+from typing import Optional, Type, get_args
+from pydantic import BaseModel, ConfigDict, model_serializer, model_validator
+from sqlalchemy import inspect
+from sqlalchemy.orm.state import InstanceState
+
+
+class LecturaORM(BaseModel):
+    """
+    Schema de lectura para un objeto ORM con relaciones opcionales.
+
+    Los campos de relación (ej: `matriculas`, `curso`) solo se leen si la
+    relación ya está cargada, por ejemplo con ?include=. Así serializar la
+    respuesta nunca dispara una consulta perezosa por fila; las relaciones
+    no cargadas quedan sin asignar y se omiten de la respuesta.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _omitir_relaciones_no_cargadas(cls, datos):
+        estado = inspect(datos, raiseerr=False)
+        if not isinstance(estado, InstanceState):
+            return datos
+        no_cargadas = estado.unloaded & set(estado.mapper.relationships.keys())
+        return {
+            campo: getattr(datos, campo)
+            for campo in cls.model_fields
+            if campo not in no_cargadas and hasattr(datos, campo)
+        }
+
+    @model_serializer(mode="wrap")
+    def _omitir_relaciones_sin_asignar(self, handler):
+        datos = handler(self)
+        for campo in type(self).model_fields:
+            if campo not in self.model_fields_set and type(self).schema_relacion(campo):
+                datos.pop(campo, None)
+        return datos
+
+    @classmethod
+    def schema_relacion(cls, nombre: str) -> Optional[Type["LecturaORM"]]:
+        """
+        Schema del campo de relación `nombre`, o None si no es una relación.
+
+        Args:
+            nombre: Nombre del campo (ej: "matriculas")
+
+        Returns:
+            Clase del schema anidado (ej: MatriculaRead)
+        """
+        campo = cls.model_fields.get(nombre)
+        pendientes = [campo.annotation] if campo else []
+        while pendientes:
+            tipo = pendientes.pop()
+            if isinstance(tipo, type) and issubclass(tipo, LecturaORM):
+                return tipo
+            pendientes.extend(get_args(tipo))
+        return None
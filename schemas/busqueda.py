@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Literal
+
+# Tipos de persona en los que se puede buscar
+TipoPersona = Literal["estudiante", "docente", "representante"]
+
+
+class ResultadoBusqueda(BaseModel):
+    """Schema de un resultado de la búsqueda de personas"""
+    tipo: TipoPersona
+    id: int
+    nombre: str
+    detalle: str      # Cédula del estudiante, correo del docente o teléfono del representante
+    puntaje: float    # Similitud con la consulta, de 0 a 1
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "tipo": "estudiante",
+                "id": 42,
+                "nombre": "María López",
+                "detalle": "1712345678",
+                "puntaje": 1.0
+            }
+        }
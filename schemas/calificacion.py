@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
+from schemas.base import LecturaORM
 
 
 class CalificacionCreate(BaseModel):
@@ -36,7 +37,7 @@ class CalificacionUpdate(BaseModel):
         }
 
 
-class CalificacionRead(BaseModel):
+class CalificacionRead(LecturaORM):
     """Schema para leer una calificación"""
     id: int
     nota: float
@@ -44,5 +45,55 @@ class CalificacionRead(BaseModel):
     matricula_id: int
     asignatura_id: int
 
+    # Relaciones: presentes solo si se piden con ?include=
+    matricula: Optional["MatriculaRead"] = None
+    asignatura: Optional["AsignaturaRead"] = None
+
     class Config:
         from_attributes = True
+
+
+class PromedioAsignatura(BaseModel):
+    """Promedio de una asignatura dentro de la libreta"""
+    asignatura_id: int
+    asignatura: str
+    promedio: Optional[float] = None
+    cantidad: int
+
+
+class LibretaEstudiante(BaseModel):
+    """Promedios de un estudiante (por asignatura y general)"""
+    matricula_id: int
+    estudiante_id: int
+    nombre: str
+    apellido: str
+    promedio_general: Optional[float] = None
+    asignaturas: List[PromedioAsignatura] = []
+
+
+class LibretaCurso(BaseModel):
+    """Libreta de calificaciones de un curso"""
+    curso_id: int
+    quimestre: Optional[int] = None
+    promedio_curso: Optional[float] = None
+    asignaturas: List[PromedioAsignatura] = []
+    estudiantes: List[LibretaEstudiante] = []
+
+
+class PromedioEstudiante(BaseModel):
+    """Promedio de una matrícula"""
+    matricula_id: int
+    quimestre: Optional[int] = None
+    asignatura_id: Optional[int] = None
+    promedio: float
+
+
+class PosicionRanking(BaseModel):
+    """Posición de un estudiante en el ranking de su curso"""
+    posicion: int
+    matricula_id: int
+    estudiante_id: int
+    nombre: str
+    apellido: str
+    promedio: float
+    cantidad: int
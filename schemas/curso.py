@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
+from schemas.base import LecturaORM
 
 
 class CursoCreate(BaseModel):
@@ -30,11 +31,15 @@ class CursoUpdate(BaseModel):
         }
 
 
-class CursoRead(BaseModel):
+class CursoRead(LecturaORM):
     """Schema para leer un curso"""
     id: int
     nombre: str
     nivel: str
 
+    # Relaciones: presentes solo si se piden con ?include=
+    asignaturas: Optional[List["AsignaturaRead"]] = None
+    matriculas: Optional[List["MatriculaRead"]] = None
+
     class Config:
         from_attributes = True
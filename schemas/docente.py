@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
+from schemas.base import LecturaORM
 
 
 class DocenteCreate(BaseModel):
@@ -36,7 +37,7 @@ class DocenteUpdate(BaseModel):
         }
 
 
-class DocenteRead(BaseModel):
+class DocenteRead(LecturaORM):
     """Schema para leer un docente"""
     id: int
     nombre: str
@@ -44,5 +45,8 @@ class DocenteRead(BaseModel):
     titulo: Optional[str]
     correo: str
 
+    # Relaciones: presentes solo si se piden con ?include=
+    asignaturas: Optional[List["AsignaturaRead"]] = None
+
     class Config:
         from_attributes = True
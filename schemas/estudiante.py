@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import date
+from schemas.base import LecturaORM
 
 
 class EstudianteCreate(BaseModel):
@@ -43,7 +44,7 @@ class EstudianteUpdate(BaseModel):
         }
 
 
-class EstudianteRead(BaseModel):
+class EstudianteRead(LecturaORM):
     """Schema para leer un estudiante"""
     id: int
     nombre: str
@@ -53,5 +54,9 @@ class EstudianteRead(BaseModel):
     correo: Optional[str]
     representante_id: int
 
+    # Relaciones: presentes solo si se piden con ?include=
+    representante: Optional["RepresentanteRead"] = None
+    matriculas: Optional[List["MatriculaRead"]] = None
+
     class Config:
         from_attributes = True
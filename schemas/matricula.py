@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import date
 from enum import Enum
+from schemas.base import LecturaORM
 
 
 class EstadoMatriculaEnum(str, Enum):
@@ -47,13 +48,34 @@ class MatriculaUpdate(BaseModel):
         }
 
 
-class MatriculaRead(BaseModel):
+class MatriculaRetiro(BaseModel):
+    """Schema para retirar matrículas en bloque (por ID o por estudiante)"""
+    matricula_ids: List[int] = []
+    estudiante_ids: List[int] = []
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "estudiante_ids": [12, 15]
+            }
+        }
+
+
+class MatriculaRead(LecturaORM):
     """Schema para leer una matrícula"""
     id: int
     fecha: date
     estudiante_id: int
     curso_id: int
     estado: str
+    # True si la matrícula es de un año lectivo archivado (esquema archivo)
+    archivada: bool = False
+
+    # Relaciones: presentes solo si se piden con ?include=
+    estudiante: Optional["EstudianteRead"] = None
+    curso: Optional["CursoRead"] = None
+    calificaciones: Optional[List["CalificacionRead"]] = None
+    asistencias: Optional[List["AsistenciaRead"]] = None
 
     class Config:
         from_attributes = True
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
+from schemas.base import LecturaORM
 
 
 class RepresentanteCreate(BaseModel):
@@ -31,7 +32,7 @@ class RepresentanteUpdate(BaseModel):
         }
 
 
-class RepresentanteRead(BaseModel):
+class RepresentanteRead(LecturaORM):
     """Schema para leer un representante"""
     id: int
     nombre: str
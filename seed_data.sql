@@ -162,6 +162,13 @@ INSERT INTO calificaciones (nota, quimestre, matricula_id, asignatura_id) VALUES
 (7.7, 1, 19, 19),
 (8.8, 1, 20, 20);
 
+-- 7.1 Calcular el resumen de calificaciones
+DELETE FROM resumen_calificaciones;
+INSERT INTO resumen_calificaciones (matricula_id, asignatura_id, quimestre, suma, cantidad, minimo, maximo)
+SELECT matricula_id, asignatura_id, quimestre, SUM(nota), COUNT(*), MIN(nota), MAX(nota)
+FROM calificaciones
+GROUP BY matricula_id, asignatura_id, quimestre;
+
 -- 8. Insertar Asistencias (20 registros)
 INSERT INTO asistencias (fecha, estado, matricula_id, asignatura_id) VALUES
 ('2024-12-15', 'PRESENTE', 1, 1),
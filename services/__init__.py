@@ -9,7 +9,10 @@ from services.services import (
     AsignaturaService,
     MatriculaService,
     CalificacionService,
-    AsistenciaService
+    AsistenciaService,
+    ArchivoService,
+    BusquedaService,
+    ErrorValidacionLote
 )
 
 __all__ = [
@@ -21,4 +24,7 @@ __all__ = [
     "MatriculaService",
     "CalificacionService",
     "AsistenciaService",
+    "ArchivoService",
+    "BusquedaService",
+    "ErrorValidacionLote",
 ]
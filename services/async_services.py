@@ -0,0 +1,67 @@
+"""
+Ejecución de los servicios desde rutas asíncronas
+
+Las rutas obtienen su servicio con get_servicio y esperan (await) sus
+métodos. Según DB_ASYNC, el mismo servicio se ejecuta:
+
+- DB_ASYNC=0: en el threadpool de Starlette con una Session normal
+  (comportamiento equivalente a las rutas síncronas).
+- DB_ASYNC=1: sobre una AsyncSession mediante run_sync. Los servicios y
+  repositorios son los mismos, pero la espera de la BD la hace el driver
+  asíncrono sin ocupar un hilo del threadpool.
+"""
+from typing import Callable, Type
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from config.database import DB_ASYNC, get_async_db, get_db
+
+
+class ServicioEnHilo:
+    """Expone los métodos de un servicio síncrono como corrutinas ejecutadas en el threadpool"""
+
+    def __init__(self, servicio):
+        self._servicio = servicio
+
+    def __getattr__(self, nombre: str):
+        metodo = getattr(self._servicio, nombre)
+
+        async def llamar(*args, **kwargs):
+            return await run_in_threadpool(metodo, *args, **kwargs)
+        return llamar
+
+
+class ServicioAsync:
+    """Expone los métodos de un servicio como corrutinas ejecutadas sobre una AsyncSession"""
+
+    def __init__(self, servicio_cls: Type, db):
+        self._servicio_cls = servicio_cls
+        self._db = db
+
+    def __getattr__(self, nombre: str):
+        getattr(self._servicio_cls, nombre)  # AttributeError temprano si no existe
+
+        async def llamar(*args, **kwargs):
+            return await self._db.run_sync(
+                lambda sesion: getattr(self._servicio_cls(sesion), nombre)(*args, **kwargs)
+            )
+        return llamar
+
+
+def get_servicio(servicio_cls: Type) -> Callable:
+    """
+    Crea la dependencia de FastAPI que entrega el servicio en el modo configurado.
+
+    Args:
+        servicio_cls: Clase del servicio (ej: CalificacionService)
+
+    Returns:
+        Dependencia para usar con Depends()
+    """
+    if DB_ASYNC:
+        async def dependencia(db=Depends(get_async_db)):
+            return ServicioAsync(servicio_cls, db)
+    else:
+        def dependencia(db: Session = Depends(get_db)):
+            return ServicioEnHilo(servicio_cls(db))
+    return dependencia
@@ -0,0 +1,300 @@
+"""
+Ejecución de las pruebas unitarias y de cobertura en segundo plano
+
+/ejecutar-pruebas ejecutaba pytest dentro del worker, reemplazando
+sys.stdout del proceso y ocupándolo durante toda la corrida. Ahora pytest
+corre en un subproceso lanzado desde un hilo: la API sigue atendiendo
+mientras tanto y la salida se captura por una tubería.
+
+El reporte HTML terminado se guarda en disco con la revisión del código
+como nombre (hash del contenido de los .py y de .coveragerc), así que vale
+para todos los workers y reinicios hasta que el código cambie. El estado de
+la ejecución en curso es de cada proceso: con varios workers cada uno puede
+lanzar como mucho una ejecución a la vez.
+"""
+import hashlib
+import html
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from config.settings import PRUEBAS_DIRECTORIO_REPORTES, PRUEBAS_TIEMPO_MAXIMO
+
+# Raíz del proyecto (donde están .coveragerc y los módulos a probar)
+DIRECTORIO_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# -v (verbose), --cov (cobertura), -s (mostrar los print de las pruebas).
+# Se asume que .coveragerc ya está configurado en el directorio raíz
+ARGUMENTOS_PYTEST = ["-v", "--cov", "--cov-report=term-missing", "--doctest-modules", "--ignore=routes", "-s"]
+
+# Archivos que, además de los .py, cambian el resultado de las pruebas
+ARCHIVOS_CONFIGURACION = (".coveragerc", "pytest.ini", "setup.cfg", "pyproject.toml")
+
+# Carpetas que no forman parte del código
+CARPETAS_IGNORADAS = {".git", "__pycache__", ".pytest_cache", "venv", ".venv", "node_modules"}
+
+# Última revisión calculada por directorio, con la firma (ruta, mtime,
+# tamaño) de los archivos con la que se calculó
+_revisiones: Dict[str, Tuple[tuple, str]] = {}
+
+
+def _archivos_codigo(directorio: str):
+    """Rutas de los .py y de la configuración, en orden fijo"""
+    for raiz, carpetas, archivos in os.walk(directorio):
+        carpetas[:] = sorted(c for c in carpetas if c not in CARPETAS_IGNORADAS)
+        for nombre in sorted(archivos):
+            if nombre.endswith(".py") or nombre in ARCHIVOS_CONFIGURACION:
+                yield os.path.join(raiz, nombre)
+
+
+def revision_codigo(directorio: str = DIRECTORIO_PROYECTO) -> str:
+    """
+    Huella del código: hash del contenido de los .py y de la configuración
+    de pytest/coverage. Funciona sin git (la imagen de Docker no lo trae) y
+    cambia también con modificaciones sin confirmar.
+
+    Se llama en cada visita a /ejecutar-pruebas y en cada recarga de la
+    página de progreso: el contenido solo se vuelve a leer si cambió la
+    fecha de modificación o el tamaño de algún archivo.
+
+    Args:
+        directorio: Raíz del proyecto
+
+    Returns:
+        Los primeros 16 caracteres hexadecimales del SHA-256
+
+    >>> import tempfile
+    >>> raiz = tempfile.mkdtemp()
+    >>> with open(os.path.join(raiz, "modulo.py"), "w") as archivo:
+    ...     _ = archivo.write("x = 1")
+    >>> revision = revision_codigo(raiz)
+    >>> revision_codigo(raiz) == revision
+    True
+    >>> with open(os.path.join(raiz, "modulo.py"), "w") as archivo:
+    ...     _ = archivo.write("x = 10")
+    >>> revision_codigo(raiz) == revision
+    False
+    """
+    rutas = list(_archivos_codigo(directorio))
+    firma = tuple(
+        (ruta, estado.st_mtime_ns, estado.st_size)
+        for ruta, estado in ((ruta, os.stat(ruta)) for ruta in rutas)
+    )
+    guardada = _revisiones.get(directorio)
+    if guardada is not None and guardada[0] == firma:
+        return guardada[1]
+
+    huella = hashlib.sha256()
+    for ruta in rutas:
+        huella.update(os.path.relpath(ruta, directorio).encode())
+        with open(ruta, "rb") as archivo:
+            huella.update(hashlib.sha256(archivo.read()).digest())
+    revision = huella.hexdigest()[:16]
+    _revisiones[directorio] = (firma, revision)
+    return revision
+
+
+def encabezado_reporte(salida: str):
+    """
+    Color y título del reporte según el resultado de la cobertura.
+
+    >>> encabezado_reporte("FAIL Required test coverage of 60% not reached")[1]
+    '⚠️ FALLO: Cobertura menor al 60%'
+    >>> encabezado_reporte("Required test coverage of 60% reached. Total coverage: 95.00%")[1]
+    '✅ ÉXITO: Cobertura superior al 60%'
+    >>> encabezado_reporte("1 passed")
+    ('#4ec9b0', 'Reporte de Ejecución de Pruebas')
+    """
+    if "FAIL Required test coverage" in salida:
+        return "#ff5555", "⚠️ FALLO: Cobertura menor al 60%"      # Rojo si falla la cobertura
+    if "Required test coverage" in salida and "reached" in salida:
+        return "#50fa7b", "✅ ÉXITO: Cobertura superior al 60%"   # Verde si pasa
+    return "#4ec9b0", "Reporte de Ejecución de Pruebas"
+
+
+def _pagina(titulo: str, color: str, subtitulo: str, contenido: str, recargar: int = 0) -> str:
+    """Página HTML con el estilo del reporte (recargar: segundos, 0 = no recargar)"""
+    meta = f'<meta http-equiv="refresh" content="{recargar}">' if recargar else ""
+    return f"""
+    <html>
+        <head>
+            <title>Reporte de Pruebas</title>
+            {meta}
+            <style>
+                body {{ background-color: #1e1e1e; color: #d4d4d4; font-family: 'Consolas', 'Monaco', monospace; padding: 20px; }}
+                pre {{ white-space: pre-wrap; background-color: #2d2d2d; padding: 15px; border-radius: 5px; border: 1px solid #444; }}
+                h1 {{ color: {color}; border-bottom: 1px solid #444; padding-bottom: 10px; }}
+                .subtitle {{ color: #888; margin-bottom: 20px; font-size: 0.9em; }}
+            </style>
+        </head>
+        <body>
+            <h1>{titulo}</h1>
+            <div class="subtitle">{subtitulo}</div>
+            <pre>{contenido}</pre>
+        </body>
+    </html>
+    """
+
+
+def reporte_html(salida: str, revision: str, finalizado: str) -> str:
+    """Reporte de una ejecución terminada"""
+    color, titulo = encabezado_reporte(salida)
+    subtitulo = (f"Herramientas: Doctest, Unittest, Pytest, Coverage, Mockito"
+                 f" · revisión {revision} · {finalizado}")
+    return _pagina(titulo, color, subtitulo, html.escape(salida))
+
+
+def pagina_en_curso(estado: Dict) -> str:
+    """Página que se recarga sola mientras las pruebas se ejecutan"""
+    if estado["estado"] == "error":
+        return _pagina("⚠️ La ejecución de las pruebas falló", "#ff5555",
+                       f"revisión {estado['revision']} · se volvió a lanzar: recargue la página para ver el progreso",
+                       html.escape(estado["detalle"] or ""))
+    return _pagina("⏳ Ejecutando pruebas...", "#4ec9b0",
+                   f"revisión {estado['revision']} · iniciada {estado['iniciado']}",
+                   "La página se actualizará al terminar.", recargar=3)
+
+
+def _ahora() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class EjecucionPruebas:
+    """
+    Lanza pytest en segundo plano y guarda el reporte por revisión.
+
+    Estados de la última ejecución: "en_curso", "terminado" (reporte
+    disponible, pasen o no las pruebas) y "error" (tiempo agotado, pytest
+    no pudo lanzarse, el reporte no pudo guardarse o falló otra cosa en el
+    hilo; no hay reporte y el siguiente GET /ejecutar-pruebas o POST la
+    vuelve a lanzar).
+    """
+
+    def __init__(self, directorio: str = DIRECTORIO_PROYECTO,
+                 directorio_reportes: str = PRUEBAS_DIRECTORIO_REPORTES,
+                 tiempo_maximo: float = PRUEBAS_TIEMPO_MAXIMO):
+        """
+        Args:
+            directorio: Raíz del proyecto, donde se ejecuta pytest
+            directorio_reportes: Carpeta de los reportes HTML por revisión
+            tiempo_maximo: Segundos antes de cancelar pytest
+        """
+        self.directorio = directorio
+        self.directorio_reportes = directorio_reportes
+        self.tiempo_maximo = tiempo_maximo
+        self._lock = threading.Lock()
+        self._estado: Optional[Dict] = None
+
+    def _ruta_reporte(self, revision: str) -> str:
+        return os.path.join(self.directorio_reportes, f"{revision}.html")
+
+    def reporte(self, revision: str) -> Optional[str]:
+        """Reporte HTML guardado para la revisión, o None si aún no existe"""
+        try:
+            with open(self._ruta_reporte(revision), encoding="utf-8") as archivo:
+                return archivo.read()
+        except FileNotFoundError:
+            return None
+
+    def estado(self, revision: Optional[str] = None) -> Dict:
+        """
+        Estado de la ejecución para la revisión dada (la actual si se omite).
+
+        Returns:
+            Diccionario con estado, revision, iniciado, finalizado,
+            codigo_salida y detalle; estado "pendiente" si esta revisión no
+            tiene reporte ni se está ejecutando
+        """
+        revision = revision or revision_codigo(self.directorio)
+        with self._lock:
+            return self._estado_revision(revision)
+
+    def iniciar(self, forzar: bool = False, revision: Optional[str] = None) -> Dict:
+        """
+        Lanza las pruebas de la revisión actual si no hay reporte para ella.
+        Si ya hay una ejecución en curso (de esta revisión o de otra) no lanza
+        otra y devuelve su estado.
+
+        Args:
+            forzar: Ejecutar aunque ya exista el reporte de esta revisión
+            revision: Revisión actual si ya se calculó (si no, se calcula)
+
+        Returns:
+            Estado de la ejecución (ver estado())
+        """
+        revision = revision or revision_codigo(self.directorio)
+        with self._lock:
+            if self._estado is not None and self._estado["estado"] == "en_curso":
+                return dict(self._estado)
+            if not forzar and os.path.exists(self._ruta_reporte(revision)):
+                return self._estado_revision(revision)
+            self._estado = {"estado": "en_curso", "revision": revision, "iniciado": _ahora(),
+                            "finalizado": None, "codigo_salida": None, "detalle": None}
+            estado = dict(self._estado)
+        threading.Thread(target=self._ejecutar, args=(revision,),
+                         name="ejecucion-pruebas", daemon=True).start()
+        return estado
+
+    def _estado_revision(self, revision: str) -> Dict:
+        """Estado para la revisión (llamar con el lock tomado)"""
+        actual = self._estado
+        if actual is not None and (actual["revision"] == revision or actual["estado"] == "en_curso"):
+            return dict(actual)
+        estado = "terminado" if os.path.exists(self._ruta_reporte(revision)) else "pendiente"
+        return {"estado": estado, "revision": revision, "iniciado": None,
+                "finalizado": None, "codigo_salida": None, "detalle": None}
+
+    def _ejecutar(self, revision: str) -> None:
+        """Hilo de la ejecución: termina siempre con _terminar, aunque algo falle"""
+        try:
+            self._correr(revision)
+        except Exception as e:  # Sin esto el estado quedaría "en_curso" y iniciar no volvería a lanzar
+            self._terminar(estado="error", detalle=f"Error inesperado en la ejecución: {e!r}")
+
+    def _correr(self, revision: str) -> None:
+        entorno = dict(os.environ, PYTHONIOENCODING="utf-8")
+        comando = [sys.executable, "-m", "pytest", *ARGUMENTOS_PYTEST]
+        inicio = time.monotonic()
+        try:
+            proceso = subprocess.run(comando, cwd=self.directorio, env=entorno, stdin=subprocess.DEVNULL,
+                                     stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                     timeout=self.tiempo_maximo)
+        except subprocess.TimeoutExpired:
+            self._terminar(estado="error", detalle=f"Tiempo agotado: pytest superó {self.tiempo_maximo} s")
+            return
+        except OSError as e:
+            self._terminar(estado="error", detalle=f"No se pudo ejecutar pytest: {e}")
+            return
+
+        salida = proceso.stdout.decode("utf-8", errors="replace")
+        finalizado = _ahora()
+        try:
+            self._guardar_reporte(revision, reporte_html(salida, revision, finalizado))
+        except OSError as e:
+            self._terminar(estado="error", codigo_salida=proceso.returncode, finalizado=finalizado,
+                           detalle=f"No se pudo guardar el reporte en {self.directorio_reportes}: {e}")
+            return
+        self._terminar(estado="terminado", codigo_salida=proceso.returncode, finalizado=finalizado,
+                       detalle=f"{time.monotonic() - inicio:.1f} s")
+
+    def _guardar_reporte(self, revision: str, contenido: str) -> None:
+        """Escribe el reporte de forma atómica (otro worker puede estar leyéndolo)"""
+        os.makedirs(self.directorio_reportes, exist_ok=True)
+        ruta = self._ruta_reporte(revision)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)
+
+    def _terminar(self, estado: str, detalle: str, codigo_salida: Optional[int] = None,
+                  finalizado: Optional[str] = None) -> None:
+        with self._lock:
+            self._estado.update(estado=estado, detalle=detalle, codigo_salida=codigo_salida,
+                                finalizado=finalizado or _ahora())
+
+
+# Ejecución compartida por las rutas de este proceso
+EJECUCION_PRUEBAS = EjecucionPruebas()
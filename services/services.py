@@ -2,15 +2,158 @@
 Servicios con lógica de negocio
 Los servicios utilizan repositorios y contienen validaciones
 """
-from typing import Optional, List
+from collections import defaultdict
+from functools import partial, wraps
+from typing import BinaryIO, Callable, Optional, List, Dict, Sequence
 from datetime import date
+from sqlalchemy import Date, Float, Integer, Enum as EnumSQL
 from sqlalchemy.orm import Session
 from repositories.repositories import (
     RepresentanteRepository, EstudianteRepository, DocenteRepository,
     CursoRepository, AsignaturaRepository, MatriculaRepository,
     AsistenciaRepository, CalificacionRepository
 )
+from repositories.archivo import ArchivoRepository, rango_anio_lectivo
+from repositories.busqueda import BusquedaRepository, FUENTES
+from repositories.cache import invalidar_cache, notificar_al_confirmar
+from repositories.importacion import ColumnaCSV, ImportacionCSV, como_decimal, como_entero, como_enum, como_fecha
 from models import EstadoMatricula, EstadoAsistencia
+from config.settings import ARCHIVO_TAMANO_LOTE
+
+
+class ErrorValidacionLote(ValueError):
+    """
+    Error de validación de un lote.
+    Conserva los mensajes de cada registro rechazado para devolverlos juntos.
+    """
+
+    def __init__(self, errores: Dict[int, List[str]]):
+        self.errores = [
+            {"registro": indice, "errores": mensajes}
+            for indice, mensajes in sorted(errores.items()) if mensajes
+        ]
+        super().__init__(f"{len(self.errores)} registro(s) con errores de validación")
+
+
+def _comprobar_referencias(registros: List[dict], referencias: dict) -> Dict[int, List[str]]:
+    """
+    Comprueba las claves foráneas de un lote con una consulta IN (...) por tabla.
+    
+    Args:
+        registros: Registros del lote
+        referencias: {campo: (repositorio, entidad)} con las claves a comprobar
+        
+    Returns:
+        Mensajes de error por posición de registro
+    """
+    errores = defaultdict(list)
+    for campo, (repo, entidad) in referencias.items():
+        existentes = repo.existing_ids({r.get(campo) for r in registros if r.get(campo)})
+        for indice, registro in enumerate(registros):
+            valor = registro.get(campo)
+            if valor and valor not in existentes:
+                errores[indice].append(f"{entidad} con ID {valor} no existe")
+    return errores
+
+
+def _comprobar_unicos(registros: List[dict], clave, existentes: set, mensaje: str,
+                      errores: Dict[int, List[str]]) -> None:
+    """
+    Marca los registros cuya clave ya existe en la BD o se repite dentro del lote.
+    `mensaje` puede incluir {} para mostrar el valor repetido.
+    """
+    vistos = set()
+    for indice, registro in enumerate(registros):
+        valor = clave(registro)
+        if valor in existentes or valor in vistos:
+            errores[indice].append(mensaje.format(valor))
+        vistos.add(valor)
+
+
+def _validar_lote(registros: List[dict], validar, errores: Dict[int, List[str]] = None) -> List[dict]:
+    """
+    Aplica la validación de un registro a cada elemento de un lote.
+    
+    Args:
+        registros: Registros del lote
+        validar: Función que valida un registro y devuelve sus datos normalizados
+        errores: Errores ya detectados por las comprobaciones en bloque
+        
+    Returns:
+        Datos normalizados de todos los registros
+        
+    Raises:
+        ErrorValidacionLote: Si algún registro no es válido
+    """
+    errores = errores if errores is not None else defaultdict(list)
+    datos = []
+    for indice, registro in enumerate(registros):
+        try:
+            datos.append(validar(**registro))
+        except ValueError as e:
+            errores[indice].append(str(e))
+    if any(errores.values()):
+        raise ErrorValidacionLote(errores)
+    return datos
+
+
+def _importar_csv(repo, importacion: ImportacionCSV, archivo: BinaryIO) -> int:
+    """
+    Importa un CSV con el repositorio y convierte los errores de validación
+    de las filas en ErrorValidacionLote.
+    
+    Returns:
+        Número de registros importados
+    """
+    importados, errores = repo.importar(importacion, archivo)
+    if errores:
+        raise ErrorValidacionLote(errores)
+    return importados
+
+
+def _eliminar_lote(repo, ids: List[int], mensaje: str) -> int:
+    """
+    Elimina los registros con un solo DELETE. Si alguno no existe no se
+    elimina ninguno y se informa cada ID faltante por su posición.
+    
+    Args:
+        repo: Repositorio de la entidad
+        ids: IDs a eliminar
+        mensaje: Error de un ID inexistente, con {} en lugar del ID
+        
+    Returns:
+        Número de registros eliminados
+        
+    Raises:
+        ErrorValidacionLote: Si algún ID no existe
+    """
+    faltantes = repo.delete_many(ids)
+    if faltantes:
+        raise ErrorValidacionLote({
+            indice: [mensaje.format(id)] for indice, id in enumerate(ids) if id in faltantes
+        })
+    return len(set(ids))
+
+
+def _invalida(*tablas: str):
+    """
+    Decorador para los métodos que escriben en tablas de catálogo: al
+    terminar (después de su commit) descarta esas tablas, incluidas las que
+    se borran en cascada, de la caché de lectura. Se invalida también si el
+    método falla, por si llegó a escribir. El commit emite además un NOTIFY
+    para que los demás workers descarten su copia.
+    """
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            dejar_de_notificar = notificar_al_confirmar(self.db, tablas)
+            try:
+                return metodo(self, *args, **kwargs)
+            finally:
+                dejar_de_notificar()
+                invalidar_cache(*tablas)
+        return envoltura
+    return decorador
 
 
 class RepresentanteService:
@@ -20,6 +163,7 @@ class RepresentanteService:
         self.repo = RepresentanteRepository(db)
         self.db = db
 
+    @_invalida("representantes")
     def crear_representante(self, nombre: str, telefono: str):
         """
         Crea un nuevo representante.
@@ -28,15 +172,24 @@ class RepresentanteService:
         - Nombre no vacío
         - Teléfono no vacío
         """
+        return self.repo.create(self._validar_representante(nombre, telefono))
+
+    @_invalida("representantes")
+    def crear_representantes_lote(self, registros: List[dict]):
+        """Crea varios representantes en una sola transacción"""
+        return self.repo.create_many(_validar_lote(registros, self._validar_representante))
+
+    def _validar_representante(self, nombre: str, telefono: str) -> dict:
+        """Valida los datos de un representante y los devuelve normalizados"""
         if not nombre or not nombre.strip():
             raise ValueError("El nombre no puede estar vacío")
         if not telefono or not telefono.strip():
             raise ValueError("El teléfono no puede estar vacío")
         
-        return self.repo.create({
+        return {
             "nombre": nombre.strip(),
             "telefono": telefono.strip()
-        })
+        }
 
     def obtener_representante(self, id: int):
         """Obtiene un representante por ID"""
@@ -45,15 +198,22 @@ class RepresentanteService:
             raise ValueError(f"Representante con ID {id} no encontrado")
         return rep
 
-    def listar_representantes(self, skip: int = 0, limit: int = 100):
+    def listar_representantes(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
         """Lista todos los representantes"""
-        return self.repo.read_all(skip, limit)
+        return self.repo.read_all(skip, limit, after_id)
+
+    def listar_filas(self, columnas: Sequence[str], skip: int = 0, limit: int = 100,
+                     after_id: Optional[int] = None):
+        """Lista solo las columnas indicadas, como filas (ruta rápida de los listados)"""
+        return self.repo.read_filas(columnas, skip, limit, after_id)
+
+    def total(self, exacto: bool = False):
+        """Total de representantes (estimado si la tabla es grande, salvo exacto=True)"""
+        return self.repo.total(exacto)
 
+    @_invalida("representantes")
     def actualizar_representante(self, id: int, nombre: str = None, telefono: str = None):
         """Actualiza un representante"""
-        if not self.repo.read(id):
-            raise ValueError(f"Representante con ID {id} no encontrado")
-        
         datos = {}
         if nombre:
             datos["nombre"] = nombre.strip()
@@ -63,8 +223,12 @@ class RepresentanteService:
         if not datos:
             raise ValueError("Debe proporcionar al menos un campo para actualizar")
         
-        return self.repo.update(id, datos)
+        actualizado = self.repo.update(id, datos)
+        if actualizado is None:
+            raise ValueError(f"Representante con ID {id} no encontrado")
+        return actualizado
 
+    @_invalida("representantes")
     def eliminar_representante(self, id: int):
         """Elimina un representante"""
         if not self.repo.delete(id):
@@ -91,13 +255,54 @@ class EstudianteService:
         - Representante existe (si se proporciona)
         - Edad mínima (debe ser > 5 años)
         """
-        if self.repo.get_by_cedula(cedula):
+        return self.repo.create(self._validar_estudiante(
+            nombre, apellido, cedula, fecha_nacimiento, correo, representante_id
+        ))
+
+    def crear_estudiantes_lote(self, registros: List[dict]):
+        """
+        Crea varios estudiantes en una sola transacción.
+        Las cédulas y representantes se comprueban en bloque.
+        """
+        errores = _comprobar_referencias(registros, {
+            "representante_id": (self.rep_repo, "Representante"),
+        })
+        cedulas = self.repo.get_cedulas_existentes({r.get("cedula") for r in registros})
+        _comprobar_unicos(registros, lambda r: r.get("cedula"), cedulas,
+                          "Ya existe un estudiante con cédula {}", errores)
+        validar = partial(self._validar_estudiante, consultar_bd=False)
+        return self.repo.create_many(_validar_lote(registros, validar, errores))
+
+    def guardar_estudiantes_lote(self, registros: List[dict]):
+        """
+        Crea o actualiza varios estudiantes identificándolos por cédula.
+        Los estudiantes existentes se actualizan en lugar de rechazarse; una
+        cédula repetida dentro del lote es un error de ese registro.
+        """
+        errores = _comprobar_referencias(registros, {
+            "representante_id": (self.rep_repo, "Representante"),
+        })
+        _comprobar_unicos(registros, lambda r: r.get("cedula"), set(),
+                          "La cédula {} se repite en el lote", errores)
+        validar = partial(self._validar_estudiante, consultar_bd=False)
+        datos = _validar_lote(registros, validar, errores)
+        return self.repo.upsert_many(datos, conflict_columns=["cedula"])
+
+    def _validar_estudiante(self, nombre: str, apellido: str, cedula: str,
+                            fecha_nacimiento: date, correo: str = None,
+                            representante_id: int = None, consultar_bd: bool = True) -> dict:
+        """
+        Valida los datos de un estudiante y los devuelve normalizados.
+        Con consultar_bd=False omite las comprobaciones contra la BD
+        (los lotes las hacen en bloque).
+        """
+        if consultar_bd and self.repo.get_by_cedula(cedula):
             raise ValueError(f"Ya existe un estudiante con cédula {cedula}")
         
         if not cedula or len(cedula) > 20:
             raise ValueError("Cédula inválida (máx 20 caracteres)")
         
-        if representante_id:
+        if representante_id and consultar_bd:
             if not self.rep_repo.read(representante_id):
                 raise ValueError(f"Representante con ID {representante_id} no existe")
         
@@ -106,18 +311,18 @@ class EstudianteService:
         if edad < 5:
             raise ValueError("El estudiante debe tener al menos 5 años de edad")
         
-        return self.repo.create({
+        return {
             "nombre": nombre.strip(),
             "apellido": apellido.strip(),
             "cedula": cedula,
             "fecha_nacimiento": fecha_nacimiento,
             "correo": correo,
             "representante_id": representante_id
-        })
+        }
 
-    def obtener_estudiante(self, id: int):
+    def obtener_estudiante(self, id: int, include: Sequence[str] = ()):
         """Obtiene un estudiante por ID"""
-        est = self.repo.read(id)
+        est = self.repo.read(id, include)
         if not est:
             raise ValueError(f"Estudiante con ID {id} no encontrado")
         return est
@@ -129,29 +334,47 @@ class EstudianteService:
             raise ValueError(f"Estudiante con cédula {cedula} no encontrado")
         return est
 
-    def listar_estudiantes(self, skip: int = 0, limit: int = 100):
+    def listar_estudiantes(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None,
+                           include: Sequence[str] = ()):
         """Lista todos los estudiantes"""
-        return self.repo.read_all(skip, limit)
+        return self.repo.read_all(skip, limit, after_id, include)
+
+    def listar_filas(self, columnas: Sequence[str], skip: int = 0, limit: int = 100,
+                     after_id: Optional[int] = None):
+        """Lista solo las columnas indicadas, como filas (ruta rápida de los listados)"""
+        return self.repo.read_filas(columnas, skip, limit, after_id)
+
+    def total(self, exacto: bool = False):
+        """Total de estudiantes (estimado si la tabla es grande, salvo exacto=True)"""
+        return self.repo.total(exacto)
+
+    def version(self):
+        """Versión de la tabla estudiantes (validador de las rutas GET)"""
+        return self.repo.version()
 
     def actualizar_estudiante(self, id: int, **kwargs):
         """Actualiza un estudiante"""
-        if not self.repo.read(id):
-            raise ValueError(f"Estudiante con ID {id} no encontrado")
-        
         # Si cambia cédula, validar que no exista
         if "cedula" in kwargs:
             existente = self.repo.get_by_cedula(kwargs["cedula"])
             if existente and existente.id != id:
                 raise ValueError(f"Ya existe un estudiante con cédula {kwargs['cedula']}")
         
-        return self.repo.update(id, kwargs)
+        actualizado = self.repo.update(id, kwargs)
+        if actualizado is None:
+            raise ValueError(f"Estudiante con ID {id} no encontrado")
+        return actualizado
 
     def eliminar_estudiante(self, id: int):
-        """Elimina un estudiante"""
+        """Elimina un estudiante (sus matrículas, calificaciones y asistencias las borra la BD)"""
         if not self.repo.delete(id):
             raise ValueError(f"Estudiante con ID {id} no encontrado")
         return True
 
+    def eliminar_estudiantes_lote(self, ids: List[int]) -> int:
+        """Elimina varios estudiantes con una sola sentencia; si falta alguno no elimina ninguno"""
+        return _eliminar_lote(self.repo, ids, "Estudiante con ID {} no encontrado")
+
 
 class DocenteService:
     """Servicio para Docentes con lógica de negocio"""
@@ -160,6 +383,7 @@ class DocenteService:
         self.repo = DocenteRepository(db)
         self.db = db
 
+    @_invalida("docentes")
     def crear_docente(self, nombre: str, apellido: str, correo: str, titulo: str = None):
         """
         Crea un nuevo docente.
@@ -168,42 +392,89 @@ class DocenteService:
         - Correo único
         - Correo formato válido
         """
-        if self.repo.get_by_correo(correo):
+        return self.repo.create(self._validar_docente(nombre, apellido, correo, titulo))
+
+    @_invalida("docentes")
+    def crear_docentes_lote(self, registros: List[dict]):
+        """
+        Crea varios docentes en una sola transacción.
+        Los correos se comprueban en bloque.
+        """
+        errores = defaultdict(list)
+        correo = lambda r: (r.get("correo") or "").lower()
+        existentes = self.repo.get_correos_existentes({correo(r) for r in registros})
+        _comprobar_unicos(registros, correo, existentes,
+                          "Ya existe un docente con correo {}", errores)
+        validar = partial(self._validar_docente, consultar_bd=False)
+        return self.repo.create_many(_validar_lote(registros, validar, errores))
+
+    @_invalida("docentes")
+    def guardar_docentes_lote(self, registros: List[dict]):
+        """
+        Crea o actualiza varios docentes identificándolos por correo.
+        Los docentes existentes se actualizan en lugar de rechazarse; un
+        correo repetido dentro del lote es un error de ese registro.
+        """
+        errores = defaultdict(list)
+        _comprobar_unicos(registros, lambda r: (r.get("correo") or "").lower(), set(),
+                          "El correo {} se repite en el lote", errores)
+        validar = partial(self._validar_docente, consultar_bd=False)
+        return self.repo.upsert_many(_validar_lote(registros, validar, errores), conflict_columns=["correo"])
+
+    def _validar_docente(self, nombre: str, apellido: str, correo: str,
+                         titulo: str = None, consultar_bd: bool = True) -> dict:
+        """
+        Valida los datos de un docente y los devuelve normalizados.
+        Con consultar_bd=False omite la comprobación de correo único.
+        """
+        if consultar_bd and self.repo.get_by_correo(correo):
             raise ValueError(f"Ya existe un docente con correo {correo}")
         
         if not self._validar_correo(correo):
             raise ValueError("Correo inválido")
         
-        return self.repo.create({
+        return {
             "nombre": nombre.strip(),
             "apellido": apellido.strip(),
             "correo": correo.lower(),
             "titulo": titulo
-        })
+        }
 
-    def obtener_docente(self, id: int):
+    def obtener_docente(self, id: int, include: Sequence[str] = ()):
         """Obtiene un docente por ID"""
-        doc = self.repo.read(id)
+        doc = self.repo.read(id, include)
         if not doc:
             raise ValueError(f"Docente con ID {id} no encontrado")
         return doc
 
-    def listar_docentes(self, skip: int = 0, limit: int = 100):
+    def listar_docentes(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None,
+                        include: Sequence[str] = ()):
         """Lista todos los docentes"""
-        return self.repo.read_all(skip, limit)
+        return self.repo.read_all(skip, limit, after_id, include)
+
+    def listar_filas(self, columnas: Sequence[str], skip: int = 0, limit: int = 100,
+                     after_id: Optional[int] = None):
+        """Lista solo las columnas indicadas, como filas (ruta rápida de los listados)"""
+        return self.repo.read_filas(columnas, skip, limit, after_id)
 
+    def total(self, exacto: bool = False):
+        """Total de docentes (estimado si la tabla es grande, salvo exacto=True)"""
+        return self.repo.total(exacto)
+
+    @_invalida("docentes")
     def actualizar_docente(self, id: int, **kwargs):
         """Actualiza un docente"""
-        if not self.repo.read(id):
-            raise ValueError(f"Docente con ID {id} no encontrado")
-        
         if "correo" in kwargs:
             existente = self.repo.get_by_correo(kwargs["correo"])
             if existente and existente.id != id:
                 raise ValueError(f"Ya existe un docente con correo {kwargs['correo']}")
         
-        return self.repo.update(id, kwargs)
+        actualizado = self.repo.update(id, kwargs)
+        if actualizado is None:
+            raise ValueError(f"Docente con ID {id} no encontrado")
+        return actualizado
 
+    @_invalida("docentes", "asignaturas")
     def eliminar_docente(self, id: int):
         """Elimina un docente"""
         if not self.repo.delete(id):
@@ -223,30 +494,58 @@ class CursoService:
         self.repo = CursoRepository(db)
         self.db = db
 
+    @_invalida("cursos")
     def crear_curso(self, nombre: str, nivel: str):
         """Crea un nuevo curso"""
-        return self.repo.create({
+        return self.repo.create(self._validar_curso(nombre, nivel))
+
+    @_invalida("cursos")
+    def crear_cursos_lote(self, registros: List[dict]):
+        """Crea varios cursos en una sola transacción"""
+        return self.repo.create_many(_validar_lote(registros, self._validar_curso))
+
+    @staticmethod
+    def _validar_curso(nombre: str, nivel: str) -> dict:
+        """Normaliza los datos de un curso"""
+        return {
             "nombre": nombre.strip(),
             "nivel": nivel.strip()
-        })
+        }
 
-    def obtener_curso(self, id: int):
+    def obtener_curso(self, id: int, include: Sequence[str] = ()):
         """Obtiene un curso por ID"""
-        curso = self.repo.read(id)
+        curso = self.repo.read(id, include)
         if not curso:
             raise ValueError(f"Curso con ID {id} no encontrado")
         return curso
 
-    def listar_cursos(self, skip: int = 0, limit: int = 100):
+    def listar_cursos(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None,
+                      include: Sequence[str] = ()):
         """Lista todos los cursos"""
-        return self.repo.read_all(skip, limit)
+        return self.repo.read_all(skip, limit, after_id, include)
+
+    def listar_filas(self, columnas: Sequence[str], skip: int = 0, limit: int = 100,
+                     after_id: Optional[int] = None):
+        """Lista solo las columnas indicadas, como filas (ruta rápida de los listados)"""
+        return self.repo.read_filas(columnas, skip, limit, after_id)
+
+    def total(self, exacto: bool = False):
+        """Total de cursos (estimado si la tabla es grande, salvo exacto=True)"""
+        return self.repo.total(exacto)
+
+    def version(self):
+        """Versión de la tabla cursos (validador de las rutas GET)"""
+        return self.repo.version()
 
+    @_invalida("cursos")
     def actualizar_curso(self, id: int, **kwargs):
         """Actualiza un curso"""
-        if not self.repo.read(id):
+        actualizado = self.repo.update(id, kwargs)
+        if actualizado is None:
             raise ValueError(f"Curso con ID {id} no encontrado")
-        return self.repo.update(id, kwargs)
+        return actualizado
 
+    @_invalida("cursos", "asignaturas")
     def eliminar_curso(self, id: int):
         """Elimina un curso"""
         if not self.repo.delete(id):
@@ -263,6 +562,7 @@ class AsignaturaService:
         self.docente_repo = DocenteRepository(db)
         self.db = db
 
+    @_invalida("asignaturas")
     def crear_asignatura(self, nombre: str, curso_id: int, descripcion: str = None, docente_id: int = None):
         """
         Crea una nueva asignatura.
@@ -271,40 +571,79 @@ class AsignaturaService:
         - Curso existe
         - Docente existe (si se proporciona)
         """
-        if not self.curso_repo.read(curso_id):
-            raise ValueError(f"Curso con ID {curso_id} no existe")
-        
-        if docente_id and not self.docente_repo.read(docente_id):
-            raise ValueError(f"Docente con ID {docente_id} no existe")
+        return self.repo.create(self._validar_asignatura(nombre, curso_id, descripcion, docente_id))
+
+    @_invalida("asignaturas")
+    def crear_asignaturas_lote(self, registros: List[dict]):
+        """
+        Crea varias asignaturas en una sola transacción.
+        Cursos y docentes se comprueban en bloque.
+        """
+        errores = _comprobar_referencias(registros, {
+            "curso_id": (self.curso_repo, "Curso"),
+            "docente_id": (self.docente_repo, "Docente"),
+        })
+        validar = partial(self._validar_asignatura, consultar_bd=False)
+        return self.repo.create_many(_validar_lote(registros, validar, errores))
+
+    def _validar_asignatura(self, nombre: str, curso_id: int, descripcion: str = None,
+                            docente_id: int = None, consultar_bd: bool = True) -> dict:
+        """
+        Valida los datos de una asignatura y los devuelve normalizados.
+        Con consultar_bd=False omite la comprobación de curso y docente.
+        """
+        if consultar_bd:
+            if not self.curso_repo.read(curso_id):
+                raise ValueError(f"Curso con ID {curso_id} no existe")
+            
+            if docente_id and not self.docente_repo.read(docente_id):
+                raise ValueError(f"Docente con ID {docente_id} no existe")
         
-        return self.repo.create({
+        return {
             "nombre": nombre.strip(),
             "descripcion": descripcion,
             "curso_id": curso_id,
             "docente_id": docente_id
-        })
+        }
 
-    def obtener_asignatura(self, id: int):
+    def obtener_asignatura(self, id: int, include: Sequence[str] = ()):
         """Obtiene una asignatura por ID"""
-        asig = self.repo.read(id)
+        asig = self.repo.read(id, include)
         if not asig:
             raise ValueError(f"Asignatura con ID {id} no encontrada")
         return asig
 
-    def listar_asignaturas(self, skip: int = 0, limit: int = 100):
+    def listar_asignaturas(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None,
+                           include: Sequence[str] = ()):
         """Lista todas las asignaturas"""
-        return self.repo.read_all(skip, limit)
+        return self.repo.read_all(skip, limit, after_id, include)
+
+    def listar_filas(self, columnas: Sequence[str], skip: int = 0, limit: int = 100,
+                     after_id: Optional[int] = None):
+        """Lista solo las columnas indicadas, como filas (ruta rápida de los listados)"""
+        return self.repo.read_filas(columnas, skip, limit, after_id)
+
+    def total(self, exacto: bool = False):
+        """Total de asignaturas (estimado si la tabla es grande, salvo exacto=True)"""
+        return self.repo.total(exacto)
+
+    def version(self):
+        """Versión de la tabla asignaturas (validador de las rutas GET)"""
+        return self.repo.version()
 
     def obtener_por_curso(self, curso_id: int):
         """Obtiene asignaturas de un curso"""
         return self.repo.get_by_curso(curso_id)
 
+    @_invalida("asignaturas")
     def actualizar_asignatura(self, id: int, **kwargs):
         """Actualiza una asignatura"""
-        if not self.repo.read(id):
+        actualizado = self.repo.update(id, kwargs)
+        if actualizado is None:
             raise ValueError(f"Asignatura con ID {id} no encontrada")
-        return self.repo.update(id, kwargs)
+        return actualizado
 
+    @_invalida("asignaturas")
     def eliminar_asignatura(self, id: int):
         """Elimina una asignatura"""
         if not self.repo.delete(id):
@@ -319,6 +658,7 @@ class MatriculaService:
         self.repo = MatriculaRepository(db)
         self.est_repo = EstudianteRepository(db)
         self.curso_repo = CursoRepository(db)
+        self.archivo = ArchivoRepository(db)
         self.db = db
 
     def crear_matricula(self, estudiante_id: int, curso_id: int, fecha: date = None, estado: str = None):
@@ -330,39 +670,86 @@ class MatriculaService:
         - Curso existe
         - Estudiante no está duplicado en el curso
         """
-        if not self.est_repo.read(estudiante_id):
-            raise ValueError(f"Estudiante con ID {estudiante_id} no existe")
-        
-        if not self.curso_repo.read(curso_id):
-            raise ValueError(f"Curso con ID {curso_id} no existe")
-        
-        # Validar no duplicar matricula
-        duplicada = self.repo.get_estudiante_en_curso(estudiante_id, curso_id)
-        if duplicada:
-            raise ValueError(f"Estudiante ya está matriculado en este curso")
+        return self.repo.create(self._validar_matricula(estudiante_id, curso_id, fecha, estado))
+
+    def crear_matriculas_lote(self, registros: List[dict]):
+        """
+        Crea varias matrículas en una sola transacción.
+        Estudiantes, cursos y matrículas duplicadas (en la BD o dentro
+        del mismo lote) se comprueban en bloque.
+        """
+        errores = _comprobar_referencias(registros, {
+            "estudiante_id": (self.est_repo, "Estudiante"),
+            "curso_id": (self.curso_repo, "Curso"),
+        })
+        par = lambda r: (r.get("estudiante_id"), r.get("curso_id"))
+        existentes = self.repo.get_pares_existentes({par(r) for r in registros})
+        _comprobar_unicos(registros, par, existentes,
+                          "Estudiante ya está matriculado en este curso", errores)
+        validar = partial(self._validar_matricula, consultar_bd=False)
+        return self.repo.create_many(_validar_lote(registros, validar, errores))
+
+    def _validar_matricula(self, estudiante_id: int, curso_id: int, fecha: date = None,
+                           estado: str = None, consultar_bd: bool = True) -> dict:
+        """
+        Valida los datos de una matrícula y completa los valores por defecto.
+        Con consultar_bd=False omite las comprobaciones contra la BD.
+        """
+        if consultar_bd:
+            if not self.est_repo.read(estudiante_id):
+                raise ValueError(f"Estudiante con ID {estudiante_id} no existe")
+            
+            if not self.curso_repo.read(curso_id):
+                raise ValueError(f"Curso con ID {curso_id} no existe")
+            
+            # Validar no duplicar matricula
+            duplicada = self.repo.get_estudiante_en_curso(estudiante_id, curso_id)
+            if duplicada:
+                raise ValueError(f"Estudiante ya está matriculado en este curso")
         
-        return self.repo.create({
+        return {
             "estudiante_id": estudiante_id,
             "curso_id": curso_id,
             "fecha": fecha or date.today(),
             "estado": estado or EstadoMatricula.REGISTRADO
-        })
+        }
 
-    def obtener_matricula(self, id: int):
-        """Obtiene una matrícula por ID"""
-        mat = self.repo.read(id)
+    def obtener_matricula(self, id: int, include: Sequence[str] = ()):
+        """Obtiene una matrícula por ID (también las de años lectivos archivados)"""
+        mat = self.repo.read(id, include) or self.archivo.read_matricula(id, include)
         if not mat:
             raise ValueError(f"Matrícula con ID {id} no encontrada")
         return mat
 
-    def listar_matriculas(self, skip: int = 0, limit: int = 100):
+    def listar_matriculas(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None,
+                          include: Sequence[str] = ()):
         """Lista todas las matrículas"""
-        return self.repo.read_all(skip, limit)
+        return self.repo.read_all(skip, limit, after_id, include)
+
+    def listar_filas(self, columnas: Sequence[str], skip: int = 0, limit: int = 100,
+                     after_id: Optional[int] = None):
+        """Lista solo las columnas indicadas, como filas (ruta rápida de los listados)"""
+        return self.repo.read_filas(columnas, skip, limit, after_id)
+
+    def total(self, exacto: bool = False):
+        """Total de matrículas (estimado si la tabla es grande, salvo exacto=True)"""
+        return self.repo.total(exacto)
 
     def obtener_por_estudiante(self, estudiante_id: int):
         """Obtiene matrículas de un estudiante"""
         return self.repo.get_by_estudiante(estudiante_id)
 
+    def obtener_historial(self, estudiante_id: int, include: Sequence[str] = ()):
+        """
+        Historial de un estudiante: sus matrículas en uso y las de años
+        lectivos archivados, de la más antigua a la más reciente.
+        """
+        if not self.est_repo.read(estudiante_id):
+            raise ValueError(f"Estudiante con ID {estudiante_id} no existe")
+        mats = self.archivo.get_matriculas_estudiante(estudiante_id, include)
+        mats += self.repo.get_by_estudiante(estudiante_id, include)
+        return sorted(mats, key=lambda mat: (mat.fecha, mat.id))
+
     def cambiar_estado(self, matricula_id: int, nuevo_estado: str):
         """Cambia el estado de una matrícula con validación"""
         if nuevo_estado not in [e.value for e in EstadoMatricula]:
@@ -372,9 +759,10 @@ class MatriculaService:
 
     def actualizar_matricula(self, id: int, **kwargs):
         """Actualiza una matrícula"""
-        if not self.repo.read(id):
+        actualizado = self.repo.update(id, kwargs)
+        if actualizado is None:
             raise ValueError(f"Matrícula con ID {id} no encontrada")
-        return self.repo.update(id, kwargs)
+        return actualizado
 
     def eliminar_matricula(self, id: int):
         """Elimina una matrícula"""
@@ -382,14 +770,32 @@ class MatriculaService:
             raise ValueError(f"Matrícula con ID {id} no encontrada")
         return True
 
+    def eliminar_matriculas_lote(self, ids: List[int]) -> int:
+        """Elimina varias matrículas con una sola sentencia; si falta alguna no elimina ninguna"""
+        return _eliminar_lote(self.repo, ids, "Matrícula con ID {} no encontrada")
+
+    def retirar_matriculas(self, matricula_ids: List[int] = (), estudiante_ids: List[int] = ()):
+        """
+        Retira en bloque las matrículas indicadas y las de los estudiantes
+        indicados (un solo UPDATE). Las ya retiradas o graduadas no cambian.
+        """
+        if not matricula_ids and not estudiante_ids:
+            raise ValueError("Debe indicar matrículas o estudiantes a retirar")
+        return self.repo.retirar(matricula_ids, estudiante_ids)
+
 
 class CalificacionService:
-    """Servicio para Calificaciones con validaciones"""
+    """
+    Servicio para Calificaciones con validaciones
+    Crear, actualizar y eliminar mantienen resumen_calificaciones al día
+    (ver CalificacionRepository), del que se leen promedios y rankings.
+    """
     
     def __init__(self, db: Session):
         self.repo = CalificacionRepository(db)
         self.mat_repo = MatriculaRepository(db)
         self.asig_repo = AsignaturaRepository(db)
+        self.archivo = ArchivoRepository(db)
         self.db = db
 
     def crear_calificacion(self, nota: float, quimestre: int, matricula_id: int, asignatura_id: int):
@@ -402,55 +808,201 @@ class CalificacionService:
         - Matrícula existe
         - Asignatura existe
         """
+        return self.repo.create(self._validar_calificacion(nota, quimestre, matricula_id, asignatura_id))
+
+    def crear_calificaciones_lote(self, registros: List[dict]):
+        """
+        Crea varias calificaciones en una sola transacción.
+        Matrículas y asignaturas se comprueban en bloque.
+        """
+        errores = _comprobar_referencias(registros, {
+            "matricula_id": (self.mat_repo, "Matrícula"),
+            "asignatura_id": (self.asig_repo, "Asignatura"),
+        })
+        validar = partial(self._validar_calificacion, consultar_bd=False)
+        return self.repo.create_many(_validar_lote(registros, validar, errores))
+
+    def importar_calificaciones_csv(self, archivo: BinaryIO) -> int:
+        """
+        Importa calificaciones desde un CSV (nota, quimestre, matricula_id,
+        asignatura_id) con COPY. Las mismas validaciones que crear_calificacion
+        se aplican a todas las filas en SQL; si alguna falla no se importa nada.
+        """
+        return _importar_csv(self.repo, ImportacionCSV(
+            self.db, "calificaciones",
+            columnas={
+                "nota": ColumnaCSV(como_decimal, Float),
+                "quimestre": ColumnaCSV(como_entero, Integer),
+                "matricula_id": ColumnaCSV(como_entero, Integer),
+                "asignatura_id": ColumnaCSV(como_entero, Integer),
+            },
+            referencias={
+                "matricula_id": ("matriculas", "Matrícula"),
+                "asignatura_id": ("asignaturas", "Asignatura"),
+            },
+            reglas=[
+                ("t.nota NOT BETWEEN 0 AND 10", "La nota debe estar entre 0 y 10"),
+                ("t.quimestre NOT BETWEEN 1 AND 3", "El quimestre debe estar entre 1 y 3"),
+            ],
+        ), archivo)
+
+    def _validar_calificacion(self, nota: float, quimestre: int, matricula_id: int,
+                              asignatura_id: int, consultar_bd: bool = True) -> dict:
+        """
+        Valida los datos de una calificación.
+        Con consultar_bd=False omite la comprobación de matrícula y asignatura.
+        """
         if not (0 <= nota <= 10):
             raise ValueError("La nota debe estar entre 0 y 10")
         
         if not (1 <= quimestre <= 3):
             raise ValueError("El quimestre debe estar entre 1 y 3")
         
-        if not self.mat_repo.read(matricula_id):
-            raise ValueError(f"Matrícula con ID {matricula_id} no existe")
-        
-        if not self.asig_repo.read(asignatura_id):
-            raise ValueError(f"Asignatura con ID {asignatura_id} no existe")
+        if consultar_bd:
+            if not self.mat_repo.read(matricula_id):
+                raise ValueError(f"Matrícula con ID {matricula_id} no existe")
+            
+            if not self.asig_repo.read(asignatura_id):
+                raise ValueError(f"Asignatura con ID {asignatura_id} no existe")
         
-        return self.repo.create({
+        return {
             "nota": nota,
             "quimestre": quimestre,
             "matricula_id": matricula_id,
             "asignatura_id": asignatura_id
-        })
+        }
 
-    def obtener_calificacion(self, id: int):
+    def obtener_calificacion(self, id: int, include: Sequence[str] = ()):
         """Obtiene una calificación por ID"""
-        cal = self.repo.read(id)
+        cal = self.repo.read(id, include)
         if not cal:
             raise ValueError(f"Calificación con ID {id} no encontrada")
         return cal
 
-    def listar_calificaciones(self, skip: int = 0, limit: int = 100):
+    def listar_calificaciones(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None,
+                              include: Sequence[str] = ()):
         """Lista todas las calificaciones"""
-        return self.repo.read_all(skip, limit)
+        return self.repo.read_all(skip, limit, after_id, include)
+
+    def listar_filas(self, columnas: Sequence[str], skip: int = 0, limit: int = 100,
+                     after_id: Optional[int] = None):
+        """Lista solo las columnas indicadas, como filas (ruta rápida de los listados)"""
+        return self.repo.read_filas(columnas, skip, limit, after_id)
+
+    def total(self, exacto: bool = False):
+        """Total de calificaciones (estimado si la tabla es grande, salvo exacto=True)"""
+        return self.repo.total(exacto)
 
     def obtener_por_matricula(self, matricula_id: int):
-        """Obtiene calificaciones de una matrícula"""
-        return self.repo.get_by_matricula(matricula_id)
+        """Obtiene calificaciones de una matrícula (del archivo si su año lectivo se archivó)"""
+        return self.repo.get_by_matricula(matricula_id) or self.archivo.get_calificaciones(matricula_id)
 
-    def obtener_promedio(self, matricula_id: int) -> float:
-        """Calcula promedio de un estudiante"""
-        return self.repo.get_promedio_estudiante(matricula_id)
+    def obtener_promedio(self, matricula_id: int, quimestre: Optional[int] = None,
+                         asignatura_id: Optional[int] = None) -> float:
+        """
+        Calcula promedio de un estudiante, leído de resumen_calificaciones
+        (una fila por asignatura y quimestre, no todas sus notas).
+        Sin filas en el resumen se calcula de las notas archivadas, por si
+        la matrícula es de un año lectivo archivado.
+        """
+        promedio = self.repo.resumen.get_promedio(matricula_id, quimestre, asignatura_id)
+        if promedio is None:
+            promedio = self.archivo.get_promedio(matricula_id, quimestre, asignatura_id)
+        return promedio or 0.0
+
+    def obtener_ranking(self, curso_id: int, quimestre: Optional[int] = None,
+                        asignatura_id: Optional[int] = None, limit: int = 10) -> List[dict]:
+        """Ranking de los estudiantes de un curso por promedio"""
+        if quimestre is not None and not (1 <= quimestre <= 3):
+            raise ValueError("El quimestre debe estar entre 1 y 3")
+        if not CursoRepository(self.db).read(curso_id):
+            raise ValueError(f"Curso con ID {curso_id} no existe")
+        return [
+            {**fila._asdict(), "promedio": round(float(fila.promedio), 2)}
+            for fila in self.repo.resumen.get_ranking(curso_id, quimestre, asignatura_id, limit)
+        ]
+
+    def reconstruir_resumen(self) -> int:
+        """
+        Recalcula resumen_calificaciones desde cero (tras cargas masivas
+        hechas por fuera del servicio o para corregir desviaciones).
+        Devuelve el número de grupos generados.
+        """
+        try:
+            grupos = self.repo.resumen.reconstruir()
+            self.db.commit()
+            return grupos
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def generar_libreta(self, curso_id: int, quimestre: Optional[int] = None) -> dict:
+        """
+        Genera la libreta de un curso: promedio de cada estudiante por
+        asignatura, promedio general de cada estudiante, promedio de cada
+        asignatura y promedio del curso. Todo sale de una única consulta
+        agregada, sin importar cuántos estudiantes tenga el curso.
+
+        Los promedios generales se calculan sobre todas las notas (no como
+        media de los promedios por asignatura).
+        """
+        if quimestre is not None and not (1 <= quimestre <= 3):
+            raise ValueError("El quimestre debe estar entre 1 y 3")
+        if not CursoRepository(self.db).read(curso_id):
+            raise ValueError(f"Curso con ID {curso_id} no existe")
+
+        def redondear(promedio):
+            return round(float(promedio), 2) if promedio is not None else None
+
+        libreta = {
+            "curso_id": curso_id,
+            "quimestre": quimestre,
+            "promedio_curso": None,
+            "asignaturas": [],
+            "estudiantes": [],
+        }
+        estudiantes = {}
+        for fila in self.repo.get_libreta_curso(curso_id, quimestre):
+            promedio = {
+                "asignatura_id": fila.asignatura_id,
+                "asignatura": fila.asignatura,
+                "promedio": redondear(fila.promedio),
+                "cantidad": fila.cantidad,
+            }
+            if fila.agrupa_matricula and fila.agrupa_asignatura:
+                libreta["promedio_curso"] = redondear(fila.promedio)
+            elif fila.agrupa_matricula:
+                if fila.asignatura_id is not None:
+                    libreta["asignaturas"].append(promedio)
+            else:
+                estudiante = estudiantes.get(fila.matricula_id)
+                if estudiante is None:
+                    estudiante = estudiantes[fila.matricula_id] = {
+                        "matricula_id": fila.matricula_id,
+                        "estudiante_id": fila.estudiante_id,
+                        "nombre": fila.nombre,
+                        "apellido": fila.apellido,
+                        "promedio_general": None,
+                        "asignaturas": [],
+                    }
+                    libreta["estudiantes"].append(estudiante)
+                if fila.agrupa_asignatura:
+                    estudiante["promedio_general"] = redondear(fila.promedio)
+                elif fila.asignatura_id is not None:
+                    estudiante["asignaturas"].append(promedio)
+        return libreta
 
     def actualizar_calificacion(self, id: int, nota: float = None, **kwargs):
         """Actualiza una calificación"""
-        if not self.repo.read(id):
-            raise ValueError(f"Calificación con ID {id} no encontrada")
-        
         if nota is not None:
             if not (0 <= nota <= 10):
                 raise ValueError("La nota debe estar entre 0 y 10")
             kwargs["nota"] = nota
         
-        return self.repo.update(id, kwargs)
+        actualizado = self.repo.update(id, kwargs)
+        if actualizado is None:
+            raise ValueError(f"Calificación con ID {id} no encontrada")
+        return actualizado
 
     def eliminar_calificacion(self, id: int):
         """Elimina una calificación"""
@@ -466,6 +1018,7 @@ class AsistenciaService:
         self.repo = AsistenciaRepository(db)
         self.mat_repo = MatriculaRepository(db)
         self.asig_repo = AsignaturaRepository(db)
+        self.archivo = ArchivoRepository(db)
         self.db = db
 
     def crear_asistencia(self, estado: str, matricula_id: int, asignatura_id: int, fecha: date = None):
@@ -477,51 +1030,220 @@ class AsistenciaService:
         - Matrícula existe
         - Asignatura existe
         """
+        return self.repo.create(self._validar_asistencia(estado, matricula_id, asignatura_id, fecha))
+
+    def crear_asistencias_lote(self, registros: List[dict]):
+        """
+        Crea varios registros de asistencia en una sola transacción.
+        Matrículas y asignaturas se comprueban en bloque.
+        """
+        errores = _comprobar_referencias(registros, {
+            "matricula_id": (self.mat_repo, "Matrícula"),
+            "asignatura_id": (self.asig_repo, "Asignatura"),
+        })
+        validar = partial(self._validar_asistencia, consultar_bd=False)
+        return self.repo.create_many(_validar_lote(registros, validar, errores))
+
+    def importar_asistencias_csv(self, archivo: BinaryIO) -> int:
+        """
+        Importa asistencias desde un CSV (fecha, estado, matricula_id,
+        asignatura_id; la fecha es opcional y por defecto es hoy) con COPY.
+        Todas las filas se validan en SQL; si alguna falla no se importa nada.
+        """
+        return _importar_csv(self.repo, ImportacionCSV(
+            self.db, "asistencias",
+            columnas={
+                "fecha": ColumnaCSV(como_fecha, Date, predeterminado="current_date"),
+                "estado": ColumnaCSV(como_enum(EstadoAsistencia, "estado_asistencia"),
+                                     EnumSQL(EstadoAsistencia, name="estado_asistencia")),
+                "matricula_id": ColumnaCSV(como_entero, Integer),
+                "asignatura_id": ColumnaCSV(como_entero, Integer),
+            },
+            referencias={
+                "matricula_id": ("matriculas", "Matrícula"),
+                "asignatura_id": ("asignaturas", "Asignatura"),
+            },
+        ), archivo)
+
+    def _validar_asistencia(self, estado: str, matricula_id: int, asignatura_id: int,
+                            fecha: date = None, consultar_bd: bool = True) -> dict:
+        """
+        Valida los datos de una asistencia y completa la fecha por defecto.
+        Con consultar_bd=False omite la comprobación de matrícula y asignatura.
+        """
         if estado not in [e.value for e in EstadoAsistencia]:
             raise ValueError(f"Estado inválido: {estado}")
         
-        if not self.mat_repo.read(matricula_id):
-            raise ValueError(f"Matrícula con ID {matricula_id} no existe")
-        
-        if not self.asig_repo.read(asignatura_id):
-            raise ValueError(f"Asignatura con ID {asignatura_id} no existe")
+        if consultar_bd:
+            if not self.mat_repo.read(matricula_id):
+                raise ValueError(f"Matrícula con ID {matricula_id} no existe")
+            
+            if not self.asig_repo.read(asignatura_id):
+                raise ValueError(f"Asignatura con ID {asignatura_id} no existe")
         
-        return self.repo.create({
+        return {
             "estado": estado,
             "matricula_id": matricula_id,
             "asignatura_id": asignatura_id,
             "fecha": fecha or date.today()
-        })
+        }
 
-    def obtener_asistencia(self, id: int):
+    def obtener_asistencia(self, id: int, include: Sequence[str] = ()):
         """Obtiene un registro de asistencia"""
-        asi = self.repo.read(id)
+        asi = self.repo.read(id, include)
         if not asi:
             raise ValueError(f"Asistencia con ID {id} no encontrada")
         return asi
 
-    def listar_asistencias(self, skip: int = 0, limit: int = 100):
+    def listar_asistencias(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None,
+                           include: Sequence[str] = ()):
         """Lista todas las asistencias"""
-        return self.repo.read_all(skip, limit)
+        return self.repo.read_all(skip, limit, after_id, include)
 
-    def obtener_por_matricula(self, matricula_id: int):
-        """Obtiene asistencias de una matrícula"""
-        return self.repo.get_by_matricula(matricula_id)
+    def listar_filas(self, columnas: Sequence[str], skip: int = 0, limit: int = 100,
+                     after_id: Optional[int] = None):
+        """Lista solo las columnas indicadas, como filas (ruta rápida de los listados)"""
+        return self.repo.read_filas(columnas, skip, limit, after_id)
+
+    def total(self, exacto: bool = False):
+        """Total de asistencias (estimado si la tabla es grande, salvo exacto=True)"""
+        return self.repo.total(exacto)
+
+    def obtener_por_matricula(self, matricula_id: int, desde: Optional[date] = None,
+                              hasta: Optional[date] = None):
+        """
+        Obtiene asistencias de una matrícula (entre dos fechas, si se indican),
+        del archivo si su año lectivo se archivó
+        """
+        return (self.repo.get_by_matricula(matricula_id, desde, hasta)
+                or self.archivo.get_asistencias(desde, hasta, matricula_id=matricula_id))
+
+    def obtener_por_periodo(self, desde: Optional[date] = None, hasta: Optional[date] = None,
+                            matricula_id: Optional[int] = None, asignatura_id: Optional[int] = None):
+        """
+        Obtiene las asistencias de una matrícula y/o asignatura entre dos fechas,
+        incluidas las de años lectivos archivados.
+        
+        Validaciones:
+        - Al menos una de matrícula o asignatura
+        - desde no posterior a hasta
+        """
+        if matricula_id is None and asignatura_id is None:
+            raise ValueError("Debe indicar matricula_id o asignatura_id")
+        if desde is not None and hasta is not None and desde > hasta:
+            raise ValueError("La fecha inicial no puede ser posterior a la final")
+        asistencias = self.repo.get_by_periodo(desde, hasta, matricula_id, asignatura_id)
+        # Una matrícula está entera en uso o entera en el archivo; una
+        # asignatura puede tener asistencias en ambos
+        if matricula_id is None or not asistencias:
+            archivadas = self.archivo.get_asistencias(desde, hasta, matricula_id, asignatura_id)
+            if archivadas:
+                asistencias = sorted(archivadas + asistencias, key=lambda asi: (asi.fecha, asi.id))
+        return asistencias
 
     def actualizar_asistencia(self, id: int, estado: str = None, **kwargs):
         """Actualiza una asistencia"""
-        if not self.repo.read(id):
-            raise ValueError(f"Asistencia con ID {id} no encontrada")
-        
         if estado is not None:
             if estado not in [e.value for e in EstadoAsistencia]:
                 raise ValueError(f"Estado inválido: {estado}")
             kwargs["estado"] = estado
         
-        return self.repo.update(id, kwargs)
+        actualizado = self.repo.update(id, kwargs)
+        if actualizado is None:
+            raise ValueError(f"Asistencia con ID {id} no encontrada")
+        return actualizado
 
     def eliminar_asistencia(self, id: int):
         """Elimina un registro de asistencia"""
         if not self.repo.delete(id):
             raise ValueError(f"Asistencia con ID {id} no encontrada")
         return True
+
+
+class ArchivoService:
+    """
+    Servicio que archiva años lectivos terminados: sus matrículas,
+    calificaciones y asistencias pasan al esquema archivo (ver
+    repositories/archivo.py) y las lecturas por matrícula las siguen
+    encontrando allí.
+    """
+
+    def __init__(self, db: Session):
+        self.repo = ArchivoRepository(db)
+        self.db = db
+
+    def archivar_anio(self, anio: int, tamano_lote: int = ARCHIVO_TAMANO_LOTE, hoy: Optional[date] = None,
+                      al_avanzar: Optional[Callable[[Dict[str, int]], None]] = None) -> Dict[str, int]:
+        """
+        Mueve al archivo un año lectivo terminado, confirmando cada lote de
+        `tamano_lote` matrículas por separado. Si se interrumpe, lo ya
+        confirmado queda archivado y otra ejecución sigue con el resto.
+
+        Validaciones:
+        - Tamaño de lote mayor que cero
+        - El año lectivo terminó
+
+        Args:
+            anio: Año en que empieza el año lectivo (ej: 2024 para 2024-2025)
+            tamano_lote: Matrículas por transacción
+            hoy: Fecha con la que se comprueba que el año terminó (hoy si se omite)
+            al_avanzar: Función que recibe las filas movidas en cada lote
+
+        Returns:
+            Filas movidas de cada tabla (matriculas, calificaciones, asistencias)
+        """
+        if tamano_lote < 1:
+            raise ValueError("El tamaño de lote debe ser mayor que cero")
+        _, fin = rango_anio_lectivo(anio)
+        if (hoy or date.today()) < fin:
+            raise ValueError(f"El año lectivo {anio}-{anio + 1} termina el {fin}; aún no puede archivarse")
+
+        totales = defaultdict(int)
+        while True:
+            try:
+                movidas = self.repo.mover_lote(anio, tamano_lote)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            if not movidas["matriculas"]:
+                return dict(totales)
+            for tabla, filas in movidas.items():
+                totales[tabla] += filas
+            if al_avanzar:
+                al_avanzar(movidas)
+
+    def listar_anios(self):
+        """Años lectivos con sus matrículas en uso y archivadas"""
+        return self.repo.anios()
+
+
+class BusquedaService:
+    """Servicio de búsqueda de personas por nombre, apellido, cédula, correo o teléfono"""
+
+    # Con menos caracteres la consulta no forma ningún trigrama y el índice no filtra
+    LONGITUD_MINIMA = 3
+
+    def __init__(self, db: Session):
+        self.repo = BusquedaRepository(db)
+        self.db = db
+
+    def buscar(self, consulta: str, tipo: Optional[str] = None, limit: int = 20) -> List[dict]:
+        """
+        Busca estudiantes, docentes y representantes de forma aproximada.
+
+        Args:
+            consulta: Texto a buscar (se ignoran los espacios repetidos)
+            tipo: "estudiante", "docente" o "representante" (todos si se omite)
+            limit: Máximo de resultados
+
+        Returns:
+            Resultados con tipo, id, nombre, detalle y puntaje, los más parecidos primero
+        """
+        consulta = " ".join((consulta or "").split())
+        if len(consulta) < self.LONGITUD_MINIMA:
+            raise ValueError(f"La búsqueda debe tener al menos {self.LONGITUD_MINIMA} caracteres")
+        if tipo is not None and tipo not in FUENTES:
+            raise ValueError(f"Tipo inválido: {tipo}")
+        filas = self.repo.buscar(consulta, [tipo] if tipo else None, limit)
+        return [dict(fila._mapping) for fila in filas]
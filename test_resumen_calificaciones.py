@@ -0,0 +1,81 @@
+"""
+Pruebas del resumen de calificaciones (resumen_calificaciones)
+
+Necesitan la base de datos de DATABASE_URL con datos (al menos una
+matrícula y dos asignaturas); si no hay conexión se omiten. Cada prueba
+corre dentro de una transacción que se deshace al final: los commit de
+los repositorios quedan como savepoints. /ejecutar-pruebas las corre
+contra la base de la aplicación, así que solo tocan los grupos que crean
+(nada de reconstruir ni de bloqueos de tabla).
+"""
+import pytest
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from config.database import engine
+from models import Asignatura, Matricula, ResumenCalificacion
+from repositories.repositories import CalificacionRepository, ResumenCalificacionRepository
+
+
+@pytest.fixture
+def db():
+    try:
+        conexion = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"Base de datos no disponible: {e}")
+    transaccion = conexion.begin()
+    sesion = Session(bind=conexion, join_transaction_mode="create_savepoint")
+    try:
+        yield sesion
+    finally:
+        sesion.close()
+        transaccion.rollback()
+        conexion.close()
+
+
+def _resumen(db: Session, grupos) -> dict:
+    """Filas del resumen de los grupos: (suma, cantidad, mínimo, máximo)"""
+    clave = tuple_(*(getattr(ResumenCalificacion, c) for c in ResumenCalificacionRepository.CLAVE))
+    return {
+        (r.matricula_id, r.asignatura_id, r.quimestre): (r.suma, r.cantidad, r.minimo, r.maximo)
+        for r in db.scalars(select(ResumenCalificacion).where(clave.in_(grupos)))
+    }
+
+
+def _agregado(db: Session, grupos) -> dict:
+    """Los mismos valores calculados desde calificaciones (solo lectura)"""
+    agregado = ResumenCalificacionRepository._agregado()
+    clave = tuple_(*agregado.selected_columns[:3])
+    return {tuple(fila[:3]): tuple(fila[3:]) for fila in db.execute(agregado.where(clave.in_(grupos)))}
+
+
+def test_resumen_coincide_con_calificaciones(db):
+    matricula_id = db.scalar(select(Matricula.id).order_by(Matricula.id).limit(1))
+    asignaturas = db.scalars(select(Asignatura.id).order_by(Asignatura.id).limit(2)).all()
+    if matricula_id is None or len(asignaturas) < 2:
+        pytest.skip("Faltan matrículas o asignaturas en la base de datos")
+    repo = CalificacionRepository(db)
+    grupos = [(matricula_id, asignatura_id, 3) for asignatura_id in asignaturas]
+    antes = _resumen(db, grupos)
+
+    # Altas (sumar), cambio de grupo y de nota, bajas (recalcular)
+    notas = repo.create_many([
+        {"nota": nota, "quimestre": 3, "matricula_id": matricula_id, "asignatura_id": asignaturas[0]}
+        for nota in (4.0, 7.5, 9.0)
+    ])
+    unica = repo.create({"nota": 6.0, "quimestre": 3, "matricula_id": matricula_id, "asignatura_id": asignaturas[1]})
+    repo.update(notas[0].id, {"asignatura_id": asignaturas[1], "nota": 5.0})
+    repo.update(notas[2].id, {"nota": 8.0})
+    repo.delete(notas[1].id)
+    assert repo.delete_many([unica.id]) == set()
+
+    incremental = _resumen(db, grupos)
+    agregado = _agregado(db, grupos)
+
+    assert incremental.keys() == agregado.keys() == set(grupos)
+    for grupo, valores in agregado.items():
+        assert incremental[grupo] == pytest.approx(valores), grupo
+    # Cada grupo queda con una nota más: 8.0 en el primero y 5.0 en el segundo
+    for grupo, nota in zip(grupos, (8.0, 5.0)):
+        suma, cantidad = antes.get(grupo, (0.0, 0))[:2]
+        assert incremental[grupo][:2] == pytest.approx((suma + nota, cantidad + 1)), grupo
@@ -0,0 +1,114 @@
+"""
+Pruebas de la validación de lotes de services.services
+
+No necesitan base de datos: los repositorios se sustituyen por mocks.
+"""
+from collections import defaultdict
+from datetime import date
+import pytest
+from mockito import when, mock, verify, unstub
+from repositories.repositories import EstudianteRepository, RepresentanteRepository
+from services.services import (
+    EstudianteService, ErrorValidacionLote,
+    _comprobar_referencias, _comprobar_unicos, _validar_lote,
+)
+
+
+@pytest.fixture(autouse=True)
+def limpiar_mocks():
+    yield
+    unstub()
+
+
+def _estudiante(cedula, representante_id=1, nacimiento=date(2010, 1, 1)):
+    return {"nombre": " Ana ", "apellido": "Paz", "cedula": cedula,
+            "fecha_nacimiento": nacimiento, "representante_id": representante_id}
+
+
+def _validar(valor):
+    if valor < 0:
+        raise ValueError(f"{valor} es negativo")
+    return {"valor": valor * 2}
+
+
+def test_error_lote_ordena_y_omite_registros_sin_errores():
+    error = ErrorValidacionLote({3: ["c"], 0: ["a", "b"], 1: []})
+    assert error.errores == [
+        {"registro": 0, "errores": ["a", "b"]},
+        {"registro": 3, "errores": ["c"]},
+    ]
+    assert str(error) == "2 registro(s) con errores de validación"
+
+
+def test_unicos_marca_repetidos_del_lote_y_existentes():
+    registros = [{"cedula": "1"}, {"cedula": "2"}, {"cedula": "1"}, {"cedula": "3"}, {"cedula": "1"}]
+    errores = defaultdict(list)
+    _comprobar_unicos(registros, lambda r: r["cedula"], {"3"}, "Cédula {} repetida", errores)
+    # La primera aparición es válida; las siguientes y las ya existentes, no
+    assert dict(errores) == {
+        2: ["Cédula 1 repetida"],
+        3: ["Cédula 3 repetida"],
+        4: ["Cédula 1 repetida"],
+    }
+
+
+def test_referencias_con_una_consulta_por_tabla():
+    repo = mock(RepresentanteRepository)
+    when(repo).existing_ids({1, 2, 7}).thenReturn({1, 2})
+    registros = [{"rep": 1}, {"rep": 7}, {"rep": None}, {"rep": 2}, {"rep": 7}]
+
+    errores = _comprobar_referencias(registros, {"rep": (repo, "Representante")})
+
+    # Los valores vacíos no se consultan ni se marcan
+    assert dict(errores) == {
+        1: ["Representante con ID 7 no existe"],
+        4: ["Representante con ID 7 no existe"],
+    }
+    verify(repo, times=1).existing_ids({1, 2, 7})
+
+
+def test_validar_lote_devuelve_los_datos_normalizados():
+    assert _validar_lote([{"valor": 1}, {"valor": 2}], _validar) == [{"valor": 2}, {"valor": 4}]
+
+
+def test_validar_lote_junta_errores_por_registro():
+    previos = defaultdict(list, {2: ["Representante con ID 7 no existe"]})
+    registros = [{"valor": 1}, {"valor": -1}, {"valor": -2}, {"valor": 3}]
+
+    with pytest.raises(ErrorValidacionLote) as exc:
+        _validar_lote(registros, _validar, previos)
+
+    assert exc.value.errores == [
+        {"registro": 1, "errores": ["-1 es negativo"]},
+        {"registro": 2, "errores": ["Representante con ID 7 no existe", "-2 es negativo"]},
+    ]
+
+
+def test_guardar_estudiantes_lote_rechaza_cedulas_repetidas():
+    servicio = EstudianteService(mock())
+    servicio.repo = mock(EstudianteRepository)
+    servicio.rep_repo = mock(RepresentanteRepository)
+    when(servicio.rep_repo).existing_ids({1}).thenReturn({1})
+    registros = [_estudiante("0101"), _estudiante("0202"), _estudiante("0101", nacimiento=date.today())]
+
+    with pytest.raises(ErrorValidacionLote) as exc:
+        servicio.guardar_estudiantes_lote(registros)
+
+    assert exc.value.errores == [{"registro": 2, "errores": [
+        "La cédula 0101 se repite en el lote",
+        "El estudiante debe tener al menos 5 años de edad",
+    ]}]
+    verify(servicio.repo, times=0).upsert_many(...)
+
+
+def test_guardar_estudiantes_lote_hace_un_solo_upsert():
+    servicio = EstudianteService(mock())
+    servicio.repo = mock(EstudianteRepository)
+    servicio.rep_repo = mock(RepresentanteRepository)
+    when(servicio.rep_repo).existing_ids({1}).thenReturn({1})
+    when(servicio.repo).upsert_many(...).thenReturn(["ok"])
+
+    assert servicio.guardar_estudiantes_lote([_estudiante("0101"), _estudiante("0202")]) == ["ok"]
+
+    datos = [dict(_estudiante(c), nombre="Ana", correo=None) for c in ("0101", "0202")]
+    verify(servicio.repo, times=1).upsert_many(datos, conflict_columns=["cedula"])